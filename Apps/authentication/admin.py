@@ -0,0 +1,39 @@
+from django.contrib import admin
+from django.contrib.auth.admin import UserAdmin as BaseUserAdmin
+from .models import TokenRevocation, User
+from .pagination import EstimatedCountPaginator
+
+class LargeTableAdmin(admin.ModelAdmin):
+    """
+    Changelist settings for tables that grow without bound: the page total is
+    estimated and the unfiltered total is never counted
+    """
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+
+class ReadOnlyAdmin(admin.ModelAdmin):
+    """
+    Tables derived from other tables and maintained by the application; they
+    can be inspected here but are rebuilt with management commands, not edited
+    """
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def has_delete_permission(self, request, obj=None):
+        return False
+
+@admin.register(User)
+class UserAdmin(LargeTableAdmin, BaseUserAdmin):
+    list_display = ['username', 'email', 'first_name', 'last_name', 'is_employee', 'is_manager', 'is_staff']
+    list_filter = ['is_employee', 'is_manager', 'is_staff', 'is_active']
+    fieldsets = BaseUserAdmin.fieldsets + (
+        ('Roles', {'fields': ('is_employee', 'is_manager')}),
+    )
+
+@admin.register(TokenRevocation)
+class TokenRevocationAdmin(ReadOnlyAdmin):
+    list_display = ['user_id', 'token_id', 'revoked_at', 'expires_at']
+    ordering = ['-revoked_at']
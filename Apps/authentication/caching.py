@@ -0,0 +1,40 @@
+"""
+Whether Django's cache is shared by the server's worker processes.
+
+The caches of reference data, token revocations, the work calendar and the
+department statistics are invalidated through version tokens kept in Django's
+cache. With a per-process backend and several workers, a token set by one
+worker is never seen by the others, so those caches are bypassed and a system
+check warns about the configuration.
+"""
+import os
+from django.conf import settings
+from django.core import checks
+
+PER_PROCESS_BACKENDS = (
+    'django.core.cache.backends.locmem.LocMemCache',
+    'django.core.cache.backends.dummy.DummyCache',
+)
+
+def worker_processes():
+    # gunicorn reads its worker count from WEB_CONCURRENCY
+    try:
+        return int(os.environ.get('WEB_CONCURRENCY', 1))
+    except ValueError:
+        return 1
+
+def is_shared():
+    """False when the default cache is per-process and several workers serve requests"""
+    return settings.CACHES['default']['BACKEND'] not in PER_PROCESS_BACKENDS or worker_processes() <= 1
+
+@checks.register(checks.Tags.caches)
+def check_shared_cache(app_configs, **kwargs):
+    if is_shared():
+        return []
+    return [checks.Warning(
+        'The default cache is per-process but WEB_CONCURRENCY starts several workers.',
+        hint='Reference data, token revocations, the work calendar and the department statistics '
+             'are read from the database on every request until CACHE_BACKEND names a shared backend '
+             '(database cache or Redis).',
+        id='authentication.W001',
+    )]
@@ -0,0 +1,234 @@
+"""
+Compiled list serialization.
+
+DRF renders a row by building model instances and walking the serializer's
+fields: every field resolves its source attribute by attribute and dispatches
+to its own to_representation. On large list pages that per-field work, not
+the SQL, takes most of the time. A CompiledSerializer is built once per
+serializer class and field set: it reads the page as dicts from a `.values()`
+projection of exactly the lookups the fields need, and turns each dict into
+the same output the serializer would produce with one precomputed reader per
+field (a plain key lookup where the database value already is the JSON value).
+
+Computed fields (method fields, model properties) are compiled from
+`Meta.field_lookups` and `Meta.compiled_fields`, which maps the field name to
+a function of the values of its lookups. A serializer that cannot be compiled
+(custom to_representation, many-valued relations, computed fields without a
+compiled function, ...) is rendered by DRF as before.
+"""
+import datetime
+from operator import itemgetter
+from django.conf import settings
+from django.core.exceptions import FieldDoesNotExist
+from django.utils import timezone
+from rest_framework import ISO_8601, fields, relations, serializers
+from rest_framework.settings import api_settings
+
+# Fields whose database value already is their representation
+IDENTITY_FIELDS = (fields.CharField, fields.EmailField, fields.IntegerField, fields.ReadOnlyField)
+
+class NotCompilable(Exception):
+    pass
+
+class CompiledSerializer:
+    """
+    A serializer's field set compiled into a .values() projection and a row
+    renderer. Each step holds a reader factory; the readers are bound to the
+    current time zone once per page.
+    """
+    def __init__(self, serializer):
+        self.lookups = {}
+        self.steps = self._compile(serializer, '')
+
+    def _lookup(self, lookup):
+        self.lookups.setdefault(lookup, None)
+        return lookup
+
+    def _compile(self, serializer, prefix):
+        if type(serializer).to_representation is not serializers.Serializer.to_representation:
+            raise NotCompilable(f'{type(serializer).__name__} overrides to_representation')
+        model = serializer.Meta.model
+        meta = serializer.Meta
+        steps = []
+        for name, field in serializer.fields.items():
+            if field.write_only:
+                continue
+            compiled = getattr(meta, 'compiled_fields', {}).get(name)
+            if compiled is not None:
+                lookups = [self._lookup(prefix + lookup) for lookup in meta.field_lookups[name]]
+                steps.append((name, self._computed(compiled, lookups)))
+            elif field.source == '*':
+                raise NotCompilable(f'{name} has no compiled function')
+            elif isinstance(field, serializers.Serializer):
+                steps.append((name, self._nested(model, field, prefix)))
+            elif isinstance(field, (serializers.ListSerializer, relations.ManyRelatedField)):
+                raise NotCompilable(f'{name} is many-valued')
+            elif isinstance(field, relations.PrimaryKeyRelatedField):
+                steps.append((name, self._primary_key(model, field, prefix)))
+            else:
+                steps.append((name, self._column(model, field, prefix)))
+        return steps
+
+    @staticmethod
+    def _computed(function, lookups):
+        getter = itemgetter(*lookups)
+        if len(lookups) == 1:
+            return lambda tz: lambda row: function(getter(row))
+        return lambda tz: lambda row: function(*getter(row))
+
+    def _nested(self, model, field, prefix):
+        relation = _get_field(model, field.source)
+        if relation.many_to_one or (relation.one_to_one and relation.concrete):
+            present = self._lookup(prefix + field.source)
+        elif relation.one_to_one:
+            # Joined with select_related(), as the lists do, a missing reverse one-to-one reads as None
+            present = self._lookup(f'{prefix}{field.source}__pk')
+        else:
+            raise NotCompilable(f'{field.field_name} is many-valued')
+        steps = self._compile(field, f'{prefix}{field.source}__')
+
+        def make(tz):
+            render = self._renderer(steps, tz)
+            return lambda row: None if row[present] is None else render(row)
+        return make
+
+    def _primary_key(self, model, field, prefix):
+        if field.pk_field is not None or len(field.source_attrs) != 1:
+            raise NotCompilable(f'{field.field_name} is not a plain foreign key')
+        relation = _get_field(model, field.source)
+        if not relation.concrete or not relation.is_relation:
+            raise NotCompilable(f'{field.field_name} is not a foreign key')
+        getter = itemgetter(self._lookup(prefix + field.source))
+        return lambda tz: getter
+
+    def _column(self, model, field, prefix):
+        for attr in field.source_attrs[:-1]:
+            relation = _get_field(model, attr)
+            # DRF and .values() disagree on what a missing related row renders as
+            if not (relation.concrete and relation.is_relation) or relation.null:
+                raise NotCompilable(f'{field.field_name} reads through an optional relation')
+            model = relation.related_model
+        column = _get_field(model, field.source_attrs[-1])
+        if not column.concrete or column.is_relation:
+            raise NotCompilable(f'{field.field_name} is not a column')
+        lookup = self._lookup(prefix + '__'.join(field.source_attrs))
+        make_converter = _converter(field)
+        if make_converter is None:
+            getter = itemgetter(lookup)
+            return lambda tz: getter
+
+        def make(tz):
+            convert = make_converter(tz)
+
+            def read(row):
+                value = row[lookup]
+                return None if value is None else convert(value)
+            return read
+        return make
+
+    @staticmethod
+    def _renderer(steps, tz):
+        readers = [(name, make(tz)) for name, make in steps]
+        return lambda row: {name: read(row) for name, read in readers}
+
+    def project(self, queryset, extra=()):
+        """`queryset` as the .values() rows the renderer reads, plus the `extra` columns"""
+        return queryset.values(*dict.fromkeys([*self.lookups, *extra]))
+
+    def render_many(self, rows):
+        # DateTimeField.default_timezone(), once per page instead of once per value
+        tz = timezone.get_current_timezone() if settings.USE_TZ else None
+        render = self._renderer(self.steps, tz)
+        return [render(row) for row in rows]
+
+def _get_field(model, name):
+    try:
+        return model._meta.get_field(name)
+    except FieldDoesNotExist:
+        raise NotCompilable(f'{model.__name__}.{name} is not a model field')
+
+def _is_iso(field, default):
+    return str(getattr(field, 'format', default)).lower() == ISO_8601
+
+def _converter(field):
+    """
+    None when the database value is the field's representation, otherwise a
+    factory taking the current time zone and returning the function that
+    converts a non-null value
+    """
+    kind = type(field)
+    if kind in IDENTITY_FIELDS:
+        return None
+    if kind is fields.ChoiceField and all(isinstance(key, str) for key in field.choices):
+        return None
+    if kind is fields.DateField and _is_iso(field, api_settings.DATE_FORMAT):
+        return lambda tz: datetime.date.isoformat
+    if kind is fields.DateTimeField and _is_iso(field, api_settings.DATETIME_FORMAT):
+        return lambda tz: _datetime_converter(field, getattr(field, 'timezone', tz))
+    if type(field).get_attribute is not fields.Field.get_attribute:
+        raise NotCompilable(f'{field.field_name} overrides get_attribute')
+    return lambda tz: field.to_representation
+
+def _datetime_converter(field, field_timezone):
+    """DateTimeField.to_representation in ISO 8601 for aware values in a known time zone"""
+    def convert(value):
+        if field_timezone is None or value.tzinfo is None:
+            return field.to_representation(value)
+        try:
+            value = value.astimezone(field_timezone).isoformat()
+        except OverflowError:
+            return field.to_representation(value)
+        return value[:-6] + 'Z' if value.endswith('+00:00') else value
+    return convert
+
+_compiled = {}
+
+def compile_serializer(serializer):
+    """The CompiledSerializer for the serializer's current fields, or None if they cannot be compiled"""
+    key = (type(serializer), tuple((name, type(field)) for name, field in serializer.fields.items()))
+    if key not in _compiled:
+        try:
+            _compiled[key] = CompiledSerializer(serializer)
+        except NotCompilable:
+            _compiled[key] = None
+    return _compiled[key]
+
+class CompiledRows:
+    """Stands in for `Serializer(rows, many=True)` when the rows are .values() dicts"""
+    def __init__(self, compiled, rows):
+        self.compiled = compiled
+        self.rows = rows
+
+    @property
+    def data(self):
+        return self.compiled.render_many(self.rows)
+
+class CompiledListMixin:
+    """
+    Viewset mixin rendering list pages through the compiled serializer: the
+    page is read with .values() and never becomes model instances. Other
+    actions, and serializers that do not compile, use DRF as before.
+    """
+    def get_compiled_serializer(self):
+        if getattr(self, 'action', None) != 'list' or self.request.method not in ('GET', 'HEAD'):
+            return None
+        if not hasattr(self, '_compiled_serializer'):
+            self._compiled_serializer = compile_serializer(self.get_serializer())
+        return self._compiled_serializer
+
+    def paginate_queryset(self, queryset):
+        compiled = self.get_compiled_serializer()
+        if compiled is not None:
+            # The paginator and the view may read the pk and the ordering columns too
+            extra = ['pk'] + [name.lstrip('-') for name in self.get_required_columns()]
+            projected = compiled.project(queryset, extra)
+            # The paginators count the queryset they are given; count without the projection's joins
+            projected.count = queryset.count
+            queryset = projected
+        return super().paginate_queryset(queryset)
+
+    def get_serializer(self, *args, **kwargs):
+        compiled = self.get_compiled_serializer() if args and kwargs.get('many') else None
+        if compiled is not None and isinstance(args[0], list) and all(isinstance(row, dict) for row in args[0]):
+            return CompiledRows(compiled, args[0])
+        return super().get_serializer(*args, **kwargs)
@@ -0,0 +1,187 @@
+"""
+Conditional requests.
+
+List and detail responses carry a weak ETag and a Last-Modified header built
+from the rows' `updated_at`, the `updated_at` of the related rows they embed
+(`related_validator_fields`) and the version tokens of the reference caches
+whose rows they embed (`validator_caches`); relations the serializer's fields
+do not read (say with ?fields=) are left out. A list's validators cover the rows
+of the page and the pagination envelope (count, next, previous), which are
+known once the page query ran, so a matching If-None-Match or
+If-Modified-Since is answered with 304 before any serializer runs and without
+an extra query.
+
+Updates honour If-Match: the row is locked and its current ETag compared
+before the change is made, and a mismatch returns 412. Only weak validators
+are emitted, so If-Match is compared weakly.
+"""
+import hashlib
+import json
+from django.db import transaction
+from django.utils.cache import get_conditional_response, patch_vary_headers
+from django.utils.http import http_date, parse_etags, quote_etag
+from rest_framework import status
+from rest_framework.exceptions import APIException
+from rest_framework.response import Response
+from .sparse import field_lookups
+
+class PreconditionFailed(APIException):
+    status_code = status.HTTP_412_PRECONDITION_FAILED
+    default_detail = 'The resource has changed since it was read; fetch it again and retry.'
+    default_code = 'precondition_failed'
+
+def make_etag(*parts):
+    digest = hashlib.md5(json.dumps(parts, default=str).encode(), usedforsecurity=False).hexdigest()
+    return f'W/{quote_etag(digest)}'
+
+class ConditionalRequestMixin:
+    """
+    Viewset mixin adding ETag/Last-Modified validators to list and retrieve
+    and If-Match checks to update
+    """
+    validator_field = 'updated_at'
+    # Lookups of the `updated_at` of related rows embedded in the representation
+    related_validator_fields = ()
+    # {relation: ReferenceCache} of the reference rows embedded in the representation
+    validator_caches = {}
+
+    def _embeds(self, relation):
+        """Whether the serializer's fields read through `relation`"""
+        if not hasattr(self, '_embedded_lookups'):
+            self._embedded_lookups = field_lookups(self.get_serializer().fields)
+        return any(lookup == relation or lookup.startswith(relation + '__') for lookup in self._embedded_lookups)
+
+    def get_related_validator_fields(self):
+        return [lookup for lookup in self.related_validator_fields if self._embeds(lookup.rsplit('__', 1)[0])]
+
+    def get_required_columns(self):
+        # Keep the validators loaded when ?fields= narrows the query
+        return tuple(super().get_required_columns()) + (self.validator_field,) + tuple(self.get_related_validator_fields())
+
+    def _version(self, obj):
+        # Compiled list pages are .values() rows (see authentication.compiled)
+        if isinstance(obj, dict):
+            return obj[self.validator_field]
+        return getattr(obj, self.validator_field)
+
+    @staticmethod
+    def _pk(obj):
+        return obj['pk'] if isinstance(obj, dict) else obj.pk
+
+    @staticmethod
+    def _related_version(obj, lookup):
+        if isinstance(obj, dict):
+            return obj[lookup]
+        for attr in lookup.split('__'):
+            obj = getattr(obj, attr, None)
+        return obj
+
+    def _versions(self, obj):
+        """The row's own version followed by those of the related rows it embeds"""
+        return [self._version(obj)] + [self._related_version(obj, lookup) for lookup in self.get_related_validator_fields()]
+
+    def _cache_versions(self):
+        return [
+            reference_cache.version() for relation, reference_cache in self.validator_caches.items()
+            if self._embeds(relation)
+        ]
+
+    @staticmethod
+    def _last_modified(versions, cache_versions):
+        moments = [version for version in versions if version is not None]
+        moments += [published_at for _, published_at in cache_versions]
+        return max(moments, default=None)
+
+    def get_object_etag(self, obj, cache_versions=None):
+        if cache_versions is None:
+            cache_versions = self._cache_versions()
+        return make_etag(obj._meta.label, obj.pk, self._versions(obj), cache_versions)
+
+    def get_object_last_modified(self, obj, cache_versions=None):
+        if cache_versions is None:
+            cache_versions = self._cache_versions()
+        return self._last_modified(self._versions(obj), cache_versions)
+
+    def _with_validators(self, response, etag, last_modified):
+        response['ETag'] = etag
+        # The same URL renders as JSON or as the browsable API
+        patch_vary_headers(response, ['Accept'])
+        if last_modified is not None:
+            response['Last-Modified'] = http_date(last_modified.timestamp())
+        return response
+
+    def _conditional(self, request, etag, last_modified):
+        """The 304 response for a matching If-None-Match/If-Modified-Since, or None"""
+        timestamp = int(last_modified.timestamp()) if last_modified is not None else None
+        response = get_conditional_response(request._request, etag=etag, last_modified=timestamp)
+        if response is not None:
+            response = self._with_validators(response, etag, last_modified)
+        return response
+
+    def list(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset())
+        page = self.paginate_queryset(queryset)
+        rows = page if page is not None else list(queryset)
+        versions = [self._versions(row) for row in rows]
+        cache_versions = self._cache_versions()
+        envelope = None
+        if page is not None:
+            envelope = self.get_paginated_response([]).data
+        etag = make_etag(
+            queryset.model._meta.label, envelope,
+            [(self._pk(row), row_versions) for row, row_versions in zip(rows, versions)],
+            cache_versions,
+        )
+        last_modified = self._last_modified([version for row_versions in versions for version in row_versions], cache_versions)
+
+        not_modified = self._conditional(request, etag, last_modified)
+        if not_modified is not None:
+            return not_modified
+        serializer = self.get_serializer(rows, many=True)
+        response = self.get_paginated_response(serializer.data) if page is not None else Response(serializer.data)
+        return self._with_validators(response, etag, last_modified)
+
+    def retrieve(self, request, *args, **kwargs):
+        instance = self.get_object()
+        cache_versions = self._cache_versions()
+        etag = self.get_object_etag(instance, cache_versions)
+        last_modified = self.get_object_last_modified(instance, cache_versions)
+        not_modified = self._conditional(request, etag, last_modified)
+        if not_modified is not None:
+            return not_modified
+        serializer = self.get_serializer(instance)
+        return self._with_validators(Response(serializer.data), etag, last_modified)
+
+    def get_object(self):
+        obj = super().get_object()
+        if_match = self.request.headers.get('If-Match')
+        if self.request.method in ('PUT', 'PATCH') and if_match:
+            # Lock the row and read its current version so no other write can slip in before ours
+            current = type(obj).objects.select_for_update().filter(pk=obj.pk).values_list(
+                self.validator_field, flat=True
+            ).first()
+            setattr(obj, self.validator_field, current)
+            expected = {etag.removeprefix('W/') for etag in parse_etags(if_match)}
+            if '*' not in expected and self.get_object_etag(obj).removeprefix('W/') not in expected:
+                raise PreconditionFailed()
+        return obj
+
+    def dispatch(self, request, *args, **kwargs):
+        # If-Match checks and the write they guard run in one transaction
+        if request.method in ('PUT', 'PATCH') and 'If-Match' in request.headers:
+            with transaction.atomic():
+                return super().dispatch(request, *args, **kwargs)
+        return super().dispatch(request, *args, **kwargs)
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(request, response, *args, **kwargs)
+        # Updates return the new validator so the client can chain conditional writes
+        instance = getattr(getattr(response, 'data', None), 'serializer', None)
+        instance = getattr(instance, 'instance', None)
+        if (
+            request.method in ('PUT', 'PATCH') and response.status_code == status.HTTP_200_OK
+            and instance is not None and not isinstance(instance, (list, tuple))
+            and hasattr(instance, self.validator_field)
+        ):
+            self._with_validators(response, self.get_object_etag(instance), self.get_object_last_modified(instance))
+        return response
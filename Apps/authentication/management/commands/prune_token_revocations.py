@@ -0,0 +1,9 @@
+from django.core.management.base import BaseCommand
+from authentication.tokens import prune
+
+class Command(BaseCommand):
+    help = 'Delete the revocations of bearer tokens that can no longer be used or refreshed'
+
+    def handle(self, *args, **options):
+        deleted = prune()
+        self.stdout.write(self.style.SUCCESS(f'Deleted {deleted} token revocation(s)'))
@@ -0,0 +1,21 @@
+# Generated by Django 5.2 on 2026-10-18 16:11
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("auth", "0012_alter_user_first_name_max_length"),
+        ("authentication", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="user",
+            index=models.Index(
+                condition=models.Q(("is_manager", True)),
+                fields=["username"],
+                name="user_manager_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,20 @@
+# Generated by Django 5.2 on 2026-10-18 18:34
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("authentication", "0003_token_revocation"),
+    ]
+
+    operations = [
+        migrations.AddConstraint(
+            model_name="tokenrevocation",
+            constraint=models.UniqueConstraint(
+                condition=models.Q(("token_id", ""), _negated=True),
+                fields=("token_id",),
+                name="unique_revoked_token",
+            ),
+        ),
+    ]
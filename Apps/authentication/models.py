@@ -11,9 +11,49 @@ class User(AbstractUser):
         verbose_name = 'User'
         verbose_name_plural = 'Users'
         db_table = 'authentication_user'
+        indexes = [
+            # Only the few manager rows are indexed
+            models.Index(fields=['username'], name='user_manager_idx', condition=models.Q(is_manager=True)),
+        ]
 
     def __str__(self):
         return self.username
 
+    # Changing any of these revokes the user's tokens (see authentication.signals)
+    CREDENTIAL_FIELDS = ['password', 'is_active', 'is_staff', 'is_superuser', 'is_manager', 'is_employee']
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._saved_credentials = instance.get_credentials()
+        return instance
+
+    def get_credentials(self):
+        return tuple(self.__dict__.get(name, models.DEFERRED) for name in self.CREDENTIAL_FIELDS)
+
+class TokenRevocation(models.Model):
+    """
+    A revoked bearer token, or with no token_id every token issued to the
+    user until revoked_at. Kept until the tokens could no longer be
+    refreshed (expires_at).
+    """
+    # Not a foreign key: revocations must outlive a deleted user's row
+    user_id = models.BigIntegerField()
+    token_id = models.CharField(max_length=32, blank=True)
+    revoked_at = models.DateTimeField(auto_now_add=True)
+    expires_at = models.DateTimeField()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['expires_at'], name='token_revocation_expiry_idx'),
+        ]
+        constraints = [
+            # A token is revoked once: concurrent refreshes of one token cannot both succeed
+            models.UniqueConstraint(fields=['token_id'], condition=~models.Q(token_id=''), name='unique_revoked_token'),
+        ]
+
+    def __str__(self):
+        return f"Token {self.token_id or '(all)'} of user {self.user_id}"
+
 # Update the AUTH_USER_MODEL setting in settings.py to use this model
 AUTH_USER_MODEL = 'authentication.User' 
\ No newline at end of file
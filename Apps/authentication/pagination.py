@@ -0,0 +1,240 @@
+import base64
+import datetime
+import json
+from django.core.exceptions import FieldDoesNotExist, ValidationError
+from django.core.paginator import Paginator
+from django.db import connections
+from django.db.models import Q
+from django.utils.functional import cached_property
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+def estimate_count(queryset, limit=10000):
+    """
+    Return a cheap row count estimate for a queryset.
+
+    PostgreSQL answers from the planner's row estimate without touching the
+    table. Other backends count at most `limit` rows, so the cost is bounded
+    no matter how large the table grows.
+    """
+    queryset = queryset.order_by()
+    connection = connections[queryset.db]
+    if connection.vendor == 'postgresql':
+        sql, params = queryset.query.sql_with_params()
+        with connection.cursor() as cursor:
+            cursor.execute(f'EXPLAIN (FORMAT JSON) {sql}', params)
+            plan = cursor.fetchone()[0]
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        return int(plan[0]['Plan']['Plan Rows'])
+    return queryset[:limit].count()
+
+class EstimatedCountPaginator(Paginator):
+    """
+    Paginator whose total comes from estimate_count instead of COUNT(*), for
+    admin changelists over tables too large to count on every page load.
+
+    The admin rejects a ?p= past the last page, so the rows are counted
+    exactly when the estimate could hide pages: when it reached the count
+    limit, and when filters or a search narrow the list, which the
+    planner's estimate does not follow closely.
+    """
+    count_limit = 10000
+
+    @cached_property
+    def count(self):
+        if self.object_list.query.has_filters():
+            return super().count
+        estimate = estimate_count(self.object_list, self.count_limit)
+        if estimate >= self.count_limit and connections[self.object_list.db].vendor != 'postgresql':
+            return super().count
+        return estimate
+
+class KeysetPagination(PageNumberPagination):
+    """
+    Keyset (seek) pagination over the view's `keyset_ordering` columns.
+
+    Pages are addressed by an opaque cursor holding the ordering values of the
+    row at the page boundary, so every page is a single indexed range read and
+    page 5,000 costs the same as page 1. The total count is skipped unless the
+    client asks for it with `?count=exact` or `?count=estimate`.
+    """
+    cursor_query_param = 'cursor'
+    count_query_param = 'count'
+    page_size_query_param = 'page_size'
+    max_page_size = 1000
+    default_ordering = ('-pk',)
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        if not self.page_size:
+            return None
+
+        self.ordering = tuple(getattr(view, 'keyset_ordering', self.default_ordering))
+        values, reverse = self.decode_cursor(request)
+        ordering = self._reverse(self.ordering) if reverse else self.ordering
+
+        page_queryset = queryset.order_by(*ordering)
+        if values is not None:
+            try:
+                values = self._clean_values(queryset.model, values)
+                page_queryset = page_queryset.filter(self._seek_filter(ordering, values))
+            except (ValidationError, FieldDoesNotExist, TypeError, ValueError):
+                raise NotFound('Invalid cursor')
+
+        rows = list(page_queryset[:self.page_size + 1])
+        has_more = len(rows) > self.page_size
+        rows = rows[:self.page_size]
+
+        if reverse:
+            rows.reverse()
+            self.has_next = True
+            self.has_previous = has_more
+        else:
+            self.has_next = has_more
+            self.has_previous = values is not None
+
+        self.count, self.count_is_estimate = self.get_count(queryset, request)
+        self.rows = rows
+        return rows
+
+    def get_paginated_response(self, data):
+        response = {}
+        if self.count is not None:
+            response['count'] = self.count
+            if self.count_is_estimate:
+                response['count_is_estimate'] = True
+        response.update({
+            'next': self.get_next_link(),
+            'previous': self.get_previous_link(),
+            'results': data,
+        })
+        return Response(response)
+
+    def get_next_link(self):
+        if not self.has_next or not self.rows:
+            return None
+        return self.encode_cursor(self.rows[-1], reverse=False)
+
+    def get_previous_link(self):
+        if not self.has_previous:
+            return None
+        if not self.rows:
+            return remove_query_param(self.request.build_absolute_uri(), self.cursor_query_param)
+        return self.encode_cursor(self.rows[0], reverse=True)
+
+    def get_count(self, queryset, request):
+        """
+        Return (count, is_estimate) according to the `count` query parameter
+        """
+        mode = request.query_params.get(self.count_query_param)
+        if mode == 'exact':
+            return queryset.count(), False
+        if mode == 'estimate':
+            return estimate_count(queryset), True
+        return None, False
+
+    def encode_cursor(self, row, reverse):
+        values = [self._encode_value(self._get_value(row, field)) for field in self.ordering]
+        payload = json.dumps({'k': values, 'r': reverse}, separators=(',', ':'))
+        cursor = base64.urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+        return replace_query_param(self.request.build_absolute_uri(), self.cursor_query_param, cursor)
+
+    def decode_cursor(self, request):
+        """
+        Return (values, reverse) from the cursor parameter; an empty cursor is the first page
+        """
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None, False
+        try:
+            padded = encoded + '=' * (-len(encoded) % 4)
+            payload = json.loads(base64.urlsafe_b64decode(padded.encode()).decode())
+            values, reverse = payload['k'], bool(payload['r'])
+        except (TypeError, ValueError, KeyError):
+            raise NotFound('Invalid cursor')
+        if not isinstance(values, list) or len(values) != len(self.ordering):
+            raise NotFound('Invalid cursor')
+        return values, reverse
+
+    def _clean_values(self, model, values):
+        """The cursor's values converted by their ordering columns' fields; raises on malformed ones"""
+        cleaned = []
+        for field_name, value in zip(self.ordering, values):
+            if isinstance(value, (list, dict)):
+                raise ValueError('Cursor values must be scalars')
+            current = model
+            for attr in field_name.lstrip('-').split('__'):
+                field = current._meta.pk if attr == 'pk' else current._meta.get_field(attr)
+                current = field.related_model
+            cleaned.append(field.to_python(value))
+        return cleaned
+
+    @staticmethod
+    def _reverse(ordering):
+        return tuple(field[1:] if field.startswith('-') else f'-{field}' for field in ordering)
+
+    @staticmethod
+    def _seek_filter(ordering, values):
+        """
+        Build `(a, b, ...) > (x, y, ...)` in the given ordering.
+
+        The leading bound on the first column lets the database start an index
+        range scan at the cursor instead of filtering the whole table.
+        """
+        first = ordering[0]
+        condition = Q()
+        for index, field in enumerate(ordering):
+            name = field.lstrip('-')
+            lookup = 'lt' if field.startswith('-') else 'gt'
+            clause = Q(**{f'{name}__{lookup}': values[index]})
+            for previous, value in zip(ordering[:index], values[:index]):
+                clause &= Q(**{previous.lstrip('-'): value})
+            condition |= clause
+        bound = 'lte' if first.startswith('-') else 'gte'
+        return Q(**{f'{first.lstrip("-")}__{bound}': values[0]}) & condition
+
+    @staticmethod
+    def _get_value(row, field):
+        if isinstance(row, dict):
+            # A .values() row of a compiled list (see authentication.compiled)
+            return row[field.lstrip('-')]
+        value = row
+        for attr in field.lstrip('-').split('__'):
+            value = getattr(value, attr)
+        return value
+
+    @staticmethod
+    def _encode_value(value):
+        if isinstance(value, (datetime.date, datetime.datetime)):
+            return value.isoformat()
+        return value
+
+class CursorOrPageNumberPagination(PageNumberPagination):
+    """
+    Page number pagination that switches to keyset pagination when the
+    request carries a `cursor` parameter (send `?cursor=` for the first page).
+    """
+    page_size_query_param = 'page_size'
+    max_page_size = 1000
+    keyset_class = KeysetPagination
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.keyset = None
+        if self.keyset_class.cursor_query_param in request.query_params:
+            self.keyset = self.keyset_class()
+            return self.keyset.paginate_queryset(queryset, request, view)
+        return super().paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        if self.keyset is not None:
+            return self.keyset.get_paginated_response(data)
+        return super().get_paginated_response(data)
+
+    def to_html(self):
+        if self.keyset is not None:
+            return ''
+        return super().to_html()
@@ -0,0 +1,147 @@
+"""
+Read-through cache for small reference tables.
+
+Leave types, departments and positions change a few times a year but are read
+on most requests: listed, nested in responses and looked up to validate the
+ids sent on writes. A ReferenceCache keeps every row of such a table in two
+tiers: a copy in each process and a pickled copy in Django's cache, shared by
+the workers. Both are keyed on a version token kept in Django's cache; saving
+or deleting a row sets a new token once the transaction commits, so every
+process reloads on its next read. In steady state listing a table, reading
+one row or validating an id costs one cache read and no query.
+
+Until its transaction commits, a connection that changed a table reads that
+table from the database, so it sees its own changes and never publishes rows
+that may still be rolled back. So does every process when Django's cache is
+not shared by the workers (see authentication.caching), since they would
+never see each other's version tokens.
+"""
+import copy
+import uuid
+from asgiref.local import Local
+from django.core.cache import cache
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.db import transaction
+from django.http import Http404
+from django.utils import timezone
+from rest_framework import permissions, serializers
+from rest_framework.response import Response
+from . import caching
+from .pagination import KeysetPagination
+
+TIMEOUT = 24 * 60 * 60
+
+# Names of the caches changed by the current thread's open transaction
+_pending = Local()
+
+class ReferenceCache:
+    """All the rows of `queryset`, ordered by primary key, cached under `name`"""
+    def __init__(self, name, queryset):
+        self.name = name
+        self.queryset = queryset
+        self.model = queryset.model
+        self.version_key = f'{name}:version'
+        self._loaded = {'version': None, 'rows': (), 'by_pk': {}}
+
+    def _bypass(self):
+        if not caching.is_shared():
+            return True
+        pending = getattr(_pending, 'names', set())
+        if not transaction.get_connection().in_atomic_block:
+            # Outside a transaction every earlier change was committed (and published) or rolled back
+            pending.clear()
+        return self.name in pending
+
+    def version(self):
+        """The current version token: a random id and the time it was published"""
+        if not caching.is_shared():
+            # Tokens would be per-process; a new one on every call never matches a stale one
+            return uuid.uuid4().hex, timezone.now()
+        return cache.get_or_set(self.version_key, lambda: (uuid.uuid4().hex, timezone.now()), timeout=None)
+
+    def _load(self):
+        version = self.version()
+        if self._loaded['version'] != version:
+            key = f'{self.name}:{version[0]}'
+            rows = cache.get(key)
+            if rows is None:
+                rows = list(self.queryset.order_by('pk'))
+                cache.set(key, rows, timeout=TIMEOUT)
+            self._loaded = {'version': version, 'rows': rows, 'by_pk': {row.pk: row for row in rows}}
+        return self._loaded
+
+    def all(self):
+        """Every row; copies, so callers may modify them"""
+        if self._bypass():
+            return list(self.queryset.order_by('pk'))
+        return [copy.copy(row) for row in self._load()['rows']]
+
+    def get(self, pk):
+        """The row with primary key `pk` (a copy), or None"""
+        try:
+            pk = self.model._meta.pk.to_python(pk)
+        except DjangoValidationError:
+            return None
+        if self._bypass():
+            return self.queryset.filter(pk=pk).first()
+        row = self._load()['by_pk'].get(pk)
+        return copy.copy(row) if row is not None else None
+
+    def invalidate(self):
+        """Make every process reload the table once the current transaction commits"""
+        def publish():
+            getattr(_pending, 'names', set()).discard(self.name)
+            cache.set(self.version_key, (uuid.uuid4().hex, timezone.now()), timeout=None)
+        if transaction.get_connection().in_atomic_block:
+            if not hasattr(_pending, 'names'):
+                _pending.names = set()
+            _pending.names.add(self.name)
+        transaction.on_commit(publish)
+
+class CachedPrimaryKeyRelatedField(serializers.PrimaryKeyRelatedField):
+    """
+    PrimaryKeyRelatedField that validates ids against a ReferenceCache
+    instead of querying the table
+    """
+    def __init__(self, reference_cache, **kwargs):
+        self.reference_cache = reference_cache
+        if not kwargs.get('read_only'):
+            kwargs.setdefault('queryset', reference_cache.queryset)
+        super().__init__(**kwargs)
+
+    def to_internal_value(self, data):
+        if isinstance(data, bool):
+            self.fail('incorrect_type', data_type=type(data).__name__)
+        try:
+            pk = self.reference_cache.model._meta.pk.to_python(data)
+        except DjangoValidationError:
+            self.fail('incorrect_type', data_type=type(data).__name__)
+        obj = self.reference_cache.get(pk)
+        if obj is None:
+            self.fail('does_not_exist', pk_value=data)
+        return obj
+
+class ReferenceDataViewMixin:
+    """
+    Viewset mixin serving list and retrieve from `reference_cache`; writes and
+    keyset-paginated lists still go to the database
+    """
+    reference_cache = None
+
+    def list(self, request, *args, **kwargs):
+        if KeysetPagination.cursor_query_param in request.query_params:
+            return super().list(request, *args, **kwargs)
+        rows = self.reference_cache.all()
+        page = self.paginate_queryset(rows)
+        if page is not None:
+            return self.get_paginated_response(self.get_serializer(page, many=True).data)
+        return Response(self.get_serializer(rows, many=True).data)
+
+    def get_object(self):
+        if self.request.method not in permissions.SAFE_METHODS:
+            return super().get_object()
+        obj = self.reference_cache.get(self.kwargs[self.lookup_url_kwarg or self.lookup_field])
+        if obj is None:
+            raise Http404
+        self.check_object_permissions(self.request, obj)
+        return obj
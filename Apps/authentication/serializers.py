@@ -1,10 +1,11 @@
 from rest_framework import serializers
 from django.contrib.auth import get_user_model
 from django.contrib.auth.password_validation import validate_password
+from .sparse import SparseFieldsMixin
 
 User = get_user_model()
 
-class UserSerializer(serializers.ModelSerializer):
+class UserSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     password = serializers.CharField(write_only=True, required=False, validators=[validate_password])
     confirm_password = serializers.CharField(write_only=True, required=False)
 
@@ -35,4 +36,14 @@ class UserSerializer(serializers.ModelSerializer):
             password = validated_data.pop('password')
             validated_data.pop('confirm_password', None)
             instance.set_password(password)
-        return super().update(instance, validated_data) 
\ No newline at end of file
+        return super().update(instance, validated_data) 
+
+class TokenObtainSerializer(serializers.Serializer):
+    username = serializers.CharField()
+    password = serializers.CharField(style={'input_type': 'password'}, trim_whitespace=False)
+
+class TokenRefreshSerializer(serializers.Serializer):
+    token = serializers.CharField()
+
+class TokenRevokeSerializer(serializers.Serializer):
+    all = serializers.BooleanField(default=False, help_text='Revoke every token of the user, not just this one')
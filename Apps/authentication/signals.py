@@ -0,0 +1,30 @@
+from django.contrib.auth.hashers import is_password_usable
+from django.db.models import DEFERRED
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from . import tokens
+from .models import User
+
+def credentials_changed(saved, credentials):
+    for name, old, new in zip(User.CREDENTIAL_FIELDS, saved, credentials):
+        if DEFERRED in (old, new) or old == new:
+            continue
+        if name == 'password' and (not old or not is_password_usable(old)):
+            # No token was obtained with that password, e.g. the unusable one
+            # create_user() sets before a sign-up's set_password() and save()
+            continue
+        return True
+    return False
+
+@receiver(post_save, sender=User)
+def revoke_changed_credentials(sender, instance, created, **kwargs):
+    """Tokens carry the role flags, so a new password, role or deactivation revokes the earlier ones"""
+    credentials = instance.get_credentials()
+    saved = getattr(instance, '_saved_credentials', None)
+    if not created and saved is not None and credentials_changed(saved, credentials):
+        tokens.revoke_user(instance.pk)
+    instance._saved_credentials = credentials
+
+@receiver(post_delete, sender=User)
+def revoke_deleted_user(sender, instance, **kwargs):
+    tokens.revoke_user(instance.pk)
@@ -0,0 +1,132 @@
+"""
+Sparse fieldsets and opt-in expansion.
+
+`?fields=id,status` trims a read response to the named fields and
+`?expand=employee` adds a nested representation the serializer only renders
+on request. The SQL follows the output: the queryset is cut down to the
+columns the remaining fields read (`only()`), and only the relations they
+traverse are joined.
+
+Serializers list what their computed fields read in `Meta.field_lookups`
+({field name: [ORM lookups]}); other fields are traced through their
+`source`. Expandable fields are declared in `Meta.expandable_fields`
+({field name: serializer class}).
+"""
+from rest_framework import permissions, serializers
+
+def parse_names(value):
+    return [name.strip() for name in value.split(',') if name.strip()] if value else []
+
+def field_lookups(fields, prefix=''):
+    """The ORM lookups read by the given serializer fields, prefixed with the path to their model"""
+    lookups = []
+    for name, field in fields.items():
+        if field.write_only:
+            continue
+        explicit = getattr(getattr(field.parent, 'Meta', None), 'field_lookups', {}).get(name)
+        if explicit is not None:
+            lookups += [prefix + lookup for lookup in explicit]
+        elif field.source == '*':
+            continue
+        elif isinstance(field, serializers.ListSerializer):
+            # Nested lists are prefetched, not joined; leave their queries alone
+            continue
+        elif isinstance(field, serializers.Serializer):
+            lookups += field_lookups(field.fields, prefix + field.source.replace('.', '__') + '__')
+        else:
+            lookups.append(prefix + field.source.replace('.', '__'))
+    return lookups
+
+def related_paths(lookups):
+    """The select_related() paths needed to read `lookups`: every lookup without its final column"""
+    return sorted({lookup.rsplit('__', 1)[0] for lookup in lookups if '__' in lookup})
+
+class SparseFieldsMixin:
+    """
+    Serializer mixin accepting `fields=` (names to keep) and `expand=`
+    (expandable names to add) keyword arguments
+    """
+    def __init__(self, *args, fields=None, expand=(), **kwargs):
+        super().__init__(*args, **kwargs)
+        expandable = getattr(self.Meta, 'expandable_fields', {})
+        unknown = set(expand) - set(expandable)
+        if unknown:
+            raise serializers.ValidationError({'expand': f'Cannot expand: {", ".join(sorted(unknown))}'})
+        for name in expand:
+            self.fields[name] = expandable[name](read_only=True)
+
+        if fields is not None:
+            keep = set(fields) | set(expand)
+            readable = {name for name, field in self.fields.items() if not field.write_only}
+            unknown = keep - readable
+            if unknown:
+                raise serializers.ValidationError({'fields': f'Unknown field(s): {", ".join(sorted(unknown))}'})
+            for name in list(self.fields):
+                if name not in keep:
+                    self.fields.pop(name)
+
+    @staticmethod
+    def setup_eager_loading(queryset):
+        return queryset
+
+    def prune_queryset(self, queryset, sparse, required=()):
+        """
+        Join what the expanded fields read and, when the fields were narrowed
+        (`sparse`), load only the columns and relations the kept fields read
+        """
+        lookups = field_lookups(self.fields)
+        if not sparse:
+            expanded = getattr(self.Meta, 'expandable_fields', {})
+            extra = field_lookups({name: field for name, field in self.fields.items() if name in expanded})
+            paths = related_paths(extra)
+            return queryset.select_related(*paths) if paths else queryset
+        lookups += [name.lstrip('-') for name in required if name.lstrip('-') != 'pk']
+        paths = related_paths(lookups)
+        # A relation is joined through its foreign key, which must be loaded too
+        lookups += paths
+        queryset = queryset.select_related(None)
+        # select_related() without arguments would follow every foreign key
+        if paths:
+            queryset = queryset.select_related(*paths)
+        return queryset.only(*lookups)
+
+class SparseFieldsViewMixin:
+    """
+    Viewset mixin reading ?fields= and ?expand= on reads and passing them to
+    the serializer and to the queryset (see setup_eager_loading)
+    """
+    def get_sparse_options(self):
+        request = getattr(self, 'request', None)
+        if request is None or request.method not in permissions.SAFE_METHODS:
+            return None, []
+        params = request.query_params
+        fields = parse_names(params.get('fields')) or None
+        return fields, parse_names(params.get('expand'))
+
+    def get_serializer(self, *args, **kwargs):
+        fields, expand = self.get_sparse_options()
+        if fields is not None:
+            kwargs.setdefault('fields', fields)
+        if expand:
+            kwargs.setdefault('expand', expand)
+        return super().get_serializer(*args, **kwargs)
+
+    def setup_eager_loading(self, queryset):
+        """
+        Apply the serializer's joins, narrowed to what ?fields= and ?expand= need
+        """
+        serializer_class = self.get_serializer_class()
+        queryset = serializer_class.setup_eager_loading(queryset)
+        fields, expand = self.get_sparse_options()
+        if fields is None and not expand:
+            return queryset
+        serializer = self.get_serializer()
+        return serializer.prune_queryset(queryset, fields is not None, self.get_required_columns())
+
+    def get_required_columns(self):
+        """Columns read from the rows outside the serializer, never deferred"""
+        # Cursor pagination reads the ordering columns
+        return tuple(getattr(self, 'keyset_ordering', ()))
+
+    def get_queryset(self):
+        return self.setup_eager_loading(super().get_queryset())
@@ -0,0 +1,57 @@
+import json
+import re
+from django.db import connection
+
+class QueryPlanMixin:
+    """
+    Assertions over the database's query plan for a queryset.
+
+    SQLite plans come from EXPLAIN QUERY PLAN. On PostgreSQL sequential scans
+    are disabled for the EXPLAIN so the planner reports an index path whenever
+    one exists, even on the tiny tables of a test database.
+    """
+
+    def explain(self, queryset):
+        sql, params = queryset.query.sql_with_params()
+        with connection.cursor() as cursor:
+            if connection.vendor == 'postgresql':
+                cursor.execute('SET LOCAL enable_seqscan = off')
+                cursor.execute(f'EXPLAIN (FORMAT JSON) {sql}', params)
+                plan = cursor.fetchone()[0]
+                return json.loads(plan) if isinstance(plan, str) else plan
+            cursor.execute(f'EXPLAIN QUERY PLAN {sql}', params)
+            return [row[-1] for row in cursor.fetchall()]
+
+    def plan_steps(self, queryset):
+        """Flatten the plan into readable strings, one per step"""
+        plan = self.explain(queryset)
+        if connection.vendor != 'postgresql':
+            return plan
+
+        steps = []
+        def walk(node):
+            steps.append(' '.join(filter(None, [node['Node Type'], node.get('Relation Name'), node.get('Index Name')])))
+            for child in node.get('Plans', []):
+                walk(child)
+        walk(plan[0]['Plan'])
+        return steps
+
+    def full_scans(self, queryset, tables):
+        """Plan steps that read one of `tables` without an index"""
+        scans = []
+        for step in self.plan_steps(queryset):
+            for table in tables:
+                if re.fullmatch(rf'SCAN {table}', step) or step == f'Seq Scan {table}':
+                    scans.append(step)
+        return scans
+
+    def sorts(self, queryset):
+        """Plan steps that sort rows instead of reading them in index order"""
+        return [step for step in self.plan_steps(queryset) if 'TEMP B-TREE' in step or step.startswith('Sort')]
+
+    def assertUsesIndexes(self, queryset, tables, ordered=False):
+        scans = self.full_scans(queryset, tables)
+        self.assertEqual(scans, [], f'Full scan in plan: {self.plan_steps(queryset)}')
+        if ordered:
+            sorts = self.sorts(queryset)
+            self.assertEqual(sorts, [], f'Sort in plan: {self.plan_steps(queryset)}')
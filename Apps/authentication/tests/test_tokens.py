@@ -0,0 +1,145 @@
+import os
+import re
+import time
+from unittest import mock
+from django.core import signing
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient, APIRequestFactory
+from authentication import tokens
+from authentication.models import TokenRevocation
+from .factories import ManagerFactory, UserFactory
+
+class SignedTokenTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.manager = ManagerFactory(first_name='Ann')
+
+    def obtain(self, password='testpass123'):
+        return self.client.post(reverse('token-obtain'), {'username': self.manager.username, 'password': password})
+
+    def get(self, url, token):
+        return self.client.get(url, HTTP_AUTHORIZATION=f'Bearer {token}')
+
+    def test_obtain_and_use_a_token(self):
+        self.assertEqual(self.obtain('wrong').status_code, status.HTTP_400_BAD_REQUEST)
+        response = self.obtain()
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['token_type'], 'Bearer')
+        token = response.data['token']
+
+        # Role flags come from the token; other fields are loaded when a view reads them
+        self.assertEqual(self.get(reverse('employee-list'), token).status_code, status.HTTP_200_OK)
+        response = self.get(reverse('user-me'), token)
+        self.assertEqual(response.data['first_name'], 'Ann')
+        self.assertTrue(response.data['is_manager'])
+
+        self.assertEqual(self.get(reverse('employee-list'), token[:-2] + 'xx').status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_authentication_needs_no_query(self):
+        token = tokens.issue(self.manager)
+        request = APIRequestFactory().get('/', HTTP_AUTHORIZATION=f'Bearer {token}')
+        authenticator = tokens.SignedTokenAuthentication()
+        authenticator.authenticate(request)
+        with self.assertNumQueries(0):
+            user, claims = authenticator.authenticate(request)
+        self.assertEqual((user.pk, user.is_manager, user.is_authenticated), (self.manager.pk, True, True))
+
+        with CaptureQueriesContext(connection) as context:
+            self.get(reverse('leave-list'), token)
+        auth_tables = re.compile(r'FROM "(authentication_user|django_session|authentication_tokenrevocation)"')
+        self.assertEqual([query['sql'] for query in context.captured_queries if auth_tables.search(query['sql'])], [])
+        self.assertTrue(context.captured_queries)
+
+    def test_expired_tokens_can_be_refreshed_once(self):
+        an_hour_ago = signing.b62_encode(int(time.time()) - 3600)
+        with mock.patch.object(signing.TimestampSigner, 'timestamp', return_value=an_hour_ago):
+            token = tokens.issue(self.manager)
+        response = self.get(reverse('employee-list'), token)
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+        self.assertEqual(response.data['detail'], 'Token expired.')
+
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(reverse('token-refresh'), {'token': token})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(self.get(reverse('employee-list'), response.data['token']).status_code, status.HTTP_200_OK)
+        response = self.client.post(reverse('token-refresh'), {'token': token})
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_concurrent_refreshes_of_one_token(self):
+        """Test that a refresh racing another past the revocation check is refused"""
+        token = tokens.issue(self.manager)
+        self.assertEqual(self.client.post(reverse('token-refresh'), {'token': token}).status_code, status.HTTP_200_OK)
+        # The other refresh read the revocation list before the first one committed
+        with mock.patch.object(tokens, 'is_revoked', return_value=False):
+            response = self.client.post(reverse('token-refresh'), {'token': token})
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+        self.assertEqual(response.data['error'], 'Token revoked.')
+        self.assertEqual(TokenRevocation.objects.count(), 1)
+
+    def test_revocations_by_other_workers_without_a_shared_cache(self):
+        """Test that revocations are read from the table when the cache is per-process"""
+        token = tokens.issue(self.manager)
+        self.assertEqual(self.get(reverse('employee-list'), token).status_code, status.HTTP_200_OK)
+        with mock.patch.dict(os.environ, {'WEB_CONCURRENCY': '4'}):
+            # Another worker revoked it: its version token never reaches this process
+            tokens.revoke(tokens.read(token))
+            self.assertEqual(self.get(reverse('employee-list'), token).data['detail'], 'Token revoked.')
+            TokenRevocation.objects.all().delete()
+            tokens.revoke_user(self.manager.pk)
+            self.assertEqual(self.get(reverse('employee-list'), token).data['detail'], 'Token revoked.')
+
+    def test_revoke(self):
+        token, other = tokens.issue(self.manager), tokens.issue(self.manager)
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(reverse('token-revoke'), HTTP_AUTHORIZATION=f'Bearer {token}')
+        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+        self.assertEqual(self.get(reverse('employee-list'), token).data['detail'], 'Token revoked.')
+        self.assertEqual(self.get(reverse('employee-list'), other).status_code, status.HTTP_200_OK)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(reverse('token-revoke'), {'all': True}, HTTP_AUTHORIZATION=f'Bearer {other}')
+        self.assertEqual(self.get(reverse('employee-list'), other).status_code, status.HTTP_403_FORBIDDEN)
+        self.assertEqual(self.get(reverse('employee-list'), tokens.issue(self.manager)).status_code, status.HTTP_200_OK)
+
+    def test_sign_up_revokes_nothing(self):
+        """Test that setting the first password of a new user does not count as a change"""
+        response = self.client.post(reverse('user-list'), {
+            'username': 'newuser', 'email': 'new@example.com', 'password': 'testpass123',
+            'confirm_password': 'testpass123', 'first_name': 'New', 'last_name': 'User',
+        })
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        UserFactory()
+        self.assertFalse(TokenRevocation.objects.exists())
+
+        # Changing a usable password still does
+        user = type(self.manager).objects.get(username='newuser')
+        user.set_password('otherpass456')
+        user.save()
+        self.assertEqual(list(TokenRevocation.objects.values_list('user_id', flat=True)), [user.pk])
+
+    def test_credential_changes_revoke_earlier_tokens(self):
+        token = tokens.issue(self.manager)
+        user = type(self.manager).objects.get(pk=self.manager.pk)
+        with self.captureOnCommitCallbacks(execute=True):
+            user.last_login = user.date_joined
+            user.save(update_fields=['last_login'])
+        self.assertEqual(self.get(reverse('employee-list'), token).status_code, status.HTTP_200_OK)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            user.is_manager = False
+            user.save()
+        self.assertEqual(self.get(reverse('employee-list'), token).data['detail'], 'Token revoked.')
+        # A new token carries the new role
+        self.assertEqual(self.get(reverse('employee-list'), tokens.issue(user)).status_code, status.HTTP_403_FORBIDDEN)
+
+        regular = UserFactory()
+        token = tokens.issue(regular)
+        with self.captureOnCommitCallbacks(execute=True):
+            regular.delete()
+        self.assertEqual(self.get(reverse('user-me'), token).data['detail'], 'Token revoked.')
@@ -0,0 +1,146 @@
+"""
+Signed bearer tokens.
+
+A token is the user's id, username and role flags signed with the secret key
+and timestamped (django.core.signing), so it is checked without reading the
+session or the user row: the request user is built from the token with every
+other field deferred, to be loaded only if a view reads it. Tokens expire
+after AUTH_TOKEN_LIFETIME seconds and can be exchanged for a new one until
+AUTH_TOKEN_REFRESH_LIFETIME seconds after they were issued.
+
+Revoked tokens, and users whose earlier tokens are all revoked (on logout
+everywhere, password or role changes, deactivation), are listed in
+TokenRevocation. Each process keeps the list in memory and reloads it when
+the version token in Django's cache changes; revoking sets a new token once
+the transaction commits. An authenticated request therefore costs one cache
+read and no query. When the cache is not shared by the workers (see
+authentication.caching), one worker's revocations would never reach the
+others, so every request checks the table instead.
+"""
+import datetime
+import time
+import uuid
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core import signing
+from django.core.cache import cache
+from django.db import IntegrityError, transaction
+from django.db.models import Q
+from django.db.models.functions import Now
+from django.utils import timezone
+from rest_framework import authentication, exceptions
+from . import caching
+from .models import TokenRevocation
+
+VERSION_KEY = 'authentication:token-revocations:version'
+SALT = 'authentication.tokens'
+# The user fields a token carries
+CLAIMS = ['id', 'username', 'is_active', 'is_staff', 'is_superuser', 'is_manager', 'is_employee']
+
+def lifetime():
+    return getattr(settings, 'AUTH_TOKEN_LIFETIME', 15 * 60)
+
+def refresh_lifetime():
+    return getattr(settings, 'AUTH_TOKEN_REFRESH_LIFETIME', 24 * 60 * 60)
+
+def issue(user):
+    """A new token for `user`"""
+    claims = {name: getattr(user, name) for name in CLAIMS}
+    claims.update(jti=uuid.uuid4().hex, iat=time.time())
+    return signing.TimestampSigner(salt=SALT).sign_object(claims, compress=True)
+
+def read(token, max_age=None):
+    """
+    The claims of a valid, unrevoked token no older than `max_age` seconds
+    (the token lifetime by default); raises AuthenticationFailed otherwise
+    """
+    try:
+        claims = signing.TimestampSigner(salt=SALT).unsign_object(
+            token, max_age=lifetime() if max_age is None else max_age
+        )
+    except signing.SignatureExpired:
+        raise exceptions.AuthenticationFailed('Token expired.')
+    except signing.BadSignature:
+        raise exceptions.AuthenticationFailed('Invalid token.')
+    if is_revoked(claims):
+        raise exceptions.AuthenticationFailed('Token revoked.')
+    return claims
+
+def user_from_claims(claims):
+    """The token's user as a saved instance with only the claimed fields loaded"""
+    User = get_user_model()
+    # from_db() takes the values in the order of the model's columns
+    names = [field.attname for field in User._meta.concrete_fields if field.attname in claims]
+    return User.from_db('default', names, [claims[name] for name in names])
+
+_loaded = {'version': None, 'tokens': frozenset(), 'users': {}}
+
+def _revocations():
+    version = cache.get_or_set(VERSION_KEY, lambda: uuid.uuid4().hex, timeout=None)
+    if _loaded['version'] != version:
+        tokens, users = set(), {}
+        rows = TokenRevocation.objects.filter(expires_at__gt=Now()).values_list('user_id', 'token_id', 'revoked_at')
+        for user_id, token_id, revoked_at in rows:
+            if token_id:
+                tokens.add(token_id)
+            else:
+                users[user_id] = max(users.get(user_id, 0), revoked_at.timestamp())
+        _loaded.update(version=version, tokens=frozenset(tokens), users=users)
+    return _loaded
+
+def is_revoked(claims):
+    if not caching.is_shared():
+        issued_at = datetime.datetime.fromtimestamp(claims['iat'], tz=datetime.timezone.utc)
+        return TokenRevocation.objects.filter(expires_at__gt=Now()).filter(
+            Q(token_id=claims['jti']) | Q(token_id='', user_id=claims['id'], revoked_at__gte=issued_at)
+        ).exists()
+    revocations = _revocations()
+    return claims['jti'] in revocations['tokens'] or claims['iat'] <= revocations['users'].get(claims['id'], 0)
+
+def _publish():
+    transaction.on_commit(lambda: cache.set(VERSION_KEY, uuid.uuid4().hex, timeout=None))
+
+def revoke(claims):
+    """
+    Revoke one token, until it could no longer be refreshed anyway; raises
+    AuthenticationFailed if it already was, even by a concurrent transaction
+    """
+    expires_at = datetime.datetime.fromtimestamp(claims['iat'] + refresh_lifetime(), tz=datetime.timezone.utc)
+    try:
+        with transaction.atomic():
+            TokenRevocation.objects.create(user_id=claims['id'], token_id=claims['jti'], expires_at=expires_at)
+    except IntegrityError:
+        raise exceptions.AuthenticationFailed('Token revoked.')
+    _publish()
+
+def revoke_user(user_id):
+    """Revoke every token issued to the user so far"""
+    expires_at = timezone.now() + datetime.timedelta(seconds=refresh_lifetime())
+    TokenRevocation.objects.create(user_id=user_id, expires_at=expires_at)
+    _publish()
+
+def prune():
+    """Delete the revocations of tokens that have expired anyway; returns how many"""
+    deleted, _ = TokenRevocation.objects.filter(expires_at__lte=timezone.now()).delete()
+    return deleted
+
+class SignedTokenAuthentication(authentication.BaseAuthentication):
+    """
+    Authenticates `Authorization: Bearer <token>` requests without a query
+    """
+    keyword = 'Bearer'
+
+    def authenticate(self, request):
+        parts = authentication.get_authorization_header(request).split()
+        if not parts or parts[0].lower() != self.keyword.lower().encode():
+            return None
+        if len(parts) != 2:
+            raise exceptions.AuthenticationFailed('Invalid token header.')
+        try:
+            token = parts[1].decode()
+        except UnicodeError:
+            raise exceptions.AuthenticationFailed('Invalid token header.')
+        claims = read(token)
+        if not claims['is_active']:
+            raise exceptions.AuthenticationFailed('User inactive or deleted.')
+        return user_from_claims(claims), claims
@@ -8,5 +8,8 @@ router.register(r'users', views.UserViewSet)
 urlpatterns = [
     path('', views.APIRootView.as_view(), name='api-root'),
     path('', include(router.urls)),
+    path('auth/token/', views.TokenObtainView.as_view(), name='token-obtain'),
+    path('auth/token/refresh/', views.TokenRefreshView.as_view(), name='token-refresh'),
+    path('auth/token/revoke/', views.TokenRevokeView.as_view(), name='token-revoke'),
     path('auth/', include('rest_framework.urls', namespace='rest_framework')),
 ] 
\ No newline at end of file
@@ -1,9 +1,13 @@
-from rest_framework import viewsets, permissions, routers
+from rest_framework import viewsets, permissions, routers, status
 from rest_framework.decorators import action
+from rest_framework.exceptions import AuthenticationFailed
 from rest_framework.response import Response
 from rest_framework.views import APIView
-from django.contrib.auth import get_user_model
-from .serializers import UserSerializer
+from django.contrib.auth import authenticate, get_user_model
+from django.db import transaction
+from . import tokens
+from .serializers import UserSerializer, TokenObtainSerializer, TokenRefreshSerializer, TokenRevokeSerializer
+from .sparse import SparseFieldsViewMixin
 
 User = get_user_model()
 
@@ -14,9 +18,10 @@ class APIRootView(APIView):
             'leave-types': request.build_absolute_uri('leave-types/'),
             'leaves': request.build_absolute_uri('leaves/'),
             'leave-approvals': request.build_absolute_uri('leave-approvals/'),
+            'leave-balances': request.build_absolute_uri('leave-balances/'),
         })
 
-class UserViewSet(viewsets.ModelViewSet):
+class UserViewSet(SparseFieldsViewMixin, viewsets.ModelViewSet):
     """
     API endpoint that allows users to be viewed or edited.
     """
@@ -41,4 +46,65 @@ class UserViewSet(viewsets.ModelViewSet):
         Get the current user's information
         """
         serializer = self.get_serializer(request.user)
-        return Response(serializer.data) 
\ No newline at end of file
+        return Response(serializer.data) 
+
+def token_response(user):
+    return {'token': tokens.issue(user), 'token_type': 'Bearer', 'expires_in': tokens.lifetime()}
+
+class TokenObtainView(APIView):
+    """
+    Exchange a username and password for a bearer token
+    """
+    permission_classes = [permissions.AllowAny]
+    authentication_classes = []
+
+    def post(self, request):
+        serializer = TokenObtainSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        user = authenticate(request, **serializer.validated_data)
+        if user is None:
+            return Response({'error': 'Invalid username or password.'}, status=status.HTTP_400_BAD_REQUEST)
+        return Response(token_response(user))
+
+class TokenRefreshView(APIView):
+    """
+    Exchange a token, expired or not, for a new one while it is within the refresh lifetime.
+    The old token is revoked and the new one carries the user's current roles.
+    """
+    permission_classes = [permissions.AllowAny]
+    authentication_classes = []
+
+    def post(self, request):
+        serializer = TokenRefreshSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        try:
+            claims = tokens.read(serializer.validated_data['token'], max_age=tokens.refresh_lifetime())
+            user = User.objects.filter(pk=claims['id'], is_active=True).first()
+            if user is None:
+                raise AuthenticationFailed('User inactive or deleted.')
+            # The unique token id lets only one of concurrent refreshes of a token through
+            with transaction.atomic():
+                tokens.revoke(claims)
+        except AuthenticationFailed as exc:
+            return Response({'error': exc.detail}, status=status.HTTP_401_UNAUTHORIZED)
+        return Response(token_response(user))
+
+class TokenRevokeView(APIView):
+    """
+    Revoke the bearer token of the request, or with `all` every token of the user
+    """
+    permission_classes = [permissions.IsAuthenticated]
+
+    def post(self, request):
+        serializer = TokenRevokeSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        if serializer.validated_data['all']:
+            tokens.revoke_user(request.user.pk)
+        elif isinstance(request.auth, dict):
+            tokens.revoke(request.auth)
+        else:
+            return Response(
+                {'error': 'Authenticate with the bearer token to revoke, or pass "all": true.'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        return Response(status=status.HTTP_204_NO_CONTENT)
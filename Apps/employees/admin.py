@@ -0,0 +1,49 @@
+from django import forms
+from django.contrib import admin
+from authentication.admin import LargeTableAdmin, ReadOnlyAdmin
+from . import hierarchy
+from .models import Department, Position, Employee, EmployeeHierarchy
+
+@admin.register(Department)
+class DepartmentAdmin(admin.ModelAdmin):
+    list_display = ['name', 'description']
+    search_fields = ['name']
+    ordering = ['name']
+
+@admin.register(Position)
+class PositionAdmin(admin.ModelAdmin):
+    list_display = ['name', 'department']
+    # __str__ shows the department
+    list_select_related = ['department']
+    list_filter = ['department']
+    search_fields = ['name', 'department__name']
+    autocomplete_fields = ['department']
+    ordering = ['name', 'id']
+
+class EmployeeAdminForm(forms.ModelForm):
+    class Meta:
+        model = Employee
+        fields = '__all__'
+
+    def clean_reports_to(self):
+        manager = self.cleaned_data.get('reports_to')
+        if manager is not None and self.instance.pk is not None and hierarchy.is_below(manager.pk, self.instance.pk):
+            raise forms.ValidationError('An employee cannot report to themselves or to someone below them.')
+        return manager
+
+@admin.register(Employee)
+class EmployeeAdmin(LargeTableAdmin):
+    form = EmployeeAdminForm
+    list_display = ['__str__', 'username', 'join_date', 'department', 'position', 'reports_to']
+    list_select_related = ['user', 'department', 'position__department', 'reports_to__user']
+    list_filter = ['department']
+    search_fields = ['user__username', 'user__first_name', 'user__last_name', 'user__email']
+    raw_id_fields = ['user']
+    autocomplete_fields = ['department', 'position', 'reports_to']
+
+@admin.register(EmployeeHierarchy)
+class EmployeeHierarchyAdmin(LargeTableAdmin, ReadOnlyAdmin):
+    list_display = ['ancestor', 'descendant', 'depth']
+    list_select_related = ['ancestor__user', 'descendant__user']
+    raw_id_fields = ['ancestor', 'descendant']
+    ordering = ['ancestor_id', 'depth', 'descendant_id']
@@ -3,4 +3,7 @@ from django.apps import AppConfig
 class EmployeesConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'employees'
-    verbose_name = 'Employees' 
\ No newline at end of file
+    verbose_name = 'Employees'
+
+    def ready(self):
+        from . import signals  # noqa: F401
@@ -0,0 +1,140 @@
+"""
+Full-text employee search.
+
+Each employee has one row in `employees_employee_search` holding the words
+of their username, names, email and phone number:
+
+* on SQLite an FTS5 virtual table (rowid = employee id) with prefix indexes,
+* on PostgreSQL a weighted tsvector column with a GIN index.
+
+Rows are rebuilt with a single INSERT ... SELECT whenever an employee or the
+user behind one is saved (see employees.signals), so a type-ahead query is
+one index lookup ranked by relevance instead of a scan of the directory.
+Other backends fall back to icontains filters.
+"""
+import re
+from django.contrib.auth import get_user_model
+from django.db import connection, transaction
+from django.db.models import Q
+from .models import Employee
+
+User = get_user_model()
+
+TABLE = 'employees_employee_search'
+# User fields copied into the index; saving a user without touching these skips reindexing
+USER_FIELDS = {'username', 'first_name', 'last_name', 'email'}
+MAX_TERMS = 8
+
+_SELECT = {
+    'sqlite': (
+        "SELECT e.id, u.username, u.first_name, u.last_name, u.email, "
+        # Also index the phone number's digits run together, so "5550" finds "555-0100"
+        "e.phone_number || ' ' || replace(replace(replace(replace(replace("
+        "e.phone_number, '-', ''), ' ', ''), '+', ''), '(', ''), ')', '') "
+    ),
+    'postgresql': (
+        "SELECT e.id, "
+        "setweight(to_tsvector('simple', u.username || ' ' || u.first_name || ' ' || u.last_name), 'A') || "
+        "setweight(to_tsvector('simple', u.email), 'B') || "
+        "setweight(to_tsvector('simple', e.phone_number || ' ' || regexp_replace(e.phone_number, '\\D', '', 'g')), 'C') "
+    ),
+}
+_INSERT = {
+    'sqlite': f'INSERT INTO {TABLE} (rowid, username, first_name, last_name, email, phone_number) ',
+    'postgresql': f'INSERT INTO {TABLE} (employee_id, document) ',
+}
+_KEY = {'sqlite': 'rowid', 'postgresql': 'employee_id'}
+# (match, order) halves of the search query; a restriction to some employees goes in between
+_SEARCH = {
+    # bm25 weights follow the column order: names count more than email and phone
+    'sqlite': (
+        f'SELECT rowid FROM {TABLE} WHERE {TABLE} MATCH %s',
+        f'ORDER BY bm25({TABLE}, 10, 5, 5, 2, 1) LIMIT %s',
+    ),
+    'postgresql': (
+        f"SELECT employee_id FROM {TABLE}, to_tsquery('simple', %s) query WHERE document @@ query",
+        'ORDER BY ts_rank(document, query) DESC, employee_id LIMIT %s',
+    ),
+}
+
+def is_supported():
+    return connection.vendor in _SELECT
+
+def terms(query):
+    """The words of a search query, lower-cased, as used for prefix matching"""
+    return re.findall(r'\w+', query.lower())[:MAX_TERMS]
+
+def _source():
+    return (
+        f'FROM {Employee._meta.db_table} e JOIN {User._meta.db_table} u ON u.id = e.user_id'
+    )
+
+def _in(column, values):
+    return f'{column} IN ({", ".join(["%s"] * len(values))})', list(values)
+
+def reindex(employee_ids=(), user_ids=()):
+    """Rebuild the index rows of the given employees, and of the employees of the given users"""
+    if not is_supported():
+        return
+    vendor = connection.vendor
+    for column, values in (('e.id', list(employee_ids)), ('e.user_id', list(user_ids))):
+        for start in range(0, len(values), 500):
+            condition, params = _in(column, values[start:start + 500])
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    f'DELETE FROM {TABLE} WHERE {_KEY[vendor]} IN (SELECT e.id {_source()} WHERE {condition})',
+                    params,
+                )
+                cursor.execute(f'{_INSERT[vendor]}{_SELECT[vendor]}{_source()} WHERE {condition}', params)
+
+def remove(employee_ids):
+    if not is_supported() or not employee_ids:
+        return
+    condition, params = _in(_KEY[connection.vendor], employee_ids)
+    with connection.cursor() as cursor:
+        cursor.execute(f'DELETE FROM {TABLE} WHERE {condition}', params)
+
+def rebuild():
+    """Rebuild the whole index and return the number of employees indexed"""
+    if not is_supported():
+        return 0
+    vendor = connection.vendor
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.execute(f'DELETE FROM {TABLE}')
+        cursor.execute(f'{_INSERT[vendor]}{_SELECT[vendor]}{_source()}')
+        return cursor.rowcount
+
+def search_ids(query, limit=20, within=None):
+    """
+    Ids of the employees matching every word of `query` as a prefix, best
+    match first. `within`, a subquery of employee ids, is applied before the limit.
+    """
+    words = terms(query)
+    if not words:
+        return []
+    vendor = connection.vendor
+    if vendor == 'sqlite':
+        expression = ' '.join(f'"{word}"*' for word in words)
+    elif vendor == 'postgresql':
+        expression = ' & '.join(f'{word}:*' for word in words)
+    else:
+        condition = Q()
+        for word in words:
+            condition &= (
+                Q(user__username__icontains=word) | Q(user__first_name__icontains=word)
+                | Q(user__last_name__icontains=word) | Q(user__email__icontains=word)
+                | Q(phone_number__icontains=word)
+            )
+        employees = Employee.objects.filter(condition)
+        if within is not None:
+            employees = employees.filter(pk__in=within)
+        return list(employees.values_list('id', flat=True)[:limit])
+    match, order = _SEARCH[vendor]
+    params = [expression]
+    if within is not None:
+        subquery, subquery_params = within.query.sql_with_params()
+        match = f'{match} AND {_KEY[vendor]} IN ({subquery})'
+        params += subquery_params
+    with connection.cursor() as cursor:
+        cursor.execute(f'{match} {order}', [*params, limit])
+        return [row[0] for row in cursor.fetchall()]
@@ -0,0 +1,152 @@
+"""
+Reporting hierarchy.
+
+`EmployeeHierarchy` materializes `Employee.reports_to` as a closure table:
+one row per (manager, employee below them) at any depth, and one row per
+employee paired with themselves. Everyone a manager can see is then a single
+range scan on the (ancestor, descendant) index, joined to the queried table,
+instead of a recursive walk down the reports.
+
+Moving an employee only rewrites the rows that link their subtree to the
+managers above it: the paths to the old managers are deleted and the paths
+to the new ones inserted; the rows inside the subtree stay as they are.
+"""
+import itertools
+from django.db import transaction
+from django.utils import timezone
+from .models import Employee, EmployeeHierarchy
+
+def subtree(employee_id):
+    """Ids of the employee and everyone below them, as a subquery"""
+    return EmployeeHierarchy.objects.filter(ancestor_id=employee_id).values('descendant_id')
+
+def ancestors(employee_id):
+    """Ids of the employee and everyone above them, as a subquery"""
+    return EmployeeHierarchy.objects.filter(descendant_id=employee_id).values('ancestor_id')
+
+def is_below(employee_id, manager_id):
+    """Whether the employee is the manager or somewhere below them"""
+    return EmployeeHierarchy.objects.filter(ancestor_id=manager_id, descendant_id=employee_id).exists()
+
+def attach(employee_id, manager_id=None):
+    """Add the rows of a new employee with no reports of their own"""
+    rows = [EmployeeHierarchy(ancestor_id=employee_id, descendant_id=employee_id, depth=0)]
+    if manager_id is not None:
+        rows += [
+            EmployeeHierarchy(ancestor_id=ancestor_id, descendant_id=employee_id, depth=depth + 1)
+            for ancestor_id, depth in EmployeeHierarchy.objects.filter(descendant_id=manager_id).values_list(
+                'ancestor_id', 'depth'
+            )
+        ]
+    EmployeeHierarchy.objects.bulk_create(rows)
+
+def attach_many(employee_ids, manager_id=None):
+    """Add the rows of new employees with no reports of their own (bulk creates send no signals)"""
+    above = []
+    if manager_id is not None:
+        above = list(EmployeeHierarchy.objects.filter(descendant_id=manager_id).values_list('ancestor_id', 'depth'))
+    rows = []
+    for pk in employee_ids:
+        rows.append(EmployeeHierarchy(ancestor_id=pk, descendant_id=pk, depth=0))
+        rows += [EmployeeHierarchy(ancestor_id=ancestor_id, descendant_id=pk, depth=depth + 1) for ancestor_id, depth in above]
+    EmployeeHierarchy.objects.bulk_create(rows, batch_size=1000)
+
+def move(employee_id, manager_id, batch_size=1000):
+    """
+    Make an employee, with everyone below them, report to another manager (or to nobody)
+    """
+    if manager_id is not None and is_below(manager_id, employee_id):
+        raise ValueError('An employee cannot report to themselves or to someone below them')
+    with transaction.atomic():
+        EmployeeHierarchy.objects.filter(descendant_id__in=subtree(employee_id)).exclude(
+            ancestor_id__in=subtree(employee_id)
+        ).delete()
+        if manager_id is None:
+            return
+        above = list(EmployeeHierarchy.objects.filter(descendant_id=manager_id).values_list('ancestor_id', 'depth'))
+        below = list(EmployeeHierarchy.objects.filter(ancestor_id=employee_id).values_list('descendant_id', 'depth'))
+        EmployeeHierarchy.objects.bulk_create(
+            (
+                EmployeeHierarchy(ancestor_id=ancestor_id, descendant_id=descendant_id, depth=up + down + 1)
+                for (ancestor_id, up), (descendant_id, down) in itertools.product(above, below)
+            ),
+            batch_size=batch_size,
+        )
+
+def detach(employee_id):
+    """
+    Cut the paths that run through an employee about to be deleted; their
+    reports become top-level, matching reports_to's SET_NULL
+    """
+    EmployeeHierarchy.objects.filter(
+        descendant_id__in=subtree(employee_id), ancestor_id__in=ancestors(employee_id)
+    ).delete()
+
+def rebuild(batch_size=1000):
+    """Recompute the whole closure from reports_to and return the number of rows written"""
+    managers = dict(Employee.objects.order_by().values_list('id', 'reports_to_id'))
+    rows = []
+    for employee_id in managers:
+        current, depth, seen = employee_id, 0, set()
+        # Walk up the chain; a cycle written behind the model's back ends the walk
+        while current is not None and current not in seen:
+            seen.add(current)
+            rows.append(EmployeeHierarchy(ancestor_id=current, descendant_id=employee_id, depth=depth))
+            current, depth = managers.get(current), depth + 1
+    with transaction.atomic():
+        EmployeeHierarchy.objects.all().delete()
+        EmployeeHierarchy.objects.bulk_create(rows, batch_size=batch_size)
+    return len(rows)
+
+def assign_managers(managers, batch_size=1000):
+    """
+    Set reports_to for many employees at once from {employee id: manager id
+    or None}, then rebuild the closure. Raises ValueError, writing nothing,
+    if an employee would end up reporting to themselves or to someone below them.
+    """
+    chain = dict(Employee.objects.order_by().values_list('id', 'reports_to_id'))
+    chain.update(managers)
+    for employee_id in managers:
+        current, seen = chain[employee_id], {employee_id}
+        while current is not None:
+            if current in seen:
+                raise ValueError(f'Employee {employee_id} would report to themselves or to someone below them')
+            seen.add(current)
+            current = chain.get(current)
+    now = timezone.now()
+    with transaction.atomic():
+        Employee.objects.bulk_update(
+            [Employee(pk=pk, reports_to_id=manager_id, updated_at=now) for pk, manager_id in managers.items()],
+            ['reports_to', 'updated_at'],
+            batch_size=batch_size,
+        )
+        rebuild(batch_size)
+
+def visible_employees(user):
+    """
+    Subquery of the employee ids a manager may see: their own subtree. None
+    means no restriction: staff, and managers without the employee role, who
+    have no place in the hierarchy.
+    """
+    if user.is_staff or not user.is_employee:
+        return None
+    # Joined on the manager's user id so scoping costs no extra query
+    return EmployeeHierarchy.objects.filter(ancestor__user=user).values('descendant_id')
+
+def default_manager(user):
+    """
+    Id of the employee that what `user` creates reports to: the manager's own
+    record when their view is limited to their subtree, so new employees stay
+    visible to them; None for staff and managers without an employee record.
+    """
+    if visible_employees(user) is None:
+        return None
+    return Employee.objects.filter(user=user).values_list('id', flat=True).first()
+
+def scope(queryset, user, field='employee'):
+    """Narrow a queryset to the rows whose `field` is an employee visible to the manager `user`"""
+    visible = visible_employees(user)
+    if visible is None:
+        return queryset
+    lookup = 'pk__in' if field == 'pk' else f'{field}_id__in'
+    return queryset.filter(**{lookup: visible})
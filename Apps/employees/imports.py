@@ -0,0 +1,166 @@
+"""
+Bulk employee import.
+
+A file of employees is validated row by row without touching the database,
+then checked for taken usernames and emails with one query per column for
+the whole file. Passwords, which cost a full PBKDF2 run each, are hashed
+across a process pool, and users and employees are written with bulk_create
+in chunks. Every row gets an entry in the report: created, or the errors that
+kept it out.
+"""
+import csv
+import io
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.db import IntegrityError, transaction
+from . import fulltext, hierarchy, stats
+from .models import Employee
+from .serializers import EmployeeImportRowSerializer
+
+User = get_user_model()
+
+IMPORT_FORMATS = ('csv', 'json')
+# Largest file the API imports: every password costs a full PBKDF2 run inside
+# the request, so larger files go through the import_employees command
+MAX_ROWS = 25
+# Largest file the API validates with ?dry_run=true, which hashes nothing
+MAX_DRY_RUN_ROWS = 10000
+# Below this many passwords per worker, starting the pool costs more than it saves
+MIN_PASSWORDS_PER_WORKER = 8
+
+def read_rows(source, import_format):
+    """
+    Parse a CSV (with a header line) or JSON (a list of objects) file into a list of dicts.
+    `source` is a binary or text file object.
+    """
+    if isinstance(source.read(0), bytes):
+        source = io.TextIOWrapper(source, encoding='utf-8-sig')
+    if import_format == 'csv':
+        return [dict(row) for row in csv.DictReader(source)]
+    rows = json.load(source)
+    if not isinstance(rows, list) or not all(isinstance(row, dict) for row in rows):
+        raise ValueError('A JSON import must be a list of objects')
+    return rows
+
+def _setup_worker():
+    # Workers started with spawn/forkserver need the app registry for the hashers
+    import django
+    django.setup()
+
+def hash_passwords(passwords, workers=None):
+    """Hash passwords in parallel across `workers` processes (default: one per core)"""
+    workers = workers or os.cpu_count() or 1
+    workers = min(workers, len(passwords) // MIN_PASSWORDS_PER_WORKER)
+    if workers <= 1:
+        return [make_password(password) for password in passwords]
+    with ProcessPoolExecutor(max_workers=workers, initializer=_setup_worker) as executor:
+        return list(executor.map(make_password, passwords, chunksize=max(len(passwords) // (workers * 4), 1)))
+
+def _taken(column, values, chunk_size=1000):
+    """The values already used in a User column, queried in chunks"""
+    values = list(values)
+    taken = set()
+    for start in range(0, len(values), chunk_size):
+        lookup = {f'{column}__in': values[start:start + chunk_size]}
+        taken.update(User.objects.filter(**lookup).values_list(column, flat=True))
+    return taken
+
+def validate_rows(rows):
+    """
+    Return ({row number: validated data}, {row number: errors}), numbering rows from 1
+    """
+    valid = {}
+    errors = {}
+    for number, row in enumerate(rows, start=1):
+        serializer = EmployeeImportRowSerializer(data=row)
+        if serializer.is_valid():
+            valid[number] = serializer.validated_data
+        else:
+            errors[number] = serializer.errors
+
+    # Duplicates inside the file, then values already in the database
+    for column, message in (('username', 'This username is already taken.'),
+                            ('email', 'This email is already registered.')):
+        seen = {}
+        for number, data in list(valid.items()):
+            if data[column] in seen:
+                errors[number] = {column: [f'Same {column} as row {seen[data[column]]}.']}
+                del valid[number]
+            else:
+                seen[data[column]] = number
+        taken = _taken(column, seen)
+        for number, data in list(valid.items()):
+            if data[column] in taken:
+                errors[number] = {column: [message]}
+                del valid[number]
+    return valid, errors
+
+def _insert(chunk, reports_to=None):
+    """
+    Insert users and employees for [(row number, data, password hash)] in one
+    transaction, reporting to the employee id `reports_to` if given
+    """
+    with transaction.atomic():
+        users = User.objects.bulk_create([
+            User(
+                username=data['username'], email=data['email'], password=password,
+                first_name=data['first_name'], last_name=data['last_name'], is_employee=True,
+            )
+            for _, data, password in chunk
+        ])
+        if any(user.pk is None for user in users):
+            # Backends that cannot return ids from a bulk insert
+            ids = dict(User.objects.filter(username__in=[user.username for user in users]).values_list('username', 'id'))
+            for user in users:
+                user.pk = ids[user.username]
+        employees = Employee.objects.bulk_create([
+            Employee(
+                user=user, join_date=data['join_date'], phone_number=data['phone_number'],
+                username_sort=user.username, reports_to_id=reports_to,
+            )
+            for user, (_, data, _) in zip(users, chunk)
+        ])
+        if any(employee.pk is None for employee in employees):
+            ids = dict(Employee.objects.filter(user__in=users).values_list('user_id', 'id'))
+            for employee in employees:
+                employee.pk = ids[employee.user_id]
+        # bulk_create neither calls save() nor sends signals, so add the hierarchy and search rows here
+        hierarchy.attach_many([employee.pk for employee in employees], reports_to)
+        fulltext.reindex(employee_ids=[employee.pk for employee in employees])
+        stats.invalidate()
+
+def import_employees(rows, workers=None, batch_size=500, dry_run=False, reports_to=None):
+    """
+    Create an employee and user for every valid row, reporting to the
+    employee id `reports_to` if given, and return the report:
+    {'total': ..., 'created': ..., 'errors': [{'row': number, 'errors': {...}}, ...]}
+    """
+    valid, errors = validate_rows(rows)
+    created = 0
+    if valid and not dry_run:
+        numbers = list(valid)
+        hashes = hash_passwords([valid[number]['password'] for number in numbers], workers)
+        prepared = [(number, valid[number], password) for number, password in zip(numbers, hashes)]
+        for start in range(0, len(prepared), batch_size):
+            chunk = prepared[start:start + batch_size]
+            try:
+                _insert(chunk, reports_to)
+                created += len(chunk)
+            except IntegrityError:
+                # A username was taken since validation; find out which rows row by row
+                for row in chunk:
+                    try:
+                        _insert([row], reports_to)
+                        created += 1
+                    except IntegrityError:
+                        errors[row[0]] = {'username': ['This username is already taken.']}
+
+    return {
+        'total': len(rows),
+        'created': len(valid) if dry_run else created,
+        'dry_run': dry_run,
+        'errors': [{'row': number, 'errors': errors[number]} for number in sorted(errors)],
+    }
@@ -0,0 +1,32 @@
+import csv
+from django.core.management.base import BaseCommand, CommandError
+from employees.hierarchy import assign_managers
+from employees.models import Employee
+
+class Command(BaseCommand):
+    help = (
+        'Set who employees report to from a CSV file with "employee" and "manager" columns '
+        '(usernames; an empty manager makes the employee report to nobody)'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='CSV file with a header line')
+
+    def handle(self, *args, **options):
+        try:
+            with open(options['path'], encoding='utf-8-sig', newline='') as source:
+                rows = [(row['employee'].strip(), (row['manager'] or '').strip()) for row in csv.DictReader(source)]
+        except (OSError, ValueError, KeyError, csv.Error) as exc:
+            raise CommandError(f'Could not read {options["path"]}: {exc}')
+
+        usernames = {name for row in rows for name in row if name}
+        ids = dict(Employee.objects.filter(user__username__in=usernames).values_list('user__username', 'id'))
+        unknown = sorted(usernames - set(ids))
+        if unknown:
+            raise CommandError(f'No employee with username: {", ".join(unknown)}')
+
+        try:
+            assign_managers({ids[employee]: ids.get(manager) for employee, manager in rows})
+        except ValueError as exc:
+            raise CommandError(str(exc))
+        self.stdout.write(self.style.SUCCESS(f'Updated the manager of {len(rows)} employees'))
@@ -0,0 +1,37 @@
+import csv
+import json
+import os
+import time
+from django.core.management.base import BaseCommand, CommandError
+from employees.imports import IMPORT_FORMATS, import_employees, read_rows
+
+class Command(BaseCommand):
+    help = 'Create employees and their user accounts from a CSV or JSON file'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='CSV file with a header line, or JSON list of objects')
+        parser.add_argument('--format', choices=IMPORT_FORMATS, help='Default: from the file extension')
+        parser.add_argument('--workers', type=int, help='Processes hashing passwords (default: one per core)')
+        parser.add_argument('--batch-size', type=int, default=500, help='Rows per bulk insert')
+        parser.add_argument('--dry-run', action='store_true', help='Only validate the file')
+
+    def handle(self, *args, **options):
+        import_format = options['format'] or os.path.splitext(options['path'])[1].lstrip('.').lower()
+        if import_format not in IMPORT_FORMATS:
+            raise CommandError(f'Pass --format, one of: {", ".join(IMPORT_FORMATS)}')
+        try:
+            with open(options['path'], 'rb') as source:
+                rows = read_rows(source, import_format)
+        except (OSError, ValueError, csv.Error) as exc:
+            raise CommandError(f'Could not read {options["path"]}: {exc}')
+
+        started = time.monotonic()
+        report = import_employees(
+            rows, workers=options['workers'], batch_size=options['batch_size'], dry_run=options['dry_run']
+        )
+        for error in report['errors']:
+            self.stderr.write(f'Row {error["row"]}: {json.dumps(error["errors"])}')
+        verb = 'Would create' if options['dry_run'] else 'Created'
+        self.stdout.write(self.style.SUCCESS(
+            f'{verb} {report["created"]} of {report["total"]} employees in {time.monotonic() - started:.1f}s'
+        ))
@@ -0,0 +1,9 @@
+from django.core.management.base import BaseCommand
+from employees.hierarchy import rebuild
+
+class Command(BaseCommand):
+    help = 'Rebuild the reporting hierarchy closure table from Employee.reports_to'
+
+    def handle(self, *args, **options):
+        rows = rebuild()
+        self.stdout.write(self.style.SUCCESS(f'Wrote {rows} hierarchy rows'))
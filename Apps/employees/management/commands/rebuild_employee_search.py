@@ -0,0 +1,9 @@
+from django.core.management.base import BaseCommand
+from employees.fulltext import rebuild
+
+class Command(BaseCommand):
+    help = 'Rebuild the full-text employee search index'
+
+    def handle(self, *args, **options):
+        indexed = rebuild()
+        self.stdout.write(self.style.SUCCESS(f'Indexed {indexed} employees'))
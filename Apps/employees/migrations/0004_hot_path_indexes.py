@@ -0,0 +1,21 @@
+# Generated by Django 5.2 on 2026-10-18 16:11
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        (
+            "employees",
+            "0002_remove_employee_address_remove_employee_department_and_more",
+        ),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="employee",
+            index=models.Index(fields=["-join_date"], name="employee_join_date_idx"),
+        ),
+    ]
@@ -0,0 +1,46 @@
+# Generated by Django 5.2 on 2026-10-18 16:59
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery
+
+
+def copy_usernames(apps, schema_editor):
+    Employee = apps.get_model("employees", "Employee")
+    User = apps.get_model(*settings.AUTH_USER_MODEL.split("."))
+    Employee.objects.update(
+        username_sort=Subquery(
+            User.objects.filter(pk=OuterRef("user_id")).values("username")[:1]
+        )
+    )
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("employees", "0004_hot_path_indexes"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name="employee",
+            options={"ordering": ["-join_date", "username_sort", "id"]},
+        ),
+        migrations.RemoveIndex(
+            model_name="employee",
+            name="employee_join_date_idx",
+        ),
+        migrations.AddField(
+            model_name="employee",
+            name="username_sort",
+            field=models.CharField(default="", editable=False, max_length=150),
+        ),
+        migrations.RunPython(copy_usernames, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name="employee",
+            index=models.Index(
+                fields=["-join_date", "username_sort", "id"],
+                name="employee_join_username_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,48 @@
+from django.db import migrations
+
+SQLITE = [
+    "CREATE VIRTUAL TABLE employees_employee_search USING fts5("
+    "username, first_name, last_name, email, phone_number, "
+    "tokenize = 'unicode61 remove_diacritics 2', prefix = '2 3')",
+    "INSERT INTO employees_employee_search (rowid, username, first_name, last_name, email, phone_number) "
+    "SELECT e.id, u.username, u.first_name, u.last_name, u.email, "
+    "e.phone_number || ' ' || replace(replace(replace(replace(replace("
+    "e.phone_number, '-', ''), ' ', ''), '+', ''), '(', ''), ')', '') "
+    "FROM employees_employee e JOIN authentication_user u ON u.id = e.user_id",
+]
+
+POSTGRESQL = [
+    "CREATE TABLE employees_employee_search ("
+    "employee_id bigint PRIMARY KEY, "
+    "document tsvector NOT NULL)",
+    "CREATE INDEX employees_employee_search_idx ON employees_employee_search USING GIN (document)",
+    "INSERT INTO employees_employee_search (employee_id, document) "
+    "SELECT e.id, "
+    "setweight(to_tsvector('simple', u.username || ' ' || u.first_name || ' ' || u.last_name), 'A') || "
+    "setweight(to_tsvector('simple', u.email), 'B') || "
+    "setweight(to_tsvector('simple', e.phone_number || ' ' || regexp_replace(e.phone_number, '\\D', '', 'g')), 'C') "
+    "FROM employees_employee e JOIN authentication_user u ON u.id = e.user_id",
+]
+
+
+def create_search_index(apps, schema_editor):
+    statements = {"sqlite": SQLITE, "postgresql": POSTGRESQL}.get(
+        schema_editor.connection.vendor, []
+    )
+    for statement in statements:
+        schema_editor.execute(statement, params=None)
+
+
+def drop_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor in ("sqlite", "postgresql"):
+        schema_editor.execute("DROP TABLE IF EXISTS employees_employee_search")
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("employees", "0005_employee_username_sort"),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
@@ -0,0 +1,105 @@
+# Generated by Django 5.2 on 2026-10-18 17:10
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def add_self_rows(apps, schema_editor):
+    # Nobody reports to anyone yet, so every employee is only their own ancestor
+    Employee = apps.get_model("employees", "Employee")
+    EmployeeHierarchy = apps.get_model("employees", "EmployeeHierarchy")
+    EmployeeHierarchy.objects.bulk_create(
+        (
+            EmployeeHierarchy(ancestor_id=pk, descendant_id=pk, depth=0)
+            for pk in Employee.objects.values_list("id", flat=True).iterator()
+        ),
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("employees", "0006_employee_search"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="employee",
+            name="department",
+            field=models.ForeignKey(
+                blank=True,
+                null=True,
+                on_delete=django.db.models.deletion.SET_NULL,
+                related_name="employees",
+                to="employees.department",
+            ),
+        ),
+        migrations.AddField(
+            model_name="employee",
+            name="position",
+            field=models.ForeignKey(
+                blank=True,
+                null=True,
+                on_delete=django.db.models.deletion.SET_NULL,
+                related_name="employees",
+                to="employees.position",
+            ),
+        ),
+        migrations.AddField(
+            model_name="employee",
+            name="reports_to",
+            field=models.ForeignKey(
+                blank=True,
+                null=True,
+                on_delete=django.db.models.deletion.SET_NULL,
+                related_name="reports",
+                to="employees.employee",
+            ),
+        ),
+        migrations.CreateModel(
+            name="EmployeeHierarchy",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("depth", models.PositiveIntegerField()),
+                (
+                    "ancestor",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="descendant_links",
+                        to="employees.employee",
+                    ),
+                ),
+                (
+                    "descendant",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="ancestor_links",
+                        to="employees.employee",
+                    ),
+                ),
+            ],
+            options={
+                "indexes": [
+                    models.Index(
+                        fields=["descendant", "ancestor"],
+                        name="hierarchy_descendant_idx",
+                    )
+                ],
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("ancestor", "descendant"),
+                        name="unique_employee_hierarchy",
+                    )
+                ],
+            },
+        ),
+        migrations.RunPython(add_self_rows, migrations.RunPython.noop),
+    ]
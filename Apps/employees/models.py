@@ -1,4 +1,4 @@
-from django.db import models
+from django.db import models, transaction
 from authentication.models import User
 
 class Department(models.Model):
@@ -20,13 +20,50 @@ class Employee(models.Model):
     user = models.OneToOneField(User, on_delete=models.CASCADE, related_name='employee')
     join_date = models.DateField()
     phone_number = models.CharField(max_length=15)
+    # Copy of user.username so the default ordering can be read from an index on this table;
+    # kept in sync by save() and a post_save handler on User
+    username_sort = models.CharField(max_length=150, default='', editable=False)
+    department = models.ForeignKey(Department, on_delete=models.SET_NULL, null=True, blank=True, related_name='employees')
+    position = models.ForeignKey(Position, on_delete=models.SET_NULL, null=True, blank=True, related_name='employees')
+    # Direct manager; materialized into EmployeeHierarchy by save()
+    reports_to = models.ForeignKey('self', on_delete=models.SET_NULL, null=True, blank=True, related_name='reports')
+    # Also bumped when the user's name or email changes (see employees.signals)
+    updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
-        ordering = ['-join_date', 'user__username']  # Order by join date (newest first) and then username
+        ordering = ['-join_date', 'username_sort', 'id']  # Order by join date (newest first) and then username
+        indexes = [
+            models.Index(fields=['-join_date', 'username_sort', 'id'], name='employee_join_username_idx'),
+        ]
 
     def __str__(self):
         return f"{self.user.get_full_name()}"
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Remember the stored manager so save() only rewrites the hierarchy when it changes
+        instance._saved_reports_to_id = instance.__dict__.get('reports_to_id', models.DEFERRED)
+        return instance
+
+    def save(self, *args, **kwargs):
+        from .hierarchy import attach, move
+        self.username_sort = self.user.username
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None:
+            kwargs['update_fields'] = set(update_fields) | {'username_sort'}
+        adding = self._state.adding
+        moved = (update_fields is None or 'reports_to' in update_fields) and (
+            getattr(self, '_saved_reports_to_id', None) != self.reports_to_id
+        )
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+            if adding:
+                attach(self.pk, self.reports_to_id)
+            elif moved:
+                move(self.pk, self.reports_to_id)
+        self._saved_reports_to_id = self.reports_to_id
+
     @property
     def username(self):
         return self.user.username
@@ -41,4 +78,26 @@ class Employee(models.Model):
 
     @property
     def last_name(self):
-        return self.user.last_name 
\ No newline at end of file
+        return self.user.last_name 
+
+class EmployeeHierarchy(models.Model):
+    """
+    Closure of Employee.reports_to: one row per (manager, employee below them)
+    at any depth, plus each employee paired with themselves at depth 0
+    """
+    ancestor = models.ForeignKey(Employee, on_delete=models.CASCADE, related_name='descendant_links')
+    descendant = models.ForeignKey(Employee, on_delete=models.CASCADE, related_name='ancestor_links')
+    depth = models.PositiveIntegerField()
+
+    class Meta:
+        constraints = [
+            # Also the index behind "everyone under this manager"
+            models.UniqueConstraint(fields=['ancestor', 'descendant'], name='unique_employee_hierarchy'),
+        ]
+        indexes = [
+            # "Everyone above this employee", used when they move
+            models.Index(fields=['descendant', 'ancestor'], name='hierarchy_descendant_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.ancestor_id} > {self.descendant_id} ({self.depth})"
@@ -0,0 +1,11 @@
+"""
+Cached departments and positions (see authentication.reference).
+
+Positions are cached with their department, so a department change reloads
+both; employees.signals invalidates them on save and delete.
+"""
+from authentication.reference import ReferenceCache
+from .models import Department, Position
+
+departments = ReferenceCache('employees:departments', Department.objects.all())
+positions = ReferenceCache('employees:positions', Position.objects.select_related('department'))
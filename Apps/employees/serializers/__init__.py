@@ -1,9 +1,13 @@
 from .department import DepartmentSerializer
 from .position import PositionSerializer
 from .employee import EmployeeSerializer
+from .employee_import import EmployeeImportRowSerializer
+from .employee_search import EmployeeSearchQuerySerializer
 
 __all__ = [
     'DepartmentSerializer',
     'PositionSerializer',
-    'EmployeeSerializer'
+    'EmployeeSerializer',
+    'EmployeeImportRowSerializer',
+    'EmployeeSearchQuerySerializer'
 ] 
\ No newline at end of file
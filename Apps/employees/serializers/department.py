@@ -1,7 +1,8 @@
 from rest_framework import serializers
+from authentication.sparse import SparseFieldsMixin
 from ..models import Department
 
-class DepartmentSerializer(serializers.ModelSerializer):
+class DepartmentSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     class Meta:
         model = Department
         fields = ['id', 'name', 'description'] 
\ No newline at end of file
@@ -2,11 +2,17 @@ from rest_framework import serializers
 from django.contrib.auth import get_user_model
 from django.contrib.auth.password_validation import validate_password
 from django.db import IntegrityError
+from authentication.reference import CachedPrimaryKeyRelatedField
+from authentication.sparse import SparseFieldsMixin
+from .. import reference
+from .. import hierarchy
 from ..models import Employee
+from .department import DepartmentSerializer
+from .position import PositionSerializer
 
 User = get_user_model()
 
-class EmployeeSerializer(serializers.ModelSerializer):
+class EmployeeSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     username = serializers.CharField(write_only=True, required=False)
     email = serializers.EmailField(write_only=True, required=False)
     password = serializers.CharField(
@@ -28,16 +34,54 @@ class EmployeeSerializer(serializers.ModelSerializer):
     user_email = serializers.EmailField(source='user.email', read_only=True)
     user_first_name = serializers.CharField(source='user.first_name', read_only=True)
     user_last_name = serializers.CharField(source='user.last_name', read_only=True)
+    department = CachedPrimaryKeyRelatedField(reference.departments, required=False, allow_null=True)
+    position = CachedPrimaryKeyRelatedField(reference.positions, required=False, allow_null=True)
 
     class Meta:
         model = Employee
         fields = [
             'id', 'username', 'email', 'password', 'confirm_password',
             'first_name', 'last_name', 'join_date', 'phone_number',
-            'user_username', 'user_email', 'user_first_name', 'user_last_name'
+            'user_username', 'user_email', 'user_first_name', 'user_last_name',
+            'department', 'position', 'reports_to'
         ]
+        # ?expand= renders these as nested objects instead of ids
+        expandable_fields = {
+            'department': DepartmentSerializer,
+            'position': PositionSerializer,
+        }
+
+    @staticmethod
+    def setup_eager_loading(queryset):
+        """Join the user row that backs the user_* fields"""
+        return queryset.select_related('user')
+
+    def get_fields(self):
+        fields = super().get_fields()
+        request = self.context.get('request')
+        if 'reports_to' in fields and request is not None:
+            # A manager limited to their subtree can only pick a manager inside it
+            queryset = hierarchy.scope(Employee.objects.all(), request.user, field='pk')
+            if isinstance(self.instance, Employee) and self.instance.reports_to_id is not None:
+                # Resending the current manager is not a change
+                queryset = queryset | Employee.objects.filter(pk=self.instance.reports_to_id)
+            fields['reports_to'].queryset = queryset
+        return fields
+
+    def validate_reports_to(self, value):
+        if value is not None and self.instance is not None and hierarchy.is_below(value.pk, self.instance.pk):
+            raise serializers.ValidationError("An employee cannot report to themselves or to someone below them.")
+        request = self.context.get('request')
+        if (value is None and self.instance is not None and self.instance.reports_to_id is not None
+                and request is not None and hierarchy.default_manager(request.user) is not None):
+            raise serializers.ValidationError("Only staff can make an employee report to nobody.")
+        return value
 
     def validate(self, attrs):
+        # A position implies its department unless one is given
+        if attrs.get('position') is not None and 'department' not in attrs:
+            attrs['department'] = attrs['position'].department
+
         # Only validate password if it's being set
         if 'password' in attrs and 'confirm_password' in attrs:
             if attrs['password'] != attrs['confirm_password']:
@@ -66,6 +110,11 @@ class EmployeeSerializer(serializers.ModelSerializer):
             'is_employee': True,
         }
         validated_data.pop('confirm_password', None)  # Remove confirm_password as it's not needed
+        request = self.context.get('request')
+        if validated_data.get('reports_to') is None and request is not None:
+            # Placed under the manager creating them, who would not see them otherwise
+            validated_data['reports_to_id'] = hierarchy.default_manager(request.user)
+            validated_data.pop('reports_to', None)
         
         try:
             # Create user with proper password hashing
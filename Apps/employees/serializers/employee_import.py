@@ -0,0 +1,18 @@
+from rest_framework import serializers
+from django.contrib.auth.password_validation import validate_password
+from django.contrib.auth.validators import UnicodeUsernameValidator
+
+class EmployeeImportRowSerializer(serializers.Serializer):
+    """
+    One row of a bulk employee import.
+
+    Only checks the row on its own; uniqueness is checked for the whole file
+    at once by employees.imports.
+    """
+    username = serializers.CharField(max_length=150, validators=[UnicodeUsernameValidator()])
+    email = serializers.EmailField()
+    password = serializers.CharField(validators=[validate_password])
+    first_name = serializers.CharField(max_length=150)
+    last_name = serializers.CharField(max_length=150)
+    join_date = serializers.DateField()
+    phone_number = serializers.CharField(max_length=15)
@@ -0,0 +1,6 @@
+from rest_framework import serializers
+
+class EmployeeSearchQuerySerializer(serializers.Serializer):
+    """Query parameters of the employee type-ahead search"""
+    q = serializers.CharField(max_length=200)
+    limit = serializers.IntegerField(min_value=1, max_value=100, default=20)
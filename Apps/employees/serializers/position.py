@@ -1,15 +1,23 @@
 from rest_framework import serializers
-from ..models import Position, Department
+from authentication.reference import CachedPrimaryKeyRelatedField
+from authentication.sparse import SparseFieldsMixin
+from .. import reference
+from ..models import Position
 from .department import DepartmentSerializer
 
-class PositionSerializer(serializers.ModelSerializer):
+class PositionSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     department = DepartmentSerializer(read_only=True)
-    department_id = serializers.PrimaryKeyRelatedField(
-        queryset=Department.objects.all(),
+    department_id = CachedPrimaryKeyRelatedField(
+        reference.departments,
         source='department',
         write_only=True
     )
 
     class Meta:
         model = Position
-        fields = ['id', 'name', 'department', 'department_id', 'description'] 
\ No newline at end of file
+        fields = ['id', 'name', 'department', 'department_id', 'description'] 
+
+    @staticmethod
+    def setup_eager_loading(queryset):
+        """Join the department rendered by the nested DepartmentSerializer"""
+        return queryset.select_related('department')
\ No newline at end of file
@@ -0,0 +1,56 @@
+from django.contrib.auth import get_user_model
+from django.db.models.signals import post_delete, post_save, pre_delete
+from django.dispatch import receiver
+from django.utils import timezone
+from . import fulltext, hierarchy, reference, stats
+from .models import Department, Employee, Position
+
+@receiver(post_save, sender=get_user_model())
+def sync_username_sort(sender, instance, created, update_fields=None, **kwargs):
+    """Copy a renamed user's username to their employee record"""
+    if created or (update_fields is not None and 'username' not in update_fields):
+        return
+    Employee.objects.filter(user=instance).exclude(username_sort=instance.username).update(
+        username_sort=instance.username
+    )
+
+@receiver(post_save, sender=get_user_model())
+def reindex_user(sender, instance, created, update_fields=None, **kwargs):
+    """Refresh the search index of the user's employee record when a searchable field may have changed"""
+    if created or (update_fields is not None and not fulltext.USER_FIELDS & set(update_fields)):
+        return
+    fulltext.reindex(user_ids=[instance.pk])
+
+@receiver(post_save, sender=get_user_model())
+def touch_employee(sender, instance, created, update_fields=None, **kwargs):
+    """The employee representation shows the user's names and email, so its validators must change with them"""
+    if created or (update_fields is not None and not fulltext.USER_FIELDS & set(update_fields)):
+        return
+    Employee.objects.filter(user=instance).update(updated_at=timezone.now())
+
+@receiver(post_save, sender=Employee)
+def reindex_employee(sender, instance, **kwargs):
+    fulltext.reindex(employee_ids=[instance.pk])
+
+@receiver(post_delete, sender=Employee)
+def remove_employee(sender, instance, **kwargs):
+    fulltext.remove([instance.pk])
+
+@receiver(pre_delete, sender=Employee)
+def detach_employee(sender, instance, **kwargs):
+    """Unlink the employee's reports from the managers above before reports_to is nulled"""
+    hierarchy.detach(instance.pk)
+
+@receiver([post_save, post_delete], sender=Employee)
+@receiver([post_save, post_delete], sender=Position)
+@receiver([post_save, post_delete], sender=Department)
+def invalidate_stats(sender, **kwargs):
+    stats.invalidate()
+
+@receiver([post_save, post_delete], sender=Position)
+@receiver([post_save, post_delete], sender=Department)
+def invalidate_reference_data(sender, **kwargs):
+    """Positions are cached with their department, so a department change reloads both"""
+    if sender is Department:
+        reference.departments.invalidate()
+    reference.positions.invalidate()
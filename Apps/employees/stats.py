@@ -0,0 +1,97 @@
+"""
+Department statistics for the dashboard.
+
+Headcount, position occupancy and today's absences per department come from
+three grouped aggregates, one per table, instead of one query per department.
+The result is cached under a version token that is replaced, once the
+transaction commits, by every write that can change it: employees, positions
+and departments (see employees.signals) and leaves entering or leaving the
+approved status (see leaves.bookkeeping). The date is part of the key so the
+absences roll over at midnight on their own.
+
+Managers who only see their subtree get headcount and absences counted over
+it, uncached; positions are reference data and counted company-wide. When the
+cache is not shared by the workers (see authentication.caching) the
+statistics are computed on every request.
+"""
+import datetime
+import uuid
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Count, Q
+from authentication import caching
+from . import hierarchy
+from .models import Department, Employee, Position
+
+VERSION_KEY = 'employees:department-stats:version'
+TIMEOUT = 24 * 60 * 60
+
+def department_stats(today=None, employee_ids=None):
+    """
+    Per-department headcount, positions, open positions (nobody holds them)
+    and employees out on approved leave today, plus the employees with no
+    department. `employee_ids` (a subquery) limits the headcount and absences.
+    """
+    today = today or datetime.date.today()
+    out_today = Q(leaves__status='approved', leaves__start_date__lte=today, leaves__end_date__gte=today)
+    staff = Employee.objects.order_by()
+    if employee_ids is not None:
+        staff = staff.filter(pk__in=employee_ids)
+    employees = {
+        row['department_id']: row
+        for row in staff.values('department_id').annotate(
+            headcount=Count('id', distinct=True), out_today=Count('id', filter=out_today, distinct=True)
+        )
+    }
+    positions = {
+        row['department_id']: row
+        for row in Position.objects.order_by().values('department_id').annotate(
+            positions=Count('id', distinct=True), open_positions=Count('id', filter=Q(employees__isnull=True))
+        )
+    }
+
+    results = []
+    for department_id, name in Department.objects.order_by('name', 'id').values_list('id', 'name'):
+        staff = employees.get(department_id, {})
+        roles = positions.get(department_id, {})
+        results.append({
+            'department_id': department_id,
+            'department': name,
+            'headcount': staff.get('headcount', 0),
+            'positions': roles.get('positions', 0),
+            'open_positions': roles.get('open_positions', 0),
+            'out_today': staff.get('out_today', 0),
+        })
+    unassigned = employees.get(None, {})
+    return {
+        'date': today,
+        'results': results,
+        'unassigned': {
+            'headcount': unassigned.get('headcount', 0),
+            'out_today': unassigned.get('out_today', 0),
+        },
+    }
+
+def get_department_stats(user=None):
+    """
+    The statistics for today as seen by `user`, from the cache when nothing
+    changed since they were computed
+    """
+    visible = hierarchy.visible_employees(user) if user is not None else None
+    if visible is not None:
+        return department_stats(employee_ids=visible)
+    if not caching.is_shared():
+        # Another worker's invalidation would never reach this process's cache
+        return department_stats()
+    version = cache.get_or_set(VERSION_KEY, lambda: uuid.uuid4().hex, timeout=None)
+    today = datetime.date.today()
+    key = f'employees:department-stats:{version}:{today.isoformat()}'
+    stats = cache.get(key)
+    if stats is None:
+        stats = department_stats(today)
+        cache.set(key, stats, timeout=TIMEOUT)
+    return stats
+
+def invalidate():
+    """Make the next read recompute the statistics once the current transaction commits"""
+    transaction.on_commit(lambda: cache.set(VERSION_KEY, uuid.uuid4().hex, timeout=None))
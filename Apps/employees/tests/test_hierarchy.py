@@ -0,0 +1,178 @@
+import os
+import tempfile
+from io import StringIO
+from django.core.management import CommandError, call_command
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework.test import APIClient
+from rest_framework import status
+from authentication.tests.factories import EmployeeFactory, ManagerFactory
+from employees import hierarchy
+from employees.imports import import_employees
+from employees.models import Department, Employee, EmployeeHierarchy, Position
+from employees.tests.test_imports import make_row
+from leaves.tests.factories import LeaveFactory
+
+def closure():
+    return set(EmployeeHierarchy.objects.values_list('ancestor_id', 'descendant_id', 'depth'))
+
+class EmployeeHierarchyTest(TestCase):
+    def setUp(self):
+        # ceo > cto > dev, ceo > cfo
+        self.ceo = EmployeeFactory(user__is_manager=True)
+        self.cto = EmployeeFactory(reports_to=self.ceo, user__is_manager=True)
+        self.cfo = EmployeeFactory(reports_to=self.ceo, user__is_manager=True)
+        self.dev = EmployeeFactory(reports_to=self.cto)
+        self.client = APIClient()
+
+    def expected(self):
+        """The closure rebuilt from scratch, to compare the incremental one against"""
+        current = closure()
+        hierarchy.rebuild()
+        rebuilt = closure()
+        self.assertEqual(current, rebuilt)
+        return rebuilt
+
+    def test_closure_follows_reports_to(self):
+        ceo, cto, cfo, dev = (e.pk for e in (self.ceo, self.cto, self.cfo, self.dev))
+        self.assertEqual(closure(), {
+            (ceo, ceo, 0), (cto, cto, 0), (cfo, cfo, 0), (dev, dev, 0),
+            (ceo, cto, 1), (ceo, cfo, 1), (cto, dev, 1), (ceo, dev, 2),
+        })
+        self.assertEqual(set(Employee.objects.filter(pk__in=hierarchy.subtree(cto)).values_list('id', flat=True)), {cto, dev})
+
+    def test_moving_a_subtree_rewrites_only_its_links(self):
+        self.cto.reports_to = self.cfo
+        self.cto.save()
+        rows = self.expected()
+        self.assertIn((self.cfo.pk, self.dev.pk, 2), rows)
+        self.assertIn((self.ceo.pk, self.dev.pk, 3), rows)
+
+        self.cto.reports_to = None
+        self.cto.save()
+        rows = self.expected()
+        self.assertNotIn((self.ceo.pk, self.dev.pk, 3), rows)
+        self.assertIn((self.cto.pk, self.dev.pk, 1), rows)
+
+    def test_cycles_are_rejected(self):
+        with self.assertRaises(ValueError):
+            hierarchy.move(self.ceo.pk, self.dev.pk)
+        self.client.force_authenticate(user=ManagerFactory())
+        url = reverse('employee-detail', kwargs={'pk': self.cto.pk})
+        response = self.client.patch(url, {'reports_to': self.dev.pk}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('reports_to', response.data)
+
+    def test_deleting_a_manager_detaches_their_reports(self):
+        self.cto.delete()
+        self.dev.refresh_from_db()
+        self.assertIsNone(self.dev.reports_to)
+        self.assertEqual(self.expected(), closure())
+        self.assertFalse(hierarchy.is_below(self.dev.pk, self.ceo.pk))
+
+    def test_imported_employees_are_roots(self):
+        import_employees([make_row(1)], workers=1)
+        imported = Employee.objects.get(user__username='import1')
+        self.assertEqual(set(EmployeeHierarchy.objects.filter(descendant=imported).values_list('ancestor_id', flat=True)), {imported.pk})
+
+    def test_managers_see_their_subtree(self):
+        visible = LeaveFactory(employee=self.dev)
+        LeaveFactory(employee=self.cfo)
+        self.client.force_authenticate(user=self.cto.user)
+        response = self.client.get(reverse('employee-list'))
+        self.assertEqual({row['id'] for row in response.data['results']}, {self.cto.pk, self.dev.pk})
+        response = self.client.get(reverse('leave-list'))
+        self.assertEqual([row['id'] for row in response.data['results']], [visible.pk])
+        response = self.client.get(reverse('employee-detail', kwargs={'pk': self.cfo.pk}))
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+        # Managers without an employee record keep company-wide visibility
+        self.client.force_authenticate(user=ManagerFactory())
+        response = self.client.get(reverse('employee-list'))
+        self.assertEqual(len(response.data['results']), 4)
+
+    def test_position_sets_department(self):
+        department = Department.objects.create(name='Engineering')
+        position = Position.objects.create(name='Developer', department=department)
+        self.client.force_authenticate(user=ManagerFactory())
+        url = reverse('employee-detail', kwargs={'pk': self.dev.pk})
+        response = self.client.patch(url, {'position': position.pk}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['department'], department.pk)
+
+    def test_rebuild_command(self):
+        EmployeeHierarchy.objects.all().delete()
+        out = StringIO()
+        call_command('rebuild_employee_hierarchy', stdout=out)
+        self.assertIn('Wrote 8 hierarchy rows', out.getvalue())
+
+    def test_scoped_managers_create_and_import_below_themselves(self):
+        """Test that what a scoped manager adds reports to them, and that they cannot pick a manager outside their subtree"""
+        self.client.force_authenticate(user=self.cto.user)
+        data = {
+            'username': 'newemployee', 'email': 'new@example.com', 'password': 'Str0ng-pass-123',
+            'confirm_password': 'Str0ng-pass-123', 'first_name': 'New', 'last_name': 'Employee',
+            'join_date': '2024-01-01', 'phone_number': '1234567890',
+        }
+        response = self.client.post(reverse('employee-list'), data, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data['reports_to'], self.cto.pk)
+        self.assertTrue(hierarchy.is_below(response.data['id'], self.ceo.pk))
+
+        response = self.client.post(reverse('employee-bulk-import'), [make_row(1)], format='json')
+        self.assertEqual(response.data['created'], 1)
+        imported = Employee.objects.get(user__username='import1')
+        self.assertEqual(imported.reports_to_id, self.cto.pk)
+        self.assertEqual(self.expected(), closure())
+
+        url = reverse('employee-detail', kwargs={'pk': self.dev.pk})
+        response = self.client.patch(url, {'reports_to': self.cfo.pk}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        response = self.client.patch(url, {'reports_to': None}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        # The current manager may be sent back unchanged, even from outside the subtree
+        response = self.client.patch(reverse('employee-detail', kwargs={'pk': self.cto.pk}),
+                                     {'reports_to': self.ceo.pk, 'phone_number': '555'}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_search_is_scoped_before_the_limit(self):
+        for _ in range(5):
+            EmployeeFactory(reports_to=self.cfo, user__last_name='Quixote')
+        self.dev.user.last_name = 'Quixote'
+        self.dev.user.save()
+        self.client.force_authenticate(user=self.cto.user)
+        response = self.client.get(reverse('employee-search'), {'q': 'quixote', 'limit': 1})
+        self.assertEqual([row['id'] for row in response.data['results']], [self.dev.pk])
+
+    def test_summary_and_department_stats_are_scoped(self):
+        LeaveFactory(employee=self.dev)
+        LeaveFactory(employee=self.cfo)
+        LeaveFactory(employee=self.cfo)
+        self.client.force_authenticate(user=self.cto.user)
+        response = self.client.get(reverse('leave-summary'))
+        self.assertEqual(response.data['by_status']['pending'], 1)
+        response = self.client.get(reverse('department-stats'))
+        self.assertEqual(response.data['unassigned']['headcount'], 2)
+
+        self.client.force_authenticate(user=ManagerFactory())
+        response = self.client.get(reverse('department-stats'))
+        self.assertEqual(response.data['unassigned']['headcount'], 4)
+
+    def test_assign_managers_command(self):
+        fd, path = tempfile.mkstemp(suffix='.csv')
+        with os.fdopen(fd, 'w') as f:
+            f.write(f'employee,manager\n{self.dev.user.username},{self.cfo.user.username}\n{self.cto.user.username},\n')
+        self.addCleanup(os.remove, path)
+        call_command('assign_managers', path, stdout=StringIO())
+        self.dev.refresh_from_db()
+        self.cto.refresh_from_db()
+        self.assertEqual((self.dev.reports_to_id, self.cto.reports_to_id), (self.cfo.pk, None))
+        self.assertTrue(hierarchy.is_below(self.dev.pk, self.ceo.pk))
+        self.assertFalse(hierarchy.is_below(self.cto.pk, self.ceo.pk))
+
+        with open(path, 'w') as f:
+            f.write(f'employee,manager\n{self.ceo.user.username},{self.dev.user.username}\n')
+        with self.assertRaises(CommandError):
+            call_command('assign_managers', path, stdout=StringIO())
+        self.ceo.refresh_from_db()
+        self.assertIsNone(self.ceo.reports_to_id)
@@ -0,0 +1,126 @@
+import json
+import os
+import tempfile
+from io import StringIO
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import CommandError, call_command
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework.test import APIClient
+from rest_framework import status
+from authentication.tests.factories import EmployeeFactory, ManagerFactory
+from employees.imports import hash_passwords, import_employees
+from employees.models import Employee
+
+def make_row(n, **overrides):
+    row = {
+        'username': f'import{n}',
+        'email': f'import{n}@example.com',
+        'password': 'Str0ng-pass-123',
+        'first_name': 'Imported',
+        'last_name': f'Person{n}',
+        'join_date': '2025-01-06',
+        'phone_number': '5550100',
+    }
+    row.update(overrides)
+    return row
+
+class EmployeeImportTest(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.manager = ManagerFactory()
+        self.existing = EmployeeFactory()
+        self.import_url = reverse('employee-bulk-import')
+
+    def test_valid_rows_are_created_and_bad_rows_reported(self):
+        rows = [
+            make_row(1),
+            make_row(2, username=self.existing.user.username),
+            make_row(3, email='import1@example.com'),
+            make_row(4, join_date='not a date'),
+            make_row(5),
+        ]
+        report = import_employees(rows, workers=1)
+        self.assertEqual((report['total'], report['created']), (5, 2))
+        self.assertEqual([error['row'] for error in report['errors']], [2, 3, 4])
+        self.assertIn('username', report['errors'][0]['errors'])
+        self.assertIn('row 1', str(report['errors'][1]['errors']['email']))
+
+        user = Employee.objects.get(user__username='import5').user
+        self.assertTrue(user.is_employee)
+        self.assertTrue(user.check_password('Str0ng-pass-123'))
+
+    def test_queries_do_not_grow_with_rows(self):
+        """Test that uniqueness checks and inserts are set-based"""
+        with self.assertNumQueries(9):
+            import_employees([make_row(n) for n in range(3)], workers=1)
+        with self.assertNumQueries(9):
+            import_employees([make_row(n) for n in range(10, 40)], workers=1)
+        self.assertEqual(Employee.objects.filter(user__username__startswith='import').count(), 33)
+
+    def test_passwords_hashed_in_parallel(self):
+        hashes = hash_passwords([f'secret-{n}' for n in range(16)], workers=2)
+        self.assertEqual(len(set(hashes)), 16)
+        self.assertTrue(all(value.startswith('pbkdf2_sha256$') for value in hashes))
+
+    def test_dry_run_creates_nothing(self):
+        report = import_employees([make_row(1)], dry_run=True)
+        self.assertEqual(report['created'], 1)
+        self.assertFalse(Employee.objects.filter(user__username='import1').exists())
+
+    def test_import_endpoint_with_csv_file(self):
+        content = 'username,email,password,first_name,last_name,join_date,phone_number\n'
+        content += 'csv1,csv1@example.com,Str0ng-pass-123,Csv,One,2025-01-06,5550100\n'
+        content += 'csv2,bad-email,Str0ng-pass-123,Csv,Two,2025-01-06,5550100\n'
+        upload = SimpleUploadedFile('staff.csv', content.encode(), content_type='text/csv')
+
+        self.client.force_authenticate(user=self.manager)
+        response = self.client.post(self.import_url, {'file': upload}, format='multipart')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['created'], 1)
+        self.assertEqual(response.data['errors'][0]['row'], 2)
+        self.assertTrue(Employee.objects.filter(user__username='csv1').exists())
+
+    def test_import_endpoint_with_json_body(self):
+        self.client.force_authenticate(user=self.manager)
+        response = self.client.post(self.import_url, [make_row(1), make_row(2)], format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['created'], 2)
+
+    def test_import_endpoint_limits_rows(self):
+        """Test that only files small enough to hash within a request are imported"""
+        self.client.force_authenticate(user=self.manager)
+        rows = [make_row(n) for n in range(26)]
+        response = self.client.post(self.import_url, rows, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(Employee.objects.filter(user__username__startswith='import').exists())
+
+        response = self.client.post(f'{self.import_url}?dry_run=true', rows, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['created'], 26)
+
+    def test_import_requires_manager(self):
+        self.client.force_authenticate(user=self.existing.user)
+        response = self.client.post(self.import_url, [make_row(1)], format='json')
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_import_command(self):
+        fd, path = tempfile.mkstemp(suffix='.json')
+        with os.fdopen(fd, 'w') as f:
+            json.dump([make_row(n) for n in range(20)], f)
+        self.addCleanup(os.remove, path)
+
+        out = StringIO()
+        call_command('import_employees', path, workers=2, stdout=out, stderr=StringIO())
+        self.assertIn('Created 20 of 20', out.getvalue())
+        self.assertEqual(Employee.objects.filter(user__username__startswith='import').count(), 20)
+
+    def test_import_command_reports_malformed_csv(self):
+        fd, path = tempfile.mkstemp(suffix='.csv')
+        with os.fdopen(fd, 'w') as f:
+            # A field over the csv module's size limit
+            f.write('username,email\n"' + 'x' * 200000 + '",a@example.com\n')
+        self.addCleanup(os.remove, path)
+
+        with self.assertRaisesMessage(CommandError, 'Could not read'):
+            call_command('import_employees', path, stdout=StringIO(), stderr=StringIO())
@@ -0,0 +1,84 @@
+from io import StringIO
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework.test import APIClient
+from rest_framework import status
+from authentication.tests.factories import EmployeeFactory, ManagerFactory, UserFactory
+from employees.fulltext import search_ids
+from employees.imports import import_employees
+from employees.tests.test_imports import make_row
+
+class EmployeeSearchTest(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.manager = ManagerFactory()
+        self.alice = EmployeeFactory(
+            user__username='alice.w', user__first_name='Alice', user__last_name='Walker',
+            user__email='alice@example.com', phone_number='555-0100',
+        )
+        self.bob = EmployeeFactory(
+            user__username='bob', user__first_name='Robert', user__last_name='Alison',
+            user__email='rob@corp.test', phone_number='555-0199',
+        )
+        self.search_url = reverse('employee-search')
+
+    def search(self, q, **params):
+        self.client.force_authenticate(user=self.manager)
+        response = self.client.get(self.search_url, {'q': q, **params})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return [row['id'] for row in response.data['results']]
+
+    def test_words_match_as_prefixes(self):
+        self.assertEqual(self.search('wal'), [self.alice.pk])
+        self.assertEqual(self.search('rob ali'), [self.bob.pk])
+        self.assertEqual(self.search('corp'), [self.bob.pk])
+        self.assertEqual(self.search('zzz'), [])
+
+    def test_name_matches_rank_above_email_matches(self):
+        # "ali" is alice's first name and email but only bob's last name
+        self.assertEqual(set(self.search('ali')), {self.alice.pk, self.bob.pk})
+        self.assertEqual(self.search('ali', limit=1), [self.alice.pk])
+
+    def test_phone_digits_match_with_or_without_separators(self):
+        self.assertEqual(self.search('5550100'), [self.alice.pk])
+        self.assertEqual(set(self.search('555')), {self.alice.pk, self.bob.pk})
+
+    def test_index_follows_user_and_employee_changes(self):
+        user = self.alice.user
+        user.last_name = 'Smith'
+        user.save(update_fields=['last_name'])
+        self.assertEqual(search_ids('smith'), [self.alice.pk])
+        self.assertEqual(search_ids('walker'), [])
+
+        self.alice.phone_number = '777-1234'
+        self.alice.save()
+        self.assertEqual(search_ids('7771234'), [self.alice.pk])
+
+        self.bob.delete()
+        self.assertEqual(search_ids('robert'), [])
+
+    def test_imported_employees_are_indexed(self):
+        import_employees([make_row(1, first_name='Zelda')], workers=1)
+        self.assertEqual(len(self.search('zelda')), 1)
+
+    def test_rebuild_command(self):
+        out = StringIO()
+        call_command('rebuild_employee_search', stdout=out)
+        self.assertIn('Indexed 2 employees', out.getvalue())
+        self.assertEqual(self.search('walker'), [self.alice.pk])
+
+    def test_query_is_required(self):
+        self.client.force_authenticate(user=self.manager)
+        response = self.client.get(self.search_url)
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(self.search('!!'), [])
+
+    def test_employees_only_find_themselves(self):
+        self.client.force_authenticate(user=self.alice.user)
+        response = self.client.get(self.search_url, {'q': 'ali'})
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+        self.client.force_authenticate(user=UserFactory())
+        response = self.client.get(self.search_url, {'q': 'ali'})
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
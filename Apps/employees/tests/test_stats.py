@@ -0,0 +1,81 @@
+import datetime
+import os
+from unittest import mock
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework.test import APIClient
+from rest_framework import status
+from authentication.tests.factories import EmployeeFactory, ManagerFactory
+from employees.models import Department, Position
+from leaves import history, transitions
+from leaves.tests.factories import LeaveFactory
+
+class DepartmentStatsTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        # Running the on-commit hooks marks this test's history tables as created; they are rolled back
+        self.addCleanup(history._tables.clear)
+        self.client = APIClient()
+        self.manager = ManagerFactory()
+        self.engineering = Department.objects.create(name='Engineering')
+        self.sales = Department.objects.create(name='Sales')
+        developer = Position.objects.create(name='Developer', department=self.engineering)
+        Position.objects.create(name='Architect', department=self.engineering)
+        self.alice = EmployeeFactory(department=self.engineering, position=developer)
+        self.bob = EmployeeFactory(department=self.engineering, position=developer)
+        EmployeeFactory()
+        today = datetime.date.today()
+        self.leave = LeaveFactory(employee=self.alice, start_date=today, end_date=today)
+        self.stats_url = reverse('department-stats')
+
+    def get_stats(self):
+        self.client.force_authenticate(user=self.manager)
+        response = self.client.get(self.stats_url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response.data
+
+    def test_counts_per_department(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            transitions.transition(self.leave, 'approved', self.manager)
+        data = self.get_stats()
+        self.assertEqual(data['results'], [
+            {
+                'department_id': self.engineering.pk, 'department': 'Engineering',
+                'headcount': 2, 'positions': 2, 'open_positions': 1, 'out_today': 1,
+            },
+            {
+                'department_id': self.sales.pk, 'department': 'Sales',
+                'headcount': 0, 'positions': 0, 'open_positions': 0, 'out_today': 0,
+            },
+        ])
+        self.assertEqual(data['unassigned'], {'headcount': 1, 'out_today': 0})
+
+    def test_cached_until_a_relevant_write(self):
+        self.assertEqual(self.get_stats()['results'][0]['out_today'], 0)
+        with self.assertNumQueries(0):
+            self.client.get(self.stats_url)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            transitions.transition(self.leave, 'approved', self.manager)
+        self.assertEqual(self.get_stats()['results'][0]['out_today'], 1)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.bob.department = self.sales
+            self.bob.save()
+        headcounts = [row['headcount'] for row in self.get_stats()['results']]
+        self.assertEqual(headcounts, [1, 1])
+
+    def test_per_process_cache_with_several_workers_is_bypassed(self):
+        """Test that the statistics are recomputed when other workers cannot publish their changes to this one"""
+        self.assertEqual(self.get_stats()['results'][0]['out_today'], 0)
+        # Approved by another worker: its version token never reaches this process
+        transitions.transition(self.leave, 'approved', self.manager)
+        self.assertEqual(self.get_stats()['results'][0]['out_today'], 0)
+        with mock.patch.dict(os.environ, {'WEB_CONCURRENCY': '4'}):
+            self.assertEqual(self.get_stats()['results'][0]['out_today'], 1)
+
+    def test_requires_manager(self):
+        self.client.force_authenticate(user=self.alice.user)
+        response = self.client.get(self.stats_url)
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
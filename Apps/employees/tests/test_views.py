@@ -2,8 +2,10 @@ from django.test import TestCase
 from django.urls import reverse
 from rest_framework.test import APIClient
 from rest_framework import status
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from authentication.tests.factories import UserFactory, EmployeeFactory, ManagerFactory
-from employees.models import Employee
+from employees.models import Employee, Department, Position
 
 class EmployeeViewsTest(TestCase):
     def setUp(self):
@@ -88,6 +90,19 @@ class EmployeeViewsTest(TestCase):
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertEqual(response.data['phone_number'], '9876543210')
 
+    def test_username_sort_follows_username(self):
+        """Test that the denormalized sort key tracks username changes from either side"""
+        self.assertEqual(self.employee.username_sort, self.employee.user.username)
+        self.client.force_authenticate(user=self.manager)
+        self.client.patch(self.employee_detail_url, {'username': 'renamed'})
+        self.assertEqual(Employee.objects.get(pk=self.employee.pk).username_sort, 'renamed')
+
+        user = self.employee.user
+        user.refresh_from_db()
+        user.username = 'renamed-again'
+        user.save()
+        self.assertEqual(Employee.objects.get(pk=self.employee.pk).username_sort, 'renamed-again')
+
     def test_delete_employee_unauthorized(self):
         """Test that unauthorized users cannot delete employees"""
         response = self.client.delete(self.employee_detail_url)
@@ -113,4 +128,54 @@ class EmployeeViewsTest(TestCase):
         """Test that regular users cannot access employee list"""
         self.client.force_authenticate(user=self.regular_user)
         response = self.client.get(self.employee_list_url)
-        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN) 
\ No newline at end of file
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN) 
+
+    def test_employee_list_query_count_is_constant(self):
+        """Test that the employee list does not query the user table per row"""
+        self.client.force_authenticate(user=self.manager)
+        with CaptureQueriesContext(connection) as baseline:
+            self.client.get(self.employee_list_url)
+
+        EmployeeFactory.create_batch(4)
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(self.employee_list_url)
+        self.assertEqual(len(response.data['results']), 5)
+        self.assertEqual(len(context.captured_queries), len(baseline.captured_queries))
+
+    def test_position_list_query_count_is_constant(self):
+        """Test that the position list joins departments instead of querying per row"""
+        self.client.force_authenticate(user=self.manager)
+        department = Department.objects.create(name='Engineering')
+        Position.objects.create(name='Developer', department=department)
+        with CaptureQueriesContext(connection) as baseline:
+            self.client.get(reverse('position-list'))
+
+        for i in range(4):
+            Position.objects.create(name=f'Position {i}', department=Department.objects.create(name=f'Dept {i}'))
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(reverse('position-list'))
+        self.assertEqual(len(response.data['results']), 5)
+        self.assertEqual(len(context.captured_queries), len(baseline.captured_queries))
+
+    def test_employee_cursor_pagination(self):
+        """Test that cursor pages follow the default employee ordering"""
+        self.client.force_authenticate(user=self.manager)
+        EmployeeFactory.create_batch(4)
+        url = f'{self.employee_list_url}?cursor=&page_size=2'
+        ids = []
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            ids.extend(row['id'] for row in response.data['results'])
+            url = response.data['next']
+        self.assertEqual(ids, list(Employee.objects.order_by('-join_date', 'user__username', 'id').values_list('id', flat=True)))
+
+    def test_employee_export(self):
+        """Test that managers can stream the employee directory as CSV"""
+        self.client.force_authenticate(user=self.manager)
+        response = self.client.get(reverse('employee-export'))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        lines = b''.join(response.streaming_content).decode().splitlines()
+        self.assertEqual(lines[0], 'id,username,email,first_name,last_name,join_date,phone_number')
+        self.assertEqual(len(lines), 2)
+        self.assertIn(self.employee.user.username, lines[1])
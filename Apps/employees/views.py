@@ -1,11 +1,19 @@
+import csv
+import os
 from rest_framework import viewsets, permissions, status
 from rest_framework.response import Response
 from rest_framework.decorators import action
 from django.contrib.auth import get_user_model
 from django.http import HttpResponseRedirect
 from django.urls import reverse
+from authentication.exports import export_response, get_export_format
+from authentication.compiled import CompiledListMixin
+from authentication.conditional import ConditionalRequestMixin
+from authentication.reference import ReferenceDataViewMixin
+from authentication.sparse import SparseFieldsViewMixin
+from . import fulltext, hierarchy, imports, reference, stats
 from .models import Department, Position, Employee
-from .serializers import DepartmentSerializer, PositionSerializer, EmployeeSerializer
+from .serializers import DepartmentSerializer, PositionSerializer, EmployeeSerializer, EmployeeSearchQuerySerializer
 
 User = get_user_model()
 
@@ -20,29 +28,62 @@ class IsManagerOrAdmin(permissions.BasePermission):
         # Then check if user is manager or admin
         return request.user.is_manager or request.user.is_staff
 
-class DepartmentViewSet(viewsets.ModelViewSet):
+class DepartmentViewSet(ReferenceDataViewMixin, SparseFieldsViewMixin, viewsets.ModelViewSet):
     """
     API endpoint that allows departments to be viewed or edited.
+    Reads are served from the reference cache.
     """
     queryset = Department.objects.all()
+    reference_cache = reference.departments
     serializer_class = DepartmentSerializer
     permission_classes = [permissions.IsAuthenticated, IsManagerOrAdmin]
 
-class PositionViewSet(viewsets.ModelViewSet):
+    @action(detail=False, methods=['get'])
+    def stats(self, request):
+        """
+        Headcount, open positions and employees out today per department.
+        Served from the cache until an employee, position, department or approved leave changes;
+        managers limited to their subtree only count the employees in it.
+        """
+        return Response(stats.get_department_stats(request.user))
+
+class PositionViewSet(ReferenceDataViewMixin, SparseFieldsViewMixin, viewsets.ModelViewSet):
     """
     API endpoint that allows positions to be viewed or edited.
+    Reads are served from the reference cache.
     """
     queryset = Position.objects.all()
+    reference_cache = reference.positions
     serializer_class = PositionSerializer
     permission_classes = [permissions.IsAuthenticated, IsManagerOrAdmin]
 
-class EmployeeViewSet(viewsets.ModelViewSet):
+    def get_queryset(self):
+        """
+        Load each position's department in the same query
+        """
+        return self.setup_eager_loading(Position.objects.all())
+
+class EmployeeViewSet(ConditionalRequestMixin, CompiledListMixin, SparseFieldsViewMixin, viewsets.ModelViewSet):
     """
     API endpoint that allows employees to be viewed or edited.
     """
     queryset = Employee.objects.all()
     serializer_class = EmployeeSerializer
     permission_classes = [permissions.IsAuthenticated, IsManagerOrAdmin]
+    keyset_ordering = ('-join_date', 'username_sort', 'id')
+    # ?expand= embeds the department and position
+    validator_caches = {'department': reference.departments, 'position': reference.positions}
+
+    # Columns of /api/employees/export/ and the lookups they are read from
+    export_fields = {
+        'id': 'id',
+        'username': 'user__username',
+        'email': 'user__email',
+        'first_name': 'user__first_name',
+        'last_name': 'user__last_name',
+        'join_date': 'join_date',
+        'phone_number': 'phone_number',
+    }
 
     def create(self, request, *args, **kwargs):
         serializer = self.get_serializer(data=request.data)
@@ -116,13 +157,87 @@ class EmployeeViewSet(viewsets.ModelViewSet):
         
         return self.destroy(request, pk=pk)
 
+    @action(detail=False, methods=['get'])
+    def export(self, request):
+        """
+        Stream every visible employee as CSV or NDJSON (?export_format=)
+        """
+        export_format = get_export_format(request)
+        queryset = self.filter_queryset(self.get_queryset())
+        return export_response(queryset, self.export_fields, 'employees', export_format)
+
+    @action(detail=False, methods=['get'])
+    def search(self, request):
+        """
+        Type-ahead search over usernames, names, emails and phone numbers (?q=&limit=),
+        best match first; every word of q matches as a prefix
+        """
+        query = EmployeeSearchQuerySerializer(data=request.query_params)
+        query.is_valid(raise_exception=True)
+        ids = fulltext.search_ids(
+            query.validated_data['q'], query.validated_data['limit'], within=hierarchy.visible_employees(request.user)
+        )
+        employees = self.get_queryset().in_bulk(ids)
+        serializer = self.get_serializer([employees[pk] for pk in ids if pk in employees], many=True)
+        return Response({'results': serializer.data})
+
+    @action(detail=False, methods=['post'], url_path='import')
+    def bulk_import(self, request):
+        """
+        Create many employees at once from an uploaded CSV or JSON file (`file`)
+        or a JSON body holding a list of employees.
+
+        Valid rows are created, the others are reported with their errors; pass
+        ?dry_run=true to only validate. Files too large to hash their passwords
+        within a request are imported with the import_employees command.
+        """
+        upload = request.FILES.get('file')
+        if upload is not None:
+            extension = os.path.splitext(upload.name)[1].lstrip('.').lower()
+            import_format = request.query_params.get('import_format') or extension
+            if import_format not in imports.IMPORT_FORMATS:
+                return Response(
+                    {'error': f'Choose one of: {", ".join(imports.IMPORT_FORMATS)} (?import_format=)'},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+            try:
+                rows = imports.read_rows(upload.file, import_format)
+            except (ValueError, UnicodeDecodeError, csv.Error) as exc:
+                return Response({'error': f'Could not read the file: {exc}'}, status=status.HTTP_400_BAD_REQUEST)
+        elif isinstance(request.data, list):
+            rows = request.data
+        else:
+            return Response(
+                {'error': 'Upload a CSV or JSON file as "file" or send a JSON list of employees'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        dry_run = request.query_params.get('dry_run', '').lower() in ('1', 'true', 'yes')
+        limit = imports.MAX_DRY_RUN_ROWS if dry_run else imports.MAX_ROWS
+        if len(rows) > limit:
+            return Response(
+                {'error': f'At most {limit} employees per request; import larger files with manage.py import_employees'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        if not all(isinstance(row, dict) for row in rows):
+            return Response({'error': 'Every employee must be an object'}, status=status.HTTP_400_BAD_REQUEST)
+
+        # Hash in this process: a request must not start a process pool inside the server's worker
+        report = imports.import_employees(
+            rows, workers=1, dry_run=dry_run, reports_to=hierarchy.default_manager(request.user)
+        )
+        return Response(report, status=status.HTTP_200_OK)
+
     def get_queryset(self):
         """
-        Filter employees based on user's role
+        Filter employees based on user's role: managers see the employees below
+        them in the reporting hierarchy (everyone if they have no employee record)
         """
         user = self.request.user
         if not user.is_authenticated:
             return Employee.objects.none()  # Return empty queryset for anonymous users
         if user.is_manager or user.is_staff:
-            return Employee.objects.all()
-        return Employee.objects.filter(user=user) 
\ No newline at end of file
+            queryset = hierarchy.scope(Employee.objects.all(), user, field='pk')
+        else:
+            queryset = Employee.objects.filter(user=user)
+        return self.setup_eager_loading(queryset) 
\ No newline at end of file
@@ -0,0 +1,115 @@
+from itertools import groupby
+from django.contrib import admin
+from django.db import transaction
+from authentication.admin import LargeTableAdmin, ReadOnlyAdmin
+from . import bookkeeping
+from .models import (
+    WorkCalendar, Holiday, LeaveType, Leave, LeaveApproval, LeaveBalance, LeaveMonthlySummary,
+    LeaveStatusCount, ApproverWeeklyCount, OutboxEvent, LeaveSnapshot, LeaveSnapshotRow
+)
+
+class HolidayInline(admin.TabularInline):
+    model = Holiday
+    extra = 0
+    ordering = ['date']
+
+@admin.register(WorkCalendar)
+class WorkCalendarAdmin(admin.ModelAdmin):
+    list_display = ['name', 'work_week', 'is_default']
+    inlines = [HolidayInline]
+
+@admin.register(LeaveType)
+class LeaveTypeAdmin(admin.ModelAdmin):
+    list_display = ['name', 'max_days']
+    search_fields = ['name']
+    ordering = ['name']
+
+class LeaveApprovalInline(admin.StackedInline):
+    model = LeaveApproval
+    fields = ['approver', 'comments', 'approved_at']
+    readonly_fields = ['approver', 'approved_at']
+    can_delete = False
+    extra = 0
+
+    def has_add_permission(self, request, obj=None):
+        return False
+
+@admin.register(Leave)
+class LeaveAdmin(LargeTableAdmin):
+    """
+    Leaves are requested and reviewed through the API, which keeps the
+    balances, analytics and history in step; here only the reason can be
+    edited, and deletions go through the same bookkeeping
+    """
+    list_display = ['__str__', 'status', 'working_days', 'created_at']
+    # __str__ shows the employee's name and the leave type
+    list_select_related = ['employee__user', 'leave_type']
+    list_filter = ['status', 'leave_type']
+    search_fields = ['=employee__user__username']
+    search_help_text = 'Exact username'
+    raw_id_fields = ['employee']
+    readonly_fields = ['employee', 'leave_type', 'start_date', 'end_date', 'status', 'working_days', 'created_at', 'updated_at']
+    inlines = [LeaveApprovalInline]
+
+    def has_add_permission(self, request):
+        return False
+
+    def delete_model(self, request, obj):
+        with transaction.atomic():
+            bookkeeping.record_status_change(obj, obj.status, None, request.user)
+            obj.delete()
+
+    def delete_queryset(self, request, queryset):
+        with transaction.atomic():
+            leaves = sorted(queryset.select_for_update(), key=lambda leave: leave.status)
+            for leave_status, group in groupby(leaves, key=lambda leave: leave.status):
+                bookkeeping.record_status_changes(group, leave_status, None, request.user)
+            queryset.filter(pk__in=[leave.pk for leave in leaves]).delete()
+
+@admin.register(LeaveApproval)
+class LeaveApprovalAdmin(LargeTableAdmin, ReadOnlyAdmin):
+    list_display = ['__str__', 'approver', 'approved_at']
+    # __str__ shows the leave, which shows its employee and leave type
+    list_select_related = ['leave__employee__user', 'leave__leave_type', 'approver']
+    search_fields = ['=approver__username']
+    search_help_text = 'Exact approver username'
+    raw_id_fields = ['leave']
+
+@admin.register(LeaveBalance)
+class LeaveBalanceAdmin(LargeTableAdmin, ReadOnlyAdmin):
+    list_display = ['__str__', 'year', 'used_days', 'pending_days']
+    list_select_related = ['employee__user', 'leave_type']
+    list_filter = ['leave_type']
+    raw_id_fields = ['employee']
+
+@admin.register(LeaveMonthlySummary)
+class LeaveMonthlySummaryAdmin(LargeTableAdmin, ReadOnlyAdmin):
+    list_display = ['__str__', 'month', 'days']
+    list_select_related = ['employee__user', 'leave_type']
+    list_filter = ['leave_type']
+    raw_id_fields = ['employee']
+
+@admin.register(LeaveStatusCount)
+class LeaveStatusCountAdmin(ReadOnlyAdmin):
+    list_display = ['status', 'slot', 'total']
+    ordering = ['status', 'slot']
+
+@admin.register(ApproverWeeklyCount)
+class ApproverWeeklyCountAdmin(LargeTableAdmin, ReadOnlyAdmin):
+    list_display = ['approver', 'week', 'status', 'total']
+    list_select_related = ['approver']
+    raw_id_fields = ['approver']
+
+@admin.register(OutboxEvent)
+class OutboxEventAdmin(LargeTableAdmin, ReadOnlyAdmin):
+    list_display = ['__str__', 'created_at', 'attempts', 'delivered_at', 'last_error']
+
+@admin.register(LeaveSnapshot)
+class LeaveSnapshotAdmin(ReadOnlyAdmin):
+    list_display = ['taken_at', 'created_at']
+
+@admin.register(LeaveSnapshotRow)
+class LeaveSnapshotRowAdmin(LargeTableAdmin, ReadOnlyAdmin):
+    list_display = ['__str__', 'snapshot', 'employee_id', 'start_date', 'end_date']
+    list_select_related = ['snapshot']
+    raw_id_fields = ['snapshot']
@@ -3,4 +3,7 @@ from django.apps import AppConfig
 class LeavesConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'leaves'
-    verbose_name = 'Leaves' 
\ No newline at end of file
+    verbose_name = 'Leaves'
+
+    def ready(self):
+        from . import signals  # noqa: F401
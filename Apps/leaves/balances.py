@@ -0,0 +1,110 @@
+"""
+Leave balance ledger.
+
+`LeaveBalance` keeps, per (employee, leave type, year), the days taken by
+approved leaves and the days held by pending ones. The rows are adjusted with
+`F()` increments in the same transaction as every status change, so reading a
+balance is a single-row lookup instead of an aggregate over the leave table.
+Days are working days of the default work calendar.
+"""
+from collections import defaultdict
+from django.db import transaction
+from rest_framework import serializers
+from .increments import increment
+from .models import Leave, LeaveBalance
+from .workdays import get_calendar
+
+# Which balance column a leave in a given status counts against
+STATUS_COLUMNS = {
+    'pending': 'pending_days',
+    'approved': 'used_days',
+}
+
+def days_by_year(start_date, end_date):
+    """
+    Split an inclusive date range into {year: working days}
+    """
+    return get_calendar().count_by_year(start_date, end_date)
+
+def apply_status_change(leave, old_status, new_status):
+    """
+    Move a leave's days between balance columns.
+
+    `old_status` is None when the leave is being created and `new_status` is
+    None when it is being deleted. Must run inside the transaction that
+    changes the leave.
+    """
+    apply_status_changes([leave], old_status, new_status)
+
+def apply_status_changes(leaves, old_status, new_status):
+    """
+    Same as apply_status_change for many leaves, with one UPDATE per balance row touched
+    """
+    old_column = STATUS_COLUMNS.get(old_status)
+    new_column = STATUS_COLUMNS.get(new_status)
+    if old_column == new_column:
+        return
+    calendar = get_calendar()
+    totals = defaultdict(lambda: defaultdict(int))
+    for leave in leaves:
+        for year, days in calendar.count_by_year(leave.start_date, leave.end_date).items():
+            deltas = totals[(leave.employee_id, leave.leave_type_id, year)]
+            if old_column:
+                deltas[old_column] -= days
+            if new_column:
+                deltas[new_column] += days
+    for (employee_id, leave_type_id, year), deltas in totals.items():
+        increment(LeaveBalance, {'employee_id': employee_id, 'leave_type_id': leave_type_id, 'year': year}, deltas)
+
+def check_balance(employee, leave_type, start_date, end_date):
+    """
+    Raise a ValidationError if the range would exceed the leave type's yearly allowance.
+
+    The balance rows are locked so concurrent requests for the same employee
+    cannot both pass the check.
+    """
+    if not leave_type.max_days:
+        return
+    requested = days_by_year(start_date, end_date)
+    # Make sure every row exists so there is something to lock
+    LeaveBalance.objects.bulk_create(
+        [LeaveBalance(employee=employee, leave_type=leave_type, year=year) for year in requested],
+        ignore_conflicts=True,
+    )
+    balances = {
+        balance.year: balance
+        for balance in LeaveBalance.objects.select_for_update().filter(
+            employee=employee, leave_type=leave_type, year__in=requested.keys()
+        )
+    }
+    for year, days in requested.items():
+        balance = balances[year]
+        remaining = max(leave_type.max_days - balance.used_days - balance.pending_days, 0)
+        if days > remaining:
+            raise serializers.ValidationError({
+                'leave_type_id': f'Only {remaining} day(s) of {leave_type.name} left for {year}.'
+            })
+
+def rebuild_balances(batch_size=1000):
+    """
+    Recompute the whole ledger from the leave table and return the number of rows written
+    """
+    totals = defaultdict(lambda: defaultdict(int))
+    leaves = Leave.objects.filter(status__in=STATUS_COLUMNS.keys()).order_by().values_list(
+        'employee_id', 'leave_type_id', 'start_date', 'end_date', 'status'
+    )
+    calendar = get_calendar()
+    with transaction.atomic():
+        for employee_id, leave_type_id, start_date, end_date, status in leaves.iterator(chunk_size=5000):
+            for year, days in calendar.count_by_year(start_date, end_date).items():
+                totals[(employee_id, leave_type_id, year)][STATUS_COLUMNS[status]] += days
+
+        LeaveBalance.objects.all().delete()
+        LeaveBalance.objects.bulk_create(
+            (
+                LeaveBalance(employee_id=employee_id, leave_type_id=leave_type_id, year=year, **columns)
+                for (employee_id, leave_type_id, year), columns in totals.items()
+            ),
+            batch_size=batch_size,
+        )
+    return len(totals)
@@ -0,0 +1,57 @@
+"""
+Keeps the tables derived from leaves in step with leave writes.
+
+Every place that changes a leave's status or dates calls in here, inside the
+same transaction as the change.
+"""
+import copy
+from employees import stats
+from . import analytics, balances, counters, history
+
+def _move_days(leaves, old_status, new_status):
+    balances.apply_status_changes(leaves, old_status, new_status)
+    analytics.apply_status_changes(leaves, old_status, new_status)
+
+def record_status_changes(leaves, old_status, new_status, actor=None):
+    """
+    Record leaves moving from `old_status` to `new_status`, done by `actor` (a user).
+
+    `old_status` is None for new leaves and `new_status` is None for deleted ones.
+    """
+    leaves = list(leaves)
+    _move_days(leaves, old_status, new_status)
+    if new_status is not None:
+        # Deleted leaves are counted by signals.count_deleted_leave, which also sees cascades
+        counters.apply_status_changes(len(leaves), old_status, new_status)
+    if old_status is None:
+        kind = 'created'
+    elif new_status is None:
+        kind = 'deleted'
+    else:
+        kind = 'status'
+    history.record(leaves, kind, old_status, new_status, actor)
+    if 'approved' in (old_status, new_status):
+        # Approved leaves are the department absences
+        stats.invalidate()
+
+def record_status_change(leave, old_status, new_status, actor=None):
+    record_status_changes([leave], old_status, new_status, actor)
+
+def record_reviews(approver, new_status, count=1):
+    """
+    Record `count` leaves reviewed by `approver`
+    """
+    counters.record_reviews(approver, new_status, count)
+
+def record_date_change(leave, old_start_date, old_end_date, actor=None):
+    """
+    Move a leave's days from its previous date range to its current one
+    """
+    previous = copy.copy(leave)
+    previous.start_date = old_start_date
+    previous.end_date = old_end_date
+    _move_days([previous], leave.status, None)
+    _move_days([leave], None, leave.status)
+    history.record([leave], 'dates', leave.status, leave.status, actor)
+    if leave.status == 'approved':
+        stats.invalidate()
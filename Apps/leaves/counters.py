@@ -0,0 +1,90 @@
+"""
+Maintained counters for manager dashboards.
+
+Leaves per status and reviews per approver and week are counted as leaves are
+written, so the dashboard summary reads a handful of counter rows and never
+touches the leave table.
+"""
+import datetime
+import random
+from collections import defaultdict
+from django.db import transaction
+from django.db.models import Count, Sum
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+from .increments import increment
+from .models import Leave, LeaveApproval, LeaveStatusCount, ApproverWeeklyCount
+
+def week_of(day):
+    """Monday of the week containing `day`"""
+    return day - datetime.timedelta(days=day.weekday())
+
+def apply_status_changes(count, old_status, new_status):
+    """
+    Move `count` leaves from one status counter to another
+    """
+    if not count or old_status == new_status:
+        return
+    slot = random.randrange(LeaveStatusCount.SLOTS)
+    if old_status:
+        increment(LeaveStatusCount, {'status': old_status, 'slot': slot}, {'total': -count}, clamp=False)
+    if new_status:
+        increment(LeaveStatusCount, {'status': new_status, 'slot': slot}, {'total': count}, clamp=False)
+
+def record_reviews(approver, new_status, count=1):
+    """
+    Count `count` decisions made by `approver` this week
+    """
+    if not count:
+        return
+    increment(
+        ApproverWeeklyCount,
+        {'approver_id': approver.pk, 'week': week_of(timezone.localdate()), 'status': new_status},
+        {'total': count},
+    )
+
+def status_totals(leaves=None):
+    """
+    {status: number of leaves}, from the counters or, for a manager who only
+    sees part of the company, counted in their queryset of leaves
+    """
+    totals = {status: 0 for status, _ in Leave.STATUS_CHOICES}
+    if leaves is None:
+        rows = LeaveStatusCount.objects.values('status').annotate(sum=Sum('total')).order_by()
+    else:
+        rows = leaves.order_by().values('status').annotate(sum=Count('id'))
+    totals.update({row['status']: row['sum'] for row in rows})
+    return totals
+
+def weekly_reviews(approver, week=None):
+    """
+    {decision: number of leaves} reviewed by `approver` in the given (default current) week
+    """
+    week = week or week_of(timezone.localdate())
+    return dict(
+        ApproverWeeklyCount.objects.filter(approver=approver, week=week).values_list('status', 'total')
+    )
+
+def rebuild_counters():
+    """
+    Recompute both counter tables from the leave and approval tables
+    """
+    with transaction.atomic():
+        LeaveStatusCount.objects.all().delete()
+        LeaveStatusCount.objects.bulk_create(
+            LeaveStatusCount(status=row['status'], slot=0, total=row['count'])
+            for row in Leave.objects.order_by().values('status').annotate(count=Count('id'))
+        )
+
+        weekly = defaultdict(int)
+        reviews = LeaveApproval.objects.order_by().annotate(day=TruncDate('approved_at')).values(
+            'approver_id', 'day', 'leave__status'
+        ).annotate(count=Count('id'))
+        for row in reviews:
+            weekly[(row['approver_id'], week_of(row['day']), row['leave__status'])] += row['count']
+
+        ApproverWeeklyCount.objects.all().delete()
+        ApproverWeeklyCount.objects.bulk_create(
+            ApproverWeeklyCount(approver_id=approver_id, week=week, status=status, total=total)
+            for (approver_id, week, status), total in weekly.items()
+        )
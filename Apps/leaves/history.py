@@ -0,0 +1,237 @@
+"""
+Append-only leave history, stored in one table per month.
+
+Every create, status change, date edit and delete appends an event holding
+the leave's state right after the change, to `leaves_leaveevent_YYYYMM` for
+the month it happened in (UTC). Inserts only ever touch the current month's
+small table and its two indexes, and a month that is no longer needed is
+archived by dumping and dropping its table instead of deleting rows.
+
+Tables are created ahead of their month, after every migrate and by the
+monthly snapshot command, so recording an event does not run DDL inside the
+request's transaction.
+
+The state of all leaves at an instant is answered by loading the latest
+`LeaveSnapshot` taken before it and replaying the events in between, so a
+query reads at most a month or so of events however long the history is.
+"""
+import datetime
+import json
+import threading
+from django.apps.registry import Apps
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import DatabaseError, connection, transaction
+from django.db.models import F
+from django.utils import timezone
+from .models import Leave, LeaveEvent, LeaveSnapshot, LeaveSnapshotRow
+
+TABLE_PREFIX = 'leaves_leaveevent_'
+# Columns that make up a leave's state, in snapshots and events alike
+STATE_FIELDS = ('leave_id', 'employee_id', 'leave_type_id', 'status', 'start_date', 'end_date')
+
+# The per-month models live in their own registry so they never show up in
+# migrations or the admin
+_registry = Apps()
+_models = {}
+_models_lock = threading.Lock()
+# Tables known to exist; only filled once the transaction that created them committed
+_tables = set()
+# Months after the current one whose tables are created ahead
+MONTHS_AHEAD = 2
+
+def month_of(moment):
+    return moment.astimezone(datetime.timezone.utc).date().replace(day=1)
+
+def event_model(month):
+    """The model for the event table of the month containing `month` (a date)"""
+    key = month.strftime('%Y%m')
+    with _models_lock:
+        model = _models.get(key)
+        if model is None:
+            meta = type('Meta', (), {
+                'db_table': f'{TABLE_PREFIX}{key}',
+                'app_label': 'leaves',
+                'apps': _registry,
+                'managed': False,
+            })
+            model = type(f'LeaveEvent{key}', (LeaveEvent,), {'__module__': __name__, 'Meta': meta})
+            _models[key] = model
+    return model
+
+def event_months():
+    """Months that have an event table, oldest first"""
+    months = []
+    for table in connection.introspection.table_names():
+        if table.startswith(TABLE_PREFIX) and table[len(TABLE_PREFIX):].isdigit():
+            key = table[len(TABLE_PREFIX):]
+            months.append(datetime.date(int(key[:4]), int(key[4:]), 1))
+    return sorted(months)
+
+def _create_table(model):
+    table = model._meta.db_table
+    quote = connection.ops.quote_name
+    # table_sql() only builds the statement, so this also works inside a transaction on SQLite
+    sql, params = connection.schema_editor().table_sql(model)
+    with connection.cursor() as cursor:
+        cursor.execute(sql.replace('CREATE TABLE', 'CREATE TABLE IF NOT EXISTS', 1), params)
+        cursor.execute(
+            f'CREATE INDEX IF NOT EXISTS {quote(table + "_leave_idx")} '
+            f'ON {quote(table)} ({quote("leave_id")}, {quote("occurred_at")})'
+        )
+        cursor.execute(
+            f'CREATE INDEX IF NOT EXISTS {quote(table + "_time_idx")} ON {quote(table)} ({quote("occurred_at")})'
+        )
+    transaction.on_commit(lambda: _tables.add(table))
+
+def create_tables(months):
+    """Create the event tables of `months` (dates) that do not exist yet"""
+    with transaction.atomic():
+        for month in months:
+            _create_table(event_model(month))
+
+def create_upcoming_tables():
+    """Create the tables of the current month and the MONTHS_AHEAD following ones"""
+    months = [month_of(timezone.now())]
+    for _ in range(MONTHS_AHEAD):
+        months.append((months[-1] + datetime.timedelta(days=32)).replace(day=1))
+    create_tables(months)
+
+def ensure_table(model):
+    """
+    Make sure a month's event table exists. It normally was created ahead;
+    otherwise it is created in a savepoint, so a concurrent transaction
+    creating it too does not abort the caller's.
+    """
+    table = model._meta.db_table
+    if table in _tables:
+        return
+    if table in connection.introspection.table_names():
+        transaction.on_commit(lambda: _tables.add(table))
+        return
+    try:
+        with transaction.atomic():
+            _create_table(model)
+    except DatabaseError:
+        # PostgreSQL reports the clash once the other transaction committed its table
+        if table not in connection.introspection.table_names():
+            raise
+
+def record(leaves, kind, previous_status, status, actor=None):
+    """
+    Append one event per leave with a single INSERT into the current month's table.
+    Must run inside the transaction that changes the leaves.
+    """
+    now = timezone.now()
+    model = event_model(month_of(now))
+    ensure_table(model)
+    model.objects.bulk_create([
+        model(
+            leave_id=leave.pk,
+            employee_id=leave.employee_id,
+            leave_type_id=leave.leave_type_id,
+            kind=kind,
+            previous_status=previous_status,
+            status=status,
+            start_date=leave.start_date,
+            end_date=leave.end_date,
+            actor_id=actor.pk if actor is not None else None,
+            occurred_at=now,
+        )
+        for leave in leaves
+    ])
+
+def as_of(at, employee_id=None, employee_ids=None, status=None):
+    """
+    {leave id: state} of the leaves that existed at `at`, and the snapshot replayed from.
+
+    `employee_id` and `employee_ids` (ids or a subquery of them) narrow the
+    snapshot rows and events read; `status` keeps the leaves in that status
+    at `at`. Leaves that predate the history and the first snapshot are not
+    known before it.
+    """
+    def narrow(queryset):
+        if employee_id is not None:
+            queryset = queryset.filter(employee_id=employee_id)
+        if employee_ids is not None:
+            queryset = queryset.filter(employee_id__in=employee_ids)
+        return queryset
+
+    snapshot = LeaveSnapshot.objects.filter(taken_at__lte=at).order_by('-taken_at').first()
+    state = {}
+    if snapshot is not None:
+        rows = narrow(snapshot.rows.all())
+        if status is not None:
+            # Events carry the whole state, so a leave whose status changes later is added back by its event
+            rows = rows.filter(status=status)
+        state = {row['leave_id']: row for row in rows.order_by().values(*STATE_FIELDS).iterator(chunk_size=5000)}
+
+    first_month = month_of(snapshot.taken_at) if snapshot is not None else None
+    for month in event_months():
+        if month > month_of(at) or (first_month is not None and month < first_month):
+            continue
+        events = event_model(month).objects.filter(occurred_at__lte=at)
+        if snapshot is not None:
+            events = events.filter(occurred_at__gt=snapshot.taken_at)
+        events = narrow(events)
+        for event in events.order_by('occurred_at', 'id').values('kind', *STATE_FIELDS).iterator(chunk_size=5000):
+            if event.pop('kind') == 'deleted':
+                state.pop(event['leave_id'], None)
+            else:
+                state[event['leave_id']] = event
+    if status is not None:
+        state = {leave_id: row for leave_id, row in state.items() if row['status'] == status}
+    return state, snapshot
+
+def take_snapshot(at=None):
+    """
+    Store the state of every leave at `at` (default: the start of the current month).
+
+    The first snapshot is taken from the leave table as it is now, so that
+    leaves created before the history existed are part of it; later ones are
+    replayed from the previous snapshot. An `at` in the future, or before the
+    oldest event table, is refused: the events it needs are not there.
+    """
+    with transaction.atomic():
+        if not LeaveSnapshot.objects.exists():
+            taken_at = timezone.now()
+            state = Leave.objects.order_by().values(
+                'employee_id', 'leave_type_id', 'status', 'start_date', 'end_date', leave_id=F('id')
+            )
+        else:
+            taken_at = at or datetime.datetime.combine(
+                month_of(timezone.now()), datetime.time.min, tzinfo=datetime.timezone.utc
+            )
+            if taken_at > timezone.now():
+                raise ValueError('A snapshot cannot be taken in the future')
+            months = event_months()
+            if not months or month_of(taken_at) < months[0]:
+                raise ValueError(f'The leave history before {taken_at:%Y-%m} is no longer available')
+            existing = LeaveSnapshot.objects.filter(taken_at=taken_at).first()
+            if existing is not None:
+                return existing
+            state = as_of(taken_at)[0].values()
+
+        snapshot = LeaveSnapshot.objects.create(taken_at=taken_at)
+        LeaveSnapshotRow.objects.bulk_create(
+            (LeaveSnapshotRow(snapshot=snapshot, **row) for row in state),
+            batch_size=1000,
+        )
+    return snapshot
+
+def archive_month(month, output=None):
+    """
+    Drop a month's event table, first appending its events to `output` (an
+    open text file) as JSON lines if given. Refused unless a snapshot taken
+    after the month makes its events unnecessary for replay.
+    """
+    following = (month + datetime.timedelta(days=32)).replace(day=1)
+    boundary = datetime.datetime.combine(following, datetime.time.min, tzinfo=datetime.timezone.utc)
+    if not LeaveSnapshot.objects.filter(taken_at__gte=boundary).exists():
+        raise ValueError(f'Take a snapshot after {month:%Y-%m} before archiving it')
+    model = event_model(month)
+    if output is not None:
+        for event in model.objects.order_by('id').values().iterator(chunk_size=5000):
+            output.write(json.dumps(event, cls=DjangoJSONEncoder) + '\n')
+    with connection.cursor() as cursor:
+        cursor.execute(f'DROP TABLE IF EXISTS {connection.ops.quote_name(model._meta.db_table)}')
+    _tables.discard(model._meta.db_table)
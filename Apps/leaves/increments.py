@@ -0,0 +1,29 @@
+from django.db import IntegrityError, transaction
+from django.db.models import F, Value
+from django.db.models.functions import Greatest
+
+def increment(model, lookup, deltas, clamp=True):
+    """
+    Add {column: delta} to the row matching `lookup`, creating it if needed.
+
+    Runs as a single UPDATE with F() expressions when the row exists, so
+    concurrent writers never lose each other's changes. Unless `clamp` is
+    False, results are clamped at zero so a table that drifted (rows written
+    before it existed) cannot fail the caller's transaction; the rebuild
+    commands repair drift.
+    """
+    changes = {
+        column: Greatest(F(column) + delta, Value(0)) if clamp else F(column) + delta
+        for column, delta in deltas.items() if delta
+    }
+    if not changes:
+        return
+    if model.objects.filter(**lookup).update(**changes):
+        return
+    try:
+        with transaction.atomic():
+            initial = {column: max(delta, 0) if clamp else delta for column, delta in deltas.items()}
+            model.objects.create(**lookup, **initial)
+    except IntegrityError:
+        # Another transaction created the row first
+        model.objects.filter(**lookup).update(**changes)
@@ -0,0 +1,91 @@
+"""
+Overlap detection for leave date ranges.
+
+Single checks run as one indexed EXISTS query. Batches of candidate ranges are
+answered from an in-memory centered interval tree, built with one indexed
+query over the employee's active leaves within the batch's overall span: a
+candidate costs O(log n + k) for k conflicts, however long any leave is.
+"""
+from operator import itemgetter
+from .models import Leave
+
+def overlapping_leaves(employee_id, start_date, end_date, exclude_pk=None):
+    """
+    Active leaves of an employee that share at least one day with the range
+    """
+    queryset = Leave.objects.filter(
+        employee_id=employee_id,
+        status__in=Leave.ACTIVE_STATUSES,
+        end_date__gte=start_date,
+        start_date__lte=end_date,
+    )
+    if exclude_pk is not None:
+        queryset = queryset.exclude(pk=exclude_pk)
+    return queryset
+
+class _Node:
+    """
+    The intervals containing `center`, sorted by start and by end descending,
+    and the subtrees of those entirely before and after it
+    """
+    def __init__(self, intervals):
+        endpoints = sorted(point for start, end, _ in intervals for point in (start, end))
+        self.center = endpoints[len(endpoints) // 2]
+        before = [interval for interval in intervals if interval[1] < self.center]
+        after = [interval for interval in intervals if interval[0] > self.center]
+        here = [interval for interval in intervals if interval[0] <= self.center <= interval[1]]
+        self.by_start = sorted(here, key=itemgetter(0))
+        self.by_end = sorted(here, key=itemgetter(1), reverse=True)
+        self.before = _Node(before) if before else None
+        self.after = _Node(after) if after else None
+
+class LeaveIntervalIndex:
+    """
+    Centered interval tree over (start date, end date, id) triples
+    """
+    def __init__(self, intervals):
+        intervals = list(intervals)
+        self.root = _Node(intervals) if intervals else None
+
+    @classmethod
+    def for_employee(cls, employee_id, start_date, end_date, exclude_pk=None):
+        """The employee's active leaves sharing a day with start_date..end_date"""
+        queryset = overlapping_leaves(employee_id, start_date, end_date, exclude_pk)
+        return cls(queryset.order_by().values_list('start_date', 'end_date', 'id').iterator())
+
+    def _matches(self, start_date, end_date):
+        nodes = [self.root] if self.root is not None else []
+        while nodes:
+            node = nodes.pop()
+            if end_date < node.center:
+                # Every interval here ends after the range; it overlaps if it starts in time
+                for interval in node.by_start:
+                    if interval[0] > end_date:
+                        break
+                    yield interval
+                if node.before is not None:
+                    nodes.append(node.before)
+            elif start_date > node.center:
+                # Every interval here starts before the range; it overlaps if it ends in time
+                for interval in node.by_end:
+                    if interval[1] < start_date:
+                        break
+                    yield interval
+                if node.after is not None:
+                    nodes.append(node.after)
+            else:
+                yield from node.by_start
+                nodes += [child for child in (node.before, node.after) if child is not None]
+
+    def overlaps(self, start_date, end_date):
+        """
+        True if any interval overlaps the range, in O(log n)
+        """
+        return next(self._matches(start_date, end_date), None) is not None
+
+    def conflicts(self, start_date, end_date):
+        """
+        Ids of the intervals overlapping the range, newest start first
+        """
+        matches = sorted(self._matches(start_date, end_date), key=itemgetter(0, 2), reverse=True)
+        return [leave_id for _, _, leave_id in matches]
@@ -0,0 +1,32 @@
+import datetime
+import os
+from django.core.management.base import BaseCommand, CommandError
+from leaves.history import archive_month, event_months
+
+class Command(BaseCommand):
+    help = 'Dump and drop the leave history tables of months before --before'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--before', required=True, help='First month to keep, as YYYY-MM')
+        parser.add_argument('--output-dir', help='Write each month to leave-events-YYYY-MM.ndjson in this directory first')
+
+    def handle(self, *args, **options):
+        try:
+            keep_from = datetime.datetime.strptime(options['before'], '%Y-%m').date()
+        except ValueError:
+            raise CommandError('--before must look like 2025-01')
+
+        for month in event_months():
+            if month >= keep_from:
+                break
+            try:
+                if options['output_dir']:
+                    path = os.path.join(options['output_dir'], f'leave-events-{month:%Y-%m}.ndjson')
+                    with open(path, 'a', encoding='utf-8') as output:
+                        archive_month(month, output)
+                else:
+                    archive_month(month)
+            except ValueError as exc:
+                raise CommandError(str(exc))
+            self.stdout.write(f'Archived {month:%Y-%m}')
+        self.stdout.write(self.style.SUCCESS('Done'))
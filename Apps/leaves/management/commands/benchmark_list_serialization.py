@@ -0,0 +1,89 @@
+import datetime
+import time
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from rest_framework.renderers import JSONRenderer
+from authentication.compiled import compile_serializer
+from employees.models import Employee
+from employees.serializers import EmployeeSerializer
+from leaves.models import Leave, LeaveApproval, LeaveType
+from leaves.serializers import LeaveApprovalSerializer, LeaveSerializer
+
+User = get_user_model()
+
+class Command(BaseCommand):
+    help = 'Compare DRF and compiled rendering of large leave, approval and employee list pages'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=500, help='Rows per page')
+        parser.add_argument('--repeat', type=int, default=20, help='Renderings per measurement; the best one counts')
+
+    def handle(self, *args, **options):
+        rows, repeat = options['rows'], options['repeat']
+        if rows < 1 or repeat < 1:
+            raise CommandError('--rows and --repeat must be positive')
+
+        # Sample rows are written in a transaction that is rolled back at the end
+        with transaction.atomic():
+            self.create_rows(rows)
+            for serializer_class, queryset in [
+                (LeaveSerializer, Leave.objects.all()),
+                (LeaveApprovalSerializer, LeaveApproval.objects.all()),
+                (EmployeeSerializer, Employee.objects.all()),
+            ]:
+                self.compare(serializer_class, queryset[:rows], repeat)
+            transaction.set_rollback(True)
+
+    def create_rows(self, count):
+        users = User.objects.bulk_create(
+            User(username=f'benchmark-{i}', email=f'benchmark-{i}@example.com', password='!',
+                 first_name=f'First{i}', last_name=f'Last{i}', is_employee=True)
+            for i in range(count)
+        )
+        manager = User.objects.create(username='benchmark-manager', password='!', is_manager=True)
+        employees = Employee.objects.bulk_create(
+            Employee(user=user, join_date=datetime.date(2020, 1, 1), phone_number='0123456789', username_sort=user.username)
+            for user in users
+        )
+        leave_type = LeaveType.objects.create(name='Benchmark', max_days=0)
+        start = datetime.date(2025, 3, 3)
+        leaves = Leave.objects.bulk_create(
+            Leave(employee=employee, leave_type=leave_type, start_date=start, end_date=start + datetime.timedelta(days=4),
+                  reason='Benchmark', working_days=5, status='approved' if i % 2 else 'pending')
+            for i, employee in enumerate(employees)
+        )
+        LeaveApproval.objects.bulk_create(
+            LeaveApproval(leave=leave, approver=manager, comments='OK') for leave in leaves if leave.status == 'approved'
+        )
+
+    def compare(self, serializer_class, queryset, repeat):
+        renderer = JSONRenderer()
+        compiled = compile_serializer(serializer_class())
+        if compiled is None:
+            raise CommandError(f'{serializer_class.__name__} does not compile')
+
+        def drf():
+            page = list(serializer_class.setup_eager_loading(queryset))
+            return renderer.render(serializer_class(page, many=True).data)
+
+        def fast():
+            return renderer.render(compiled.render_many(compiled.project(queryset)))
+
+        if drf() != fast():
+            raise CommandError(f'{serializer_class.__name__}: the compiled output differs')
+        drf_time, fast_time = self.best(drf, repeat), self.best(fast, repeat)
+        size = queryset.count()
+        self.stdout.write(
+            f'{serializer_class.__name__}: {size} rows, DRF {size / drf_time:,.0f} rows/s, '
+            f'compiled {size / fast_time:,.0f} rows/s ({drf_time / fast_time:.1f}x), identical output'
+        )
+
+    @staticmethod
+    def best(render, repeat):
+        timings = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            render()
+            timings.append(time.perf_counter() - started)
+        return min(timings)
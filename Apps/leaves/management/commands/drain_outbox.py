@@ -0,0 +1,61 @@
+import time
+from django.core.management.base import BaseCommand, CommandError
+from leaves import outbox
+
+class Command(BaseCommand):
+    help = 'Deliver pending leave notification events to the configured sinks'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=100, help='Events per delivery')
+        parser.add_argument('--max-attempts', type=int, default=outbox.MAX_ATTEMPTS,
+                            help='Give up on an event after this many failed deliveries')
+        parser.add_argument('--file', help='Append events to this file instead of the configured sinks')
+        parser.add_argument('--url', help='POST events to this URL instead of the configured sinks')
+        parser.add_argument('--loop', action='store_true', help='Keep running and poll for new events')
+        parser.add_argument('--interval', type=float, default=5, help='Seconds between polls with --loop')
+        parser.add_argument('--purge-days', type=int, help='Also delete events delivered more than this many days ago')
+        parser.add_argument('--retry-dead', action='store_true',
+                            help='Give events that ran out of attempts a fresh set of attempts first')
+        parser.add_argument('--purge-dead-days', type=int,
+                            help='Delete events that ran out of attempts and were created more than this many days ago')
+
+    def handle(self, *args, **options):
+        sinks = []
+        if options['file']:
+            sinks.append(outbox.FileSink(options['file']))
+        if options['url']:
+            sinks.append(outbox.HttpSink(options['url']))
+        sinks = sinks or outbox.get_sinks()
+        if not sinks:
+            raise CommandError('No sinks: set LEAVE_OUTBOX_SINKS or pass --file/--url')
+
+        if options['retry_dead']:
+            retried = outbox.retry_dead(options['max_attempts'])
+            self.stdout.write(f'Retrying {retried} dead-lettered event(s)')
+
+        reported_dead = 0
+        while True:
+            delivered, failed = outbox.drain(sinks, options['batch_size'], options['max_attempts'])
+            if delivered or failed:
+                self.stdout.write(f'Delivered {delivered} event(s), {failed} failed and will be retried')
+            if options['purge_days'] is not None:
+                purged = outbox.purge_delivered(options['purge_days'])
+                if purged:
+                    self.stdout.write(f'Purged {purged} delivered event(s)')
+            if options['purge_dead_days'] is not None:
+                purged = outbox.purge_dead(options['purge_dead_days'], options['max_attempts'])
+                if purged:
+                    self.stdout.write(f'Purged {purged} dead-lettered event(s)')
+            # Reported when the number changes, not on every poll
+            dead = outbox.dead_letters(options['max_attempts']).count()
+            if dead != reported_dead:
+                reported_dead = dead
+                if dead:
+                    self.stderr.write(self.style.WARNING(
+                        f'{dead} event(s) failed {options["max_attempts"]} times and are no longer retried; '
+                        'use --retry-dead or --purge-dead-days'
+                    ))
+            if not options['loop']:
+                break
+            time.sleep(options['interval'])
+        self.stdout.write(self.style.SUCCESS('Outbox drained'))
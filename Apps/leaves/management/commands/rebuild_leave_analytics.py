@@ -0,0 +1,12 @@
+from django.core.management.base import BaseCommand
+from leaves.analytics import rebuild_summaries
+
+class Command(BaseCommand):
+    help = 'Rebuild the monthly leave analytics summary from approved leaves'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000, help='Rows per bulk insert')
+
+    def handle(self, *args, **options):
+        count = rebuild_summaries(batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt {count} monthly summary rows'))
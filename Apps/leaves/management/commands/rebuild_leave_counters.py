@@ -0,0 +1,9 @@
+from django.core.management.base import BaseCommand
+from leaves.counters import rebuild_counters
+
+class Command(BaseCommand):
+    help = 'Rebuild the leave status and weekly review counters'
+
+    def handle(self, *args, **options):
+        rebuild_counters()
+        self.stdout.write(self.style.SUCCESS('Rebuilt leave counters'))
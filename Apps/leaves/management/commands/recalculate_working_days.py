@@ -0,0 +1,22 @@
+from django.core.management.base import BaseCommand
+from leaves.analytics import rebuild_summaries
+from leaves.balances import rebuild_balances
+from leaves.models import Leave
+from leaves.workdays import recalculate_working_days
+
+class Command(BaseCommand):
+    help = 'Recount leave working days after the work calendar or its holidays changed'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000, help='Rows per bulk update')
+        parser.add_argument(
+            '--skip-rebuild', action='store_true', help='Do not rebuild the balances and analytics afterwards'
+        )
+
+    def handle(self, *args, **options):
+        count = recalculate_working_days(Leave.objects.order_by(), batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f'Updated working days of {count} leaves'))
+        if count and not options['skip_rebuild']:
+            balances = rebuild_balances(batch_size=options['batch_size'])
+            summaries = rebuild_summaries(batch_size=options['batch_size'])
+            self.stdout.write(self.style.SUCCESS(f'Rebuilt {balances} balance and {summaries} monthly summary rows'))
@@ -0,0 +1,12 @@
+from django.core.management.base import BaseCommand
+from leaves.balances import rebuild_balances
+
+class Command(BaseCommand):
+    help = 'Rebuild the leave balance ledger from the leave table'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000, help='Rows per bulk insert')
+
+    def handle(self, *args, **options):
+        count = rebuild_balances(batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt {count} leave balance rows'))
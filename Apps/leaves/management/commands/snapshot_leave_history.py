@@ -0,0 +1,27 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.utils.dateparse import parse_datetime
+from leaves.history import create_upcoming_tables, take_snapshot
+
+class Command(BaseCommand):
+    help = (
+        'Store the state of every leave as a starting point for point-in-time queries '
+        'and create the history tables of the coming months (run monthly)'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--at', help='ISO datetime of the snapshot (default: start of the current month)')
+
+    def handle(self, *args, **options):
+        at = None
+        if options['at']:
+            at = parse_datetime(options['at'])
+            if at is None or at.tzinfo is None:
+                raise CommandError('--at must be an ISO datetime with a timezone, e.g. 2025-03-01T00:00:00+00:00')
+        create_upcoming_tables()
+        try:
+            snapshot = take_snapshot(at)
+        except ValueError as exc:
+            raise CommandError(str(exc))
+        self.stdout.write(self.style.SUCCESS(
+            f'Snapshot at {snapshot.taken_at.isoformat()} holds {snapshot.rows.count()} leaves'
+        ))
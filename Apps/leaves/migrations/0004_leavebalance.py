@@ -0,0 +1,100 @@
+# Generated by Django 5.2 on 2026-10-18 16:03
+
+import datetime
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def weekdays(start, end):
+    # Working days Monday to Friday, the default work calendar
+    total = (end - start).days + 1
+    weeks, extra = divmod(total, 7)
+    return weeks * 5 + sum(
+        (start.weekday() + offset) % 7 < 5 for offset in range(extra)
+    )
+
+
+def fill_balances(apps, schema_editor):
+    Leave = apps.get_model("leaves", "Leave")
+    LeaveBalance = apps.get_model("leaves", "LeaveBalance")
+    columns = {"pending": "pending_days", "approved": "used_days"}
+    totals = {}
+    leaves = Leave.objects.filter(status__in=columns).values_list(
+        "employee_id", "leave_type_id", "start_date", "end_date", "status"
+    )
+    for employee_id, leave_type_id, start_date, end_date, status in leaves.iterator():
+        for year in range(start_date.year, end_date.year + 1):
+            days = weekdays(
+                max(start_date, datetime.date(year, 1, 1)),
+                min(end_date, datetime.date(year, 12, 31)),
+            )
+            row = totals.setdefault(
+                (employee_id, leave_type_id, year),
+                {"pending_days": 0, "used_days": 0},
+            )
+            row[columns[status]] += days
+    LeaveBalance.objects.bulk_create(
+        [
+            LeaveBalance(
+                employee_id=employee_id, leave_type_id=leave_type_id, year=year, **row
+            )
+            for (employee_id, leave_type_id, year), row in totals.items()
+        ],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        (
+            "employees",
+            "0002_remove_employee_address_remove_employee_department_and_more",
+        ),
+        ("leaves", "0003_leave_updated_at"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="LeaveBalance",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("year", models.PositiveSmallIntegerField()),
+                ("used_days", models.PositiveIntegerField(default=0)),
+                ("pending_days", models.PositiveIntegerField(default=0)),
+                (
+                    "employee",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="leave_balances",
+                        to="employees.employee",
+                    ),
+                ),
+                (
+                    "leave_type",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="balances",
+                        to="leaves.leavetype",
+                    ),
+                ),
+            ],
+            options={
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("employee", "leave_type", "year"),
+                        name="unique_leave_balance",
+                    )
+                ],
+            },
+        ),
+        migrations.RunPython(fill_balances, migrations.RunPython.noop),
+    ]
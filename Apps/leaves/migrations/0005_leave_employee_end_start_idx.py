@@ -0,0 +1,23 @@
+# Generated by Django 5.2 on 2026-10-18 16:08
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        (
+            "employees",
+            "0002_remove_employee_address_remove_employee_department_and_more",
+        ),
+        ("leaves", "0004_leavebalance"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="leave",
+            index=models.Index(
+                fields=["employee", "end_date", "start_date"],
+                name="leave_employee_end_start_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2 on 2026-10-18 16:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        (
+            "employees",
+            "0002_remove_employee_address_remove_employee_department_and_more",
+        ),
+        ("leaves", "0005_leave_employee_end_start_idx"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="leave",
+            index=models.Index(
+                fields=["status", "end_date", "start_date"],
+                name="leave_status_end_start_idx",
+            ),
+        ),
+    ]
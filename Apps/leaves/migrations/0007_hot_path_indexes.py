@@ -0,0 +1,54 @@
+# Generated by Django 5.2 on 2026-10-18 16:11
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("employees", "0004_hot_path_indexes"),
+        ("leaves", "0006_leave_status_end_start_idx"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name="leave",
+            options={"ordering": ["-created_at", "-id"]},
+        ),
+        migrations.AlterModelOptions(
+            name="leaveapproval",
+            options={"ordering": ["-approved_at", "-id"]},
+        ),
+        migrations.AddIndex(
+            model_name="leave",
+            index=models.Index(fields=["created_at"], name="leave_created_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="leave",
+            index=models.Index(
+                fields=["employee", "created_at"], name="leave_employee_created_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="leave",
+            index=models.Index(
+                condition=models.Q(("status", "pending")),
+                fields=["employee", "created_at"],
+                name="leave_pending_employee_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="leaveapproval",
+            index=models.Index(
+                fields=["approver", "approved_at"], name="approval_approver_date_idx"
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="leave",
+            constraint=models.CheckConstraint(
+                condition=models.Q(("end_date__gte", models.F("start_date"))),
+                name="leave_end_after_start",
+            ),
+        ),
+    ]
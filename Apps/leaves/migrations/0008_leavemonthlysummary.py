@@ -0,0 +1,103 @@
+# Generated by Django 5.2 on 2026-10-18 16:14
+
+import datetime
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def weekdays(start, end):
+    # Working days Monday to Friday, the default work calendar
+    total = (end - start).days + 1
+    weeks, extra = divmod(total, 7)
+    return weeks * 5 + sum(
+        (start.weekday() + offset) % 7 < 5 for offset in range(extra)
+    )
+
+
+def fill_summaries(apps, schema_editor):
+    Leave = apps.get_model("leaves", "Leave")
+    LeaveMonthlySummary = apps.get_model("leaves", "LeaveMonthlySummary")
+    totals = {}
+    leaves = Leave.objects.filter(status="approved").values_list(
+        "employee_id", "leave_type_id", "start_date", "end_date"
+    )
+    for employee_id, leave_type_id, start_date, end_date in leaves.iterator():
+        month = start_date.replace(day=1)
+        while month <= end_date:
+            following = (month + datetime.timedelta(days=32)).replace(day=1)
+            days = weekdays(
+                max(start_date, month),
+                min(end_date, following - datetime.timedelta(days=1)),
+            )
+            key = (employee_id, leave_type_id, month)
+            totals[key] = totals.get(key, 0) + days
+            month = following
+    LeaveMonthlySummary.objects.bulk_create(
+        [
+            LeaveMonthlySummary(
+                employee_id=employee_id,
+                leave_type_id=leave_type_id,
+                month=month,
+                days=days,
+            )
+            for (employee_id, leave_type_id, month), days in totals.items()
+        ],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("employees", "0004_hot_path_indexes"),
+        ("leaves", "0007_hot_path_indexes"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="LeaveMonthlySummary",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("month", models.DateField(help_text="First day of the month")),
+                ("days", models.PositiveIntegerField(default=0)),
+                (
+                    "employee",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="leave_summaries",
+                        to="employees.employee",
+                    ),
+                ),
+                (
+                    "leave_type",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="summaries",
+                        to="leaves.leavetype",
+                    ),
+                ),
+            ],
+            options={
+                "indexes": [
+                    models.Index(
+                        fields=["month", "leave_type"], name="leave_summary_month_idx"
+                    )
+                ],
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("employee", "leave_type", "month"),
+                        name="unique_leave_monthly_summary",
+                    )
+                ],
+            },
+        ),
+        migrations.RunPython(fill_summaries, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,105 @@
+# Generated by Django 5.2 on 2026-10-18 16:16
+
+import datetime
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count
+from django.db.models.functions import TruncDate
+
+
+def fill_counters(apps, schema_editor):
+    Leave = apps.get_model("leaves", "Leave")
+    LeaveApproval = apps.get_model("leaves", "LeaveApproval")
+    LeaveStatusCount = apps.get_model("leaves", "LeaveStatusCount")
+    ApproverWeeklyCount = apps.get_model("leaves", "ApproverWeeklyCount")
+    LeaveStatusCount.objects.bulk_create(
+        LeaveStatusCount(status=row["status"], slot=0, total=row["count"])
+        for row in Leave.objects.order_by().values("status").annotate(count=Count("id"))
+    )
+    weekly = {}
+    reviews = (
+        LeaveApproval.objects.order_by()
+        .annotate(day=TruncDate("approved_at"))
+        .values("approver_id", "day", "leave__status")
+        .annotate(count=Count("id"))
+    )
+    for row in reviews:
+        week = row["day"] - datetime.timedelta(days=row["day"].weekday())
+        key = (row["approver_id"], week, row["leave__status"])
+        weekly[key] = weekly.get(key, 0) + row["count"]
+    ApproverWeeklyCount.objects.bulk_create(
+        ApproverWeeklyCount(
+            approver_id=approver_id, week=week, status=status, total=total
+        )
+        for (approver_id, week, status), total in weekly.items()
+    )
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("leaves", "0008_leavemonthlysummary"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="LeaveStatusCount",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("status", models.CharField(max_length=10)),
+                ("slot", models.PositiveSmallIntegerField(default=0)),
+                ("total", models.IntegerField(default=0)),
+            ],
+            options={
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("status", "slot"), name="unique_leave_status_count"
+                    )
+                ],
+            },
+        ),
+        migrations.CreateModel(
+            name="ApproverWeeklyCount",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("week", models.DateField(help_text="Monday of the week")),
+                ("status", models.CharField(max_length=10)),
+                ("total", models.PositiveIntegerField(default=0)),
+                (
+                    "approver",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="weekly_review_counts",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+            options={
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("approver", "week", "status"),
+                        name="unique_approver_weekly_count",
+                    )
+                ],
+            },
+        ),
+        migrations.RunPython(fill_counters, migrations.RunPython.noop),
+    ]
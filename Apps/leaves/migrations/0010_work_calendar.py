@@ -0,0 +1,97 @@
+# Generated by Django 5.2 on 2026-10-18 16:23
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def count_working_days(apps, schema_editor):
+    # No calendar exists yet, so existing leaves are counted Monday to Friday
+    Leave = apps.get_model("leaves", "Leave")
+    leaves = []
+    for leave in Leave.objects.only("id", "start_date", "end_date").iterator():
+        total = (leave.end_date - leave.start_date).days + 1
+        weeks, extra = divmod(total, 7)
+        weekday = leave.start_date.weekday()
+        leave.working_days = weeks * 5 + sum(
+            (weekday + offset) % 7 < 5 for offset in range(extra)
+        )
+        leaves.append(leave)
+    Leave.objects.bulk_update(leaves, ["working_days"], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("leaves", "0009_leave_counters"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="leave",
+            name="working_days",
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.CreateModel(
+            name="WorkCalendar",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("name", models.CharField(max_length=100, unique=True)),
+                (
+                    "work_week",
+                    models.PositiveSmallIntegerField(
+                        default=31,
+                        help_text="Bit mask of working weekdays, bit 0 = Monday ... bit 6 = Sunday",
+                    ),
+                ),
+                ("is_default", models.BooleanField(default=False)),
+            ],
+            options={
+                "constraints": [
+                    models.UniqueConstraint(
+                        condition=models.Q(("is_default", True)),
+                        fields=("is_default",),
+                        name="single_default_work_calendar",
+                    )
+                ],
+            },
+        ),
+        migrations.CreateModel(
+            name="Holiday",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("date", models.DateField()),
+                ("name", models.CharField(max_length=100)),
+                (
+                    "calendar",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="holidays",
+                        to="leaves.workcalendar",
+                    ),
+                ),
+            ],
+            options={
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("calendar", "date"), name="unique_holiday_date"
+                    )
+                ],
+            },
+        ),
+        migrations.RunPython(count_working_days, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,60 @@
+# Generated by Django 5.2 on 2026-10-18 16:51
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("leaves", "0012_outbox"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="LeaveSnapshot",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("taken_at", models.DateTimeField(unique=True)),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                "ordering": ["-taken_at"],
+            },
+        ),
+        migrations.CreateModel(
+            name="LeaveSnapshotRow",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("leave_id", models.BigIntegerField()),
+                ("employee_id", models.BigIntegerField()),
+                ("leave_type_id", models.BigIntegerField()),
+                ("status", models.CharField(max_length=10)),
+                ("start_date", models.DateField()),
+                ("end_date", models.DateField()),
+                (
+                    "snapshot",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="rows",
+                        to="leaves.leavesnapshot",
+                    ),
+                ),
+            ],
+        ),
+    ]
@@ -1,5 +1,15 @@
+from .work_calendar import WorkCalendar, Holiday
 from .leave_type import LeaveType
 from .leave import Leave
 from .leave_approval import LeaveApproval
+from .leave_balance import LeaveBalance
+from .leave_summary import LeaveMonthlySummary
+from .leave_counter import LeaveStatusCount, ApproverWeeklyCount
+from .outbox import OutboxEvent
+from .leave_event import LeaveEvent, LeaveSnapshot, LeaveSnapshotRow
 
-__all__ = ['LeaveType', 'Leave', 'LeaveApproval'] 
\ No newline at end of file
+__all__ = [
+    'WorkCalendar', 'Holiday', 'LeaveType', 'Leave', 'LeaveApproval', 'LeaveBalance',
+    'LeaveMonthlySummary', 'LeaveStatusCount', 'ApproverWeeklyCount', 'OutboxEvent',
+    'LeaveEvent', 'LeaveSnapshot', 'LeaveSnapshotRow'
+]
\ No newline at end of file
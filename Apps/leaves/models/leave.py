@@ -7,6 +7,7 @@ class Leave(models.Model):
         ('pending', 'Pending'),
         ('approved', 'Approved'),
         ('rejected', 'Rejected'),
+        ('cancelled', 'Cancelled'),
     ]
 
     employee = models.ForeignKey(Employee, on_delete=models.CASCADE, related_name='leaves')
@@ -15,12 +16,57 @@ class Leave(models.Model):
     end_date = models.DateField()
     reason = models.TextField()
     status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='pending')
+    # Days charged against the leave type, weekends and holidays excluded; kept in sync by save()
+    working_days = models.PositiveIntegerField(default=0, editable=False)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    # Statuses that occupy the employee's calendar
+    ACTIVE_STATUSES = ['pending', 'approved']
+
+    # Allowed status changes; every other status is final
+    TRANSITIONS = {
+        'pending': ['approved', 'rejected', 'cancelled'],
+    }
+
+    class Meta:
+        ordering = ['-created_at', '-id']
+        indexes = [
+            # Manager list: newest first
+            models.Index(fields=['created_at'], name='leave_created_idx'),
+            # Employee list: their own leaves, newest first
+            models.Index(fields=['employee', 'created_at'], name='leave_employee_created_idx'),
+            # Pending queue per employee
+            models.Index(
+                fields=['employee', 'created_at'],
+                name='leave_pending_employee_idx',
+                condition=models.Q(status='pending'),
+            ),
+            # Overlap checks seek on end_date >= new start, which only touches
+            # the tail of an employee's history instead of every past leave
+            models.Index(fields=['employee', 'end_date', 'start_date'], name='leave_employee_end_start_idx'),
+            # Calendar windows: status IN (...) AND end_date >= window start AND start_date <= window end
+            models.Index(fields=['status', 'end_date', 'start_date'], name='leave_status_end_start_idx'),
+        ]
+        constraints = [
+            models.CheckConstraint(
+                condition=models.Q(end_date__gte=models.F('start_date')),
+                name='leave_end_after_start',
+            ),
+        ]
+
     def __str__(self):
         return f"{self.employee} - {self.leave_type} ({self.start_date} to {self.end_date})"
 
+    def save(self, *args, **kwargs):
+        update_fields = kwargs.get('update_fields')
+        if update_fields is None or {'start_date', 'end_date'} & set(update_fields):
+            from ..workdays import get_calendar
+            self.working_days = get_calendar().count(self.start_date, self.end_date)
+            if update_fields is not None:
+                kwargs['update_fields'] = set(update_fields) | {'working_days'}
+        super().save(*args, **kwargs)
+
     @property
     def duration(self):
         return (self.end_date - self.start_date).days + 1 
\ No newline at end of file
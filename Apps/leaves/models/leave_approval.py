@@ -8,5 +8,12 @@ class LeaveApproval(models.Model):
     comments = models.TextField(blank=True)
     approved_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        ordering = ['-approved_at', '-id']
+        indexes = [
+            # Approvals made by a manager, newest first
+            models.Index(fields=['approver', 'approved_at'], name='approval_approver_date_idx'),
+        ]
+
     def __str__(self):
         return f"Approval for {self.leave} by {self.approver}" 
\ No newline at end of file
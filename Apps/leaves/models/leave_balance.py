@@ -0,0 +1,26 @@
+from django.db import models
+from employees.models import Employee
+from .leave_type import LeaveType
+
+class LeaveBalance(models.Model):
+    """Days an employee has used and has pending per leave type and year"""
+    employee = models.ForeignKey(Employee, on_delete=models.CASCADE, related_name='leave_balances')
+    leave_type = models.ForeignKey(LeaveType, on_delete=models.CASCADE, related_name='balances')
+    year = models.PositiveSmallIntegerField()
+    used_days = models.PositiveIntegerField(default=0)
+    pending_days = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['employee', 'leave_type', 'year'], name='unique_leave_balance'),
+        ]
+
+    def __str__(self):
+        return f"{self.employee} - {self.leave_type} {self.year}: {self.used_days} used"
+
+    @property
+    def remaining_days(self):
+        # A max_days of 0 means the leave type is not capped
+        if not self.leave_type.max_days:
+            return None
+        return max(self.leave_type.max_days - self.used_days - self.pending_days, 0)
@@ -0,0 +1,38 @@
+from django.db import models
+from authentication.models import User
+
+class LeaveStatusCount(models.Model):
+    """
+    Number of leaves per status, spread over a few slots.
+
+    Writers bump a random slot so concurrent leave requests do not all queue
+    on one row; readers add the slots up. A single slot may go negative.
+    """
+    SLOTS = 8
+
+    status = models.CharField(max_length=10)
+    slot = models.PositiveSmallIntegerField(default=0)
+    total = models.IntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['status', 'slot'], name='unique_leave_status_count'),
+        ]
+
+    def __str__(self):
+        return f"{self.status}[{self.slot}]: {self.total}"
+
+class ApproverWeeklyCount(models.Model):
+    """Number of leaves a manager reviewed per decision and week"""
+    approver = models.ForeignKey(User, on_delete=models.CASCADE, related_name='weekly_review_counts')
+    week = models.DateField(help_text='Monday of the week')
+    status = models.CharField(max_length=10)
+    total = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['approver', 'week', 'status'], name='unique_approver_weekly_count'),
+        ]
+
+    def __str__(self):
+        return f"{self.approver} {self.week} {self.status}: {self.total}"
\ No newline at end of file
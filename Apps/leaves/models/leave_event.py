@@ -0,0 +1,54 @@
+from django.db import models
+
+class LeaveEvent(models.Model):
+    """
+    One entry of the append-only leave history: the state of a leave right
+    after it was created, reviewed, re-dated or deleted.
+
+    Abstract: events are stored in one table per month (see leaves.history),
+    so old months can be archived by dropping their table.
+    """
+    KIND_CHOICES = [
+        ('created', 'Created'),
+        ('status', 'Status changed'),
+        ('dates', 'Dates changed'),
+        ('deleted', 'Deleted'),
+    ]
+
+    # Plain ids rather than foreign keys: history outlives deleted rows
+    leave_id = models.BigIntegerField()
+    employee_id = models.BigIntegerField()
+    leave_type_id = models.BigIntegerField()
+    kind = models.CharField(max_length=10, choices=KIND_CHOICES)
+    previous_status = models.CharField(max_length=10, null=True)
+    status = models.CharField(max_length=10, null=True)
+    start_date = models.DateField()
+    end_date = models.DateField()
+    actor_id = models.BigIntegerField(null=True)
+    occurred_at = models.DateTimeField()
+
+    class Meta:
+        abstract = True
+
+class LeaveSnapshot(models.Model):
+    """The state of every leave at `taken_at`, the starting point for replaying history"""
+    taken_at = models.DateTimeField(unique=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ['-taken_at']
+
+    def __str__(self):
+        return f"Leave snapshot at {self.taken_at}"
+
+class LeaveSnapshotRow(models.Model):
+    snapshot = models.ForeignKey(LeaveSnapshot, on_delete=models.CASCADE, related_name='rows')
+    leave_id = models.BigIntegerField()
+    employee_id = models.BigIntegerField()
+    leave_type_id = models.BigIntegerField()
+    status = models.CharField(max_length=10)
+    start_date = models.DateField()
+    end_date = models.DateField()
+
+    def __str__(self):
+        return f"Leave {self.leave_id}: {self.status}"
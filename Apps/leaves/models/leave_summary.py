@@ -0,0 +1,21 @@
+from django.db import models
+from employees.models import Employee
+from .leave_type import LeaveType
+
+class LeaveMonthlySummary(models.Model):
+    """Approved leave days per employee, leave type and calendar month"""
+    employee = models.ForeignKey(Employee, on_delete=models.CASCADE, related_name='leave_summaries')
+    leave_type = models.ForeignKey(LeaveType, on_delete=models.CASCADE, related_name='summaries')
+    month = models.DateField(help_text='First day of the month')
+    days = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['employee', 'leave_type', 'month'], name='unique_leave_monthly_summary'),
+        ]
+        indexes = [
+            models.Index(fields=['month', 'leave_type'], name='leave_summary_month_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.employee} - {self.leave_type} {self.month:%Y-%m}: {self.days} day(s)"
\ No newline at end of file
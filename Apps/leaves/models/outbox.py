@@ -0,0 +1,33 @@
+from django.db import models
+from django.utils import timezone
+
+class OutboxEvent(models.Model):
+    """
+    A leave lifecycle event waiting to be delivered to the notification sinks.
+
+    Rows are written in the same transaction as the change they describe and
+    delivered afterwards by the `drain_outbox` worker.
+    """
+    event_type = models.CharField(max_length=50)
+    payload = models.JSONField()
+    created_at = models.DateTimeField(auto_now_add=True)
+    # Next delivery attempt; pushed forward while a worker holds the event and after failures
+    available_at = models.DateTimeField(default=timezone.now)
+    # Set by the worker that claimed the event, so each claim knows which rows it got
+    lease_token = models.UUIDField(null=True, blank=True)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    last_error = models.TextField(blank=True)
+    delivered_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            # Worker: undelivered events that are due, oldest first
+            models.Index(
+                fields=['available_at', 'id'],
+                name='outbox_pending_idx',
+                condition=models.Q(delivered_at__isnull=True),
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.event_type} #{self.pk}"
@@ -0,0 +1,35 @@
+from django.db import models
+
+class WorkCalendar(models.Model):
+    """Working week and public holidays used to count leave days"""
+    MONDAY_TO_FRIDAY = 0b0011111
+
+    name = models.CharField(max_length=100, unique=True)
+    work_week = models.PositiveSmallIntegerField(
+        default=MONDAY_TO_FRIDAY,
+        help_text='Bit mask of working weekdays, bit 0 = Monday ... bit 6 = Sunday'
+    )
+    is_default = models.BooleanField(default=False)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['is_default'], condition=models.Q(is_default=True), name='single_default_work_calendar'
+            ),
+        ]
+
+    def __str__(self):
+        return self.name
+
+class Holiday(models.Model):
+    calendar = models.ForeignKey(WorkCalendar, on_delete=models.CASCADE, related_name='holidays')
+    date = models.DateField()
+    name = models.CharField(max_length=100)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['calendar', 'date'], name='unique_holiday_date'),
+        ]
+
+    def __str__(self):
+        return f"{self.name} ({self.date})"
\ No newline at end of file
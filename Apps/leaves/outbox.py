@@ -0,0 +1,189 @@
+"""
+Transactional outbox for leave lifecycle notifications.
+
+Reviews only insert `OutboxEvent` rows, in the transaction that changes the
+leave, so an event exists if and only if the change committed and the request
+never waits on a mail server or payroll. The `drain_outbox` worker claims due
+events in batches, hands them to every configured sink and marks them
+delivered. A failed batch is retried with exponential backoff; a worker that
+dies mid-batch loses its claim when the lease runs out. Delivery is therefore
+at least once: sinks receive each event's id and should ignore repeats.
+
+An event that has failed MAX_ATTEMPTS times is dead-lettered: it is no longer
+claimed, `drain_outbox` reports it, and it stays in the table until it is
+retried or purged.
+
+Sinks are configured in settings, e.g.::
+
+    LEAVE_OUTBOX_SINKS = [
+        {'BACKEND': 'leaves.outbox.HttpSink', 'OPTIONS': {'url': 'http://payroll.local/leave-events'}},
+    ]
+"""
+import datetime
+import json
+import os
+import random
+import urllib.request
+import uuid
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.utils import timezone
+from django.utils.module_loading import import_string
+from .models import OutboxEvent
+
+# How long a claimed batch is hidden from other workers
+LEASE_SECONDS = 300
+# Retry delays: RETRY_BASE_SECONDS doubled per attempt, at most RETRY_MAX_SECONDS
+RETRY_BASE_SECONDS = 30
+RETRY_MAX_SECONDS = 3600
+MAX_ATTEMPTS = 10
+
+def enqueue(leaves, old_status, new_status, approver=None, comments=''):
+    """
+    Record a status change of leaves as events, with a single INSERT.
+    Must run inside the transaction that changes the leaves.
+    """
+    occurred_at = timezone.now().isoformat()
+    OutboxEvent.objects.bulk_create([
+        OutboxEvent(
+            event_type=f'leave.{new_status}',
+            payload={
+                'leave_id': leave.pk,
+                'employee_id': leave.employee_id,
+                'leave_type_id': leave.leave_type_id,
+                'start_date': leave.start_date.isoformat(),
+                'end_date': leave.end_date.isoformat(),
+                'working_days': leave.working_days,
+                'previous_status': old_status,
+                'status': new_status,
+                'approver_id': approver.pk if approver is not None else None,
+                'comments': comments,
+                'occurred_at': occurred_at,
+            },
+        )
+        for leave in leaves
+    ])
+
+def as_message(event):
+    """What sinks receive for an event"""
+    return {
+        'id': event.pk,
+        'type': event.event_type,
+        'created_at': event.created_at,
+        'payload': event.payload,
+    }
+
+class FileSink:
+    """Append events to a file, one JSON document per line"""
+    def __init__(self, path):
+        self.path = path
+
+    def send(self, messages):
+        lines = ''.join(json.dumps(message, cls=DjangoJSONEncoder) + '\n' for message in messages)
+        with open(self.path, 'a', encoding='utf-8') as f:
+            f.write(lines)
+            f.flush()
+            os.fsync(f.fileno())
+
+class HttpSink:
+    """POST a batch of events as {"events": [...]}; any non-2xx answer is a failure"""
+    def __init__(self, url, timeout=10, headers=None):
+        self.url = url
+        self.timeout = timeout
+        self.headers = {'Content-Type': 'application/json', **(headers or {})}
+
+    def send(self, messages):
+        body = json.dumps({'events': messages}, cls=DjangoJSONEncoder).encode()
+        request = urllib.request.Request(self.url, data=body, headers=self.headers, method='POST')
+        # urlopen raises HTTPError for 4xx/5xx answers
+        with urllib.request.urlopen(request, timeout=self.timeout) as response:
+            response.read()
+
+def get_sinks():
+    """Instantiate the sinks listed in settings.LEAVE_OUTBOX_SINKS"""
+    return [
+        import_string(config['BACKEND'])(**config.get('OPTIONS', {}))
+        for config in getattr(settings, 'LEAVE_OUTBOX_SINKS', [])
+    ]
+
+def retry_delay(attempts):
+    """Seconds before the next try after `attempts` failures, with jitter so workers do not retry in step"""
+    delay = min(RETRY_BASE_SECONDS * 2 ** (attempts - 1), RETRY_MAX_SECONDS)
+    return delay * random.uniform(0.5, 1)
+
+def claim(batch_size, max_attempts=MAX_ATTEMPTS):
+    """
+    Take up to `batch_size` due events for this worker.
+
+    The conditional UPDATE only matches events that are still due, so two
+    workers racing for the same rows split them instead of both sending them.
+    """
+    now = timezone.now()
+    token = uuid.uuid4()
+    due = OutboxEvent.objects.filter(
+        delivered_at__isnull=True, available_at__lte=now, attempts__lt=max_attempts
+    ).order_by('available_at', 'id').values_list('id', flat=True)[:batch_size]
+    due = list(due)
+    OutboxEvent.objects.filter(pk__in=due, delivered_at__isnull=True, available_at__lte=now).update(
+        lease_token=token, available_at=now + datetime.timedelta(seconds=LEASE_SECONDS)
+    )
+    return list(OutboxEvent.objects.filter(pk__in=due, lease_token=token).order_by('id'))
+
+def deliver(events, sinks):
+    """
+    Send claimed events to every sink and record the outcome.
+    Returns True if the batch was delivered.
+    """
+    messages = [as_message(event) for event in events]
+    try:
+        for sink in sinks:
+            sink.send(messages)
+    except Exception as exc:
+        now = timezone.now()
+        for event in events:
+            event.attempts += 1
+            event.available_at = now + datetime.timedelta(seconds=retry_delay(event.attempts))
+            event.last_error = f'{type(exc).__name__}: {exc}'[:2000]
+        OutboxEvent.objects.bulk_update(events, ['attempts', 'available_at', 'last_error'])
+        return False
+    OutboxEvent.objects.filter(pk__in=[event.pk for event in events]).update(
+        delivered_at=timezone.now(), last_error=''
+    )
+    return True
+
+def drain(sinks, batch_size=100, max_attempts=MAX_ATTEMPTS):
+    """
+    Deliver due events until none are left or a batch fails.
+    Returns (delivered, failed) event counts.
+    """
+    delivered = failed = 0
+    while True:
+        events = claim(batch_size, max_attempts)
+        if not events:
+            break
+        if deliver(events, sinks):
+            delivered += len(events)
+        else:
+            failed += len(events)
+            break
+    return delivered, failed
+
+def dead_letters(max_attempts=MAX_ATTEMPTS):
+    """Undelivered events that have used up their attempts and are no longer claimed"""
+    return OutboxEvent.objects.filter(delivered_at__isnull=True, attempts__gte=max_attempts)
+
+def retry_dead(max_attempts=MAX_ATTEMPTS):
+    """Give dead-lettered events a fresh set of attempts, due now, and return how many there were"""
+    return dead_letters(max_attempts).update(attempts=0, available_at=timezone.now(), lease_token=None)
+
+def purge_dead(days, max_attempts=MAX_ATTEMPTS):
+    """Delete dead-lettered events created more than `days` days ago and return how many were removed"""
+    cutoff = timezone.now() - datetime.timedelta(days=days)
+    deleted, _ = dead_letters(max_attempts).filter(created_at__lt=cutoff).delete()
+    return deleted
+
+def purge_delivered(days):
+    """Delete events delivered more than `days` days ago and return how many were removed"""
+    cutoff = timezone.now() - datetime.timedelta(days=days)
+    deleted, _ = OutboxEvent.objects.filter(delivered_at__lt=cutoff).delete()
+    return deleted
@@ -0,0 +1,8 @@
+"""
+Cached leave types (see authentication.reference); leaves.signals
+invalidates them on save and delete.
+"""
+from authentication.reference import ReferenceCache
+from .models import LeaveType
+
+leave_types = ReferenceCache('leaves:leave-types', LeaveType.objects.all())
@@ -1,13 +1,23 @@
 from .leave_type import LeaveTypeSerializer
-from .leave import LeaveSerializer, LeaveDetailSerializer
-from .leave_approval import LeaveApprovalSerializer, LeaveApprovalInfoSerializer
+from .leave import (
+    LeaveSerializer, LeaveDetailSerializer, LeaveConflictQuerySerializer, LeaveCalendarQuerySerializer,
+    LeaveAnalyticsQuerySerializer, LeaveAsOfQuerySerializer
+)
+from .leave_approval import LeaveApprovalSerializer, LeaveApprovalInfoSerializer, LeaveBulkReviewSerializer
+from .leave_balance import LeaveBalanceSerializer
 from .shared import LeaveBasicSerializer
 
 __all__ = [
     'LeaveTypeSerializer',
     'LeaveSerializer',
     'LeaveDetailSerializer',
+    'LeaveConflictQuerySerializer',
+    'LeaveCalendarQuerySerializer',
+    'LeaveAnalyticsQuerySerializer',
+    'LeaveAsOfQuerySerializer',
     'LeaveApprovalSerializer',
     'LeaveApprovalInfoSerializer',
+    'LeaveBulkReviewSerializer',
+    'LeaveBalanceSerializer',
     'LeaveBasicSerializer'
-] 
\ No newline at end of file
+]
\ No newline at end of file
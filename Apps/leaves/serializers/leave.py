@@ -1,14 +1,19 @@
+from django.db import transaction
 from rest_framework import serializers
-from ..models import Leave, LeaveType
+from authentication.reference import CachedPrimaryKeyRelatedField
+from authentication.sparse import SparseFieldsMixin
+from ..models import Leave
 from employees.serializers import EmployeeSerializer
 from .leave_type import LeaveTypeSerializer
 from .leave_approval import LeaveApprovalInfoSerializer
+from .. import bookkeeping, reference
+from ..intervals import overlapping_leaves
 
-class LeaveSerializer(serializers.ModelSerializer):
+class LeaveSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     employee_name = serializers.SerializerMethodField()
     leave_type_name = serializers.CharField(source='leave_type.name', read_only=True)
-    leave_type_id = serializers.PrimaryKeyRelatedField(
-        queryset=LeaveType.objects.all(),
+    leave_type_id = CachedPrimaryKeyRelatedField(
+        reference.leave_types,
         source='leave_type',
         write_only=True
     )
@@ -19,17 +24,111 @@ class LeaveSerializer(serializers.ModelSerializer):
         fields = [
             'id', 'employee_name', 'leave_type_name', 'leave_type_id',
             'start_date', 'end_date', 'reason', 'status', 'created_at',
-            'updated_at', 'duration', 'approval'
+            'updated_at', 'duration', 'working_days', 'approval'
         ]
-        read_only_fields = ['status', 'created_at', 'updated_at', 'employee_name', 'approval']
+        read_only_fields = ['status', 'created_at', 'updated_at', 'employee_name', 'working_days', 'approval']
+        # What the computed fields read, so ?fields= can load only those columns
+        field_lookups = {
+            'employee_name': ['employee__user__first_name', 'employee__user__last_name'],
+            'duration': ['start_date', 'end_date'],
+        }
+        # The same fields as functions of those lookups' values, for compiled lists
+        compiled_fields = {
+            'employee_name': lambda first_name, last_name: f"{first_name} {last_name}",
+            'duration': lambda start_date, end_date: (end_date - start_date).days + 1,
+        }
+        expandable_fields = {
+            'employee': EmployeeSerializer,
+            'leave_type': LeaveTypeSerializer,
+        }
 
     def get_employee_name(self, obj):
         return f"{obj.employee.user.first_name} {obj.employee.user.last_name}"
 
+    def validate(self, attrs):
+        start_date = attrs.get('start_date', getattr(self.instance, 'start_date', None))
+        end_date = attrs.get('end_date', getattr(self.instance, 'end_date', None))
+        if start_date and end_date:
+            if start_date > end_date:
+                raise serializers.ValidationError({"end_date": "End date cannot be before the start date."})
+
+            employee = self._get_employee()
+            if employee is not None:
+                exclude_pk = self.instance.pk if self.instance else None
+                if overlapping_leaves(employee.pk, start_date, end_date, exclude_pk).exists():
+                    raise serializers.ValidationError(
+                        {"start_date": "These dates overlap another pending or approved leave."}
+                    )
+        return attrs
+
+    def update(self, instance, validated_data):
+        old_dates = (instance.start_date, instance.end_date)
+        with transaction.atomic():
+            leave = super().update(instance, validated_data)
+            if (leave.start_date, leave.end_date) != old_dates:
+                request = self.context.get('request')
+                bookkeeping.record_date_change(leave, *old_dates, actor=getattr(request, 'user', None))
+        return leave
+
+    def _get_employee(self):
+        """The employee the leave belongs to: the instance's, or the requesting user's on create"""
+        if self.instance is not None:
+            return self.instance.employee
+        request = self.context.get('request')
+        if request is None:
+            return None
+        return getattr(request.user, 'employee', None)
+
+    @staticmethod
+    def setup_eager_loading(queryset):
+        """Join the employee's user, the leave type and the approval with its approver"""
+        return queryset.select_related('employee__user', 'leave_type', 'approval__approver')
+
 class LeaveDetailSerializer(LeaveSerializer):
     """Detailed serializer for single leave view"""
     employee = EmployeeSerializer(read_only=True)
     leave_type = LeaveTypeSerializer(read_only=True)
 
     class Meta(LeaveSerializer.Meta):
-        fields = LeaveSerializer.Meta.fields + ['employee', 'leave_type'] 
\ No newline at end of file
+        fields = LeaveSerializer.Meta.fields + ['employee', 'leave_type'] 
+
+class LeaveRangeSerializer(serializers.Serializer):
+    start_date = serializers.DateField()
+    end_date = serializers.DateField()
+
+    def validate(self, attrs):
+        if attrs['start_date'] > attrs['end_date']:
+            raise serializers.ValidationError({"end_date": "End date cannot be before the start date."})
+        return attrs
+
+class LeaveConflictQuerySerializer(serializers.Serializer):
+    """Input for checking a batch of candidate ranges against existing leaves"""
+    employee = serializers.IntegerField(required=False, min_value=1)
+    ranges = LeaveRangeSerializer(many=True, allow_empty=False, max_length=1000)
+
+class LeaveCalendarQuerySerializer(serializers.Serializer):
+    """Query parameters of the who's-out calendar"""
+    MAX_DAYS = 366
+
+    start = serializers.DateField()
+    end = serializers.DateField()
+    include_pending = serializers.BooleanField(default=False)
+    group_by = serializers.ChoiceField(choices=['day', 'employee'], default='day')
+
+    def validate(self, attrs):
+        if attrs['start'] > attrs['end']:
+            raise serializers.ValidationError({"end": "End cannot be before start."})
+        if (attrs['end'] - attrs['start']).days >= self.MAX_DAYS:
+            raise serializers.ValidationError({"end": f"The window cannot exceed {self.MAX_DAYS} days."})
+        return attrs
+
+class LeaveAnalyticsQuerySerializer(serializers.Serializer):
+    """Query parameters of the monthly analytics"""
+    year = serializers.IntegerField(min_value=1900, max_value=9999)
+    group_by = serializers.ChoiceField(choices=['leave_type', 'employee'], default='leave_type')
+
+class LeaveAsOfQuerySerializer(serializers.Serializer):
+    """Query parameters of the point-in-time leave state"""
+    at = serializers.DateTimeField()
+    status = serializers.ChoiceField(choices=Leave.STATUS_CHOICES, required=False)
+    employee = serializers.IntegerField(required=False, min_value=1)
\ No newline at end of file
@@ -1,4 +1,5 @@
 from rest_framework import serializers
+from authentication.sparse import SparseFieldsMixin
 from ..models import LeaveApproval, Leave
 from .shared import LeaveBasicSerializer
 
@@ -8,11 +9,13 @@ class LeaveApprovalInfoSerializer(serializers.ModelSerializer):
     class Meta:
         model = LeaveApproval
         fields = ['approver_name', 'comments', 'approved_at']
+        field_lookups = {'approver_name': ['approver__first_name', 'approver__last_name']}
+        compiled_fields = {'approver_name': lambda first_name, last_name: f"{first_name} {last_name}"}
 
     def get_approver_name(self, obj):
         return f"{obj.approver.first_name} {obj.approver.last_name}"
 
-class LeaveApprovalSerializer(serializers.ModelSerializer):
+class LeaveApprovalSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     approver_name = serializers.SerializerMethodField()
     leave = LeaveBasicSerializer(read_only=True)
     leave_id = serializers.PrimaryKeyRelatedField(
@@ -25,6 +28,19 @@ class LeaveApprovalSerializer(serializers.ModelSerializer):
         model = LeaveApproval
         fields = ['id', 'leave', 'leave_id', 'approver_name', 'comments', 'approved_at']
         read_only_fields = ['approved_at', 'approver_name']
+        field_lookups = {'approver_name': ['approver__first_name', 'approver__last_name']}
+        compiled_fields = {'approver_name': lambda first_name, last_name: f"{first_name} {last_name}"}
 
     def get_approver_name(self, obj):
-        return f"{obj.approver.first_name} {obj.approver.last_name}" 
\ No newline at end of file
+        return f"{obj.approver.first_name} {obj.approver.last_name}" 
+
+    @staticmethod
+    def setup_eager_loading(queryset):
+        """Join the approver and everything the nested LeaveBasicSerializer reads"""
+        return queryset.select_related('approver', 'leave__employee__user', 'leave__leave_type')
+
+class LeaveBulkReviewSerializer(serializers.Serializer):
+    """Input for approving or rejecting many leaves at once"""
+    ids = serializers.ListField(child=serializers.IntegerField(min_value=1), allow_empty=False, max_length=1000)
+    status = serializers.ChoiceField(choices=Leave.TRANSITIONS['pending'])
+    comments = serializers.CharField(required=False, allow_blank=True, default='')
\ No newline at end of file
@@ -0,0 +1,29 @@
+from rest_framework import serializers
+from authentication.sparse import SparseFieldsMixin
+from ..models import LeaveBalance
+
+class LeaveBalanceSerializer(SparseFieldsMixin, serializers.ModelSerializer):
+    employee_name = serializers.SerializerMethodField()
+    leave_type_name = serializers.CharField(source='leave_type.name', read_only=True)
+    max_days = serializers.IntegerField(source='leave_type.max_days', read_only=True)
+    remaining_days = serializers.IntegerField(read_only=True)
+
+    class Meta:
+        model = LeaveBalance
+        fields = [
+            'id', 'employee', 'employee_name', 'leave_type', 'leave_type_name', 'year',
+            'max_days', 'used_days', 'pending_days', 'remaining_days'
+        ]
+        read_only_fields = fields
+        field_lookups = {
+            'employee_name': ['employee__user__first_name', 'employee__user__last_name'],
+            'remaining_days': ['leave_type__max_days', 'used_days', 'pending_days'],
+        }
+
+    def get_employee_name(self, obj):
+        return f"{obj.employee.user.first_name} {obj.employee.user.last_name}"
+
+    @staticmethod
+    def setup_eager_loading(queryset):
+        """Join the employee's user and the leave type"""
+        return queryset.select_related('employee__user', 'leave_type')
\ No newline at end of file
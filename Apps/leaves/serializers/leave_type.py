@@ -1,7 +1,8 @@
 from rest_framework import serializers
+from authentication.sparse import SparseFieldsMixin
 from ..models import LeaveType
 
-class LeaveTypeSerializer(serializers.ModelSerializer):
+class LeaveTypeSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     class Meta:
         model = LeaveType
         fields = ['id', 'name', 'description', 'max_days'] 
\ No newline at end of file
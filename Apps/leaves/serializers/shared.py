@@ -9,6 +9,8 @@ class LeaveBasicSerializer(serializers.ModelSerializer):
     class Meta:
         model = Leave
         fields = ['id', 'employee_name', 'leave_type_name', 'start_date', 'end_date', 'status']
+        field_lookups = {'employee_name': ['employee__user__first_name', 'employee__user__last_name']}
+        compiled_fields = {'employee_name': lambda first_name, last_name: f"{first_name} {last_name}"}
 
     def get_employee_name(self, obj):
         return f"{obj.employee.user.first_name} {obj.employee.user.last_name}" 
\ No newline at end of file
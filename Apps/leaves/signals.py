@@ -0,0 +1,25 @@
+from django.db import DEFAULT_DB_ALIAS
+from django.db.models.signals import post_delete, post_migrate, post_save
+from django.dispatch import receiver
+from . import counters, history, reference, workdays
+from .models import Holiday, Leave, LeaveType, WorkCalendar
+
+@receiver([post_save, post_delete], sender=WorkCalendar)
+@receiver([post_save, post_delete], sender=Holiday)
+def invalidate_work_calendar(sender, **kwargs):
+    workdays.invalidate()
+
+@receiver([post_save, post_delete], sender=LeaveType)
+def invalidate_leave_types(sender, **kwargs):
+    reference.leave_types.invalidate()
+
+@receiver(post_delete, sender=Leave)
+def count_deleted_leave(sender, instance, **kwargs):
+    # Also reached when deleting an employee or leave type cascades to their leaves
+    counters.apply_status_changes(1, instance.status, None)
+
+@receiver(post_migrate)
+def create_event_tables(sender, app_config, using=DEFAULT_DB_ALIAS, **kwargs):
+    # History tables are created ahead of their month, not by the first write in it
+    if app_config.label == 'leaves' and using == DEFAULT_DB_ALIAS:
+        history.create_upcoming_tables()
@@ -0,0 +1,24 @@
+import datetime
+import factory
+from factory.django import DjangoModelFactory
+from authentication.tests.factories import EmployeeFactory
+from leaves.models import LeaveType, Leave
+
+class LeaveTypeFactory(DjangoModelFactory):
+    class Meta:
+        model = LeaveType
+
+    name = factory.Sequence(lambda n: f'Leave type {n}')
+    description = factory.Faker('sentence')
+    max_days = 30
+
+class LeaveFactory(DjangoModelFactory):
+    class Meta:
+        model = Leave
+
+    employee = factory.SubFactory(EmployeeFactory)
+    leave_type = factory.SubFactory(LeaveTypeFactory)
+    start_date = factory.Sequence(lambda n: datetime.date(2025, 1, 1) + datetime.timedelta(days=3 * n))
+    end_date = factory.LazyAttribute(lambda obj: obj.start_date + datetime.timedelta(days=1))
+    reason = factory.Faker('sentence')
+    status = 'pending'
@@ -0,0 +1,104 @@
+from unittest import mock
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from authentication.pagination import EstimatedCountPaginator
+from authentication.tests.factories import EmployeeFactory, UserFactory
+from employees.models import Department, Position
+from leaves import bookkeeping
+from leaves.models import Leave, LeaveApproval, LeaveBalance
+from .factories import LeaveTypeFactory, LeaveFactory
+
+class AdminChangelistTest(TestCase):
+    def setUp(self):
+        self.admin = UserFactory(is_staff=True, is_superuser=True)
+        self.client.force_login(self.admin)
+        self.leave_type = LeaveTypeFactory()
+
+    def make_leaves(self, count):
+        leaves = LeaveFactory.create_batch(count, employee=EmployeeFactory(), leave_type=self.leave_type)
+        for leave in leaves:
+            bookkeeping.record_status_change(leave, None, leave.status)
+        return leaves
+
+    def assertConstantQueries(self, url, add_rows):
+        with CaptureQueriesContext(connection) as baseline:
+            self.assertEqual(self.client.get(url).status_code, 200)
+        add_rows()
+        with CaptureQueriesContext(connection) as context:
+            self.assertEqual(self.client.get(url).status_code, 200)
+        self.assertEqual(len(context.captured_queries), len(baseline.captured_queries))
+        return context.captured_queries
+
+    def test_leave_changelist_joins_related_rows(self):
+        self.make_leaves(1)
+        queries = self.assertConstantQueries(reverse('admin:leaves_leave_changelist'), lambda: self.make_leaves(5))
+        # The page total is estimated, the unfiltered total never counted
+        counts = [query['sql'] for query in queries if 'COUNT(' in query['sql'] and 'leaves_leave"' in query['sql']]
+        self.assertEqual(len(counts), 1)
+        self.assertIn('LIMIT', counts[0])
+
+    def test_page_count_is_exact_when_the_estimate_could_hide_pages(self):
+        """Test that filtered lists and estimates at the count limit are counted exactly"""
+        self.make_leaves(5)
+        with mock.patch.object(EstimatedCountPaginator, 'count_limit', 3):
+            self.assertEqual(EstimatedCountPaginator(Leave.objects.all(), 2).count, 5)
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(reverse('admin:leaves_leave_changelist'), {'status__exact': 'pending'})
+        self.assertEqual(response.status_code, 200)
+        counts = [query['sql'] for query in context.captured_queries if 'COUNT(' in query['sql'] and 'leaves_leave"' in query['sql']]
+        self.assertTrue(counts)
+        self.assertFalse(any('LIMIT' in sql for sql in counts))
+
+    def test_employee_admin_rejects_reporting_cycles(self):
+        manager = EmployeeFactory()
+        report = EmployeeFactory(reports_to=manager)
+        response = self.client.post(reverse('admin:employees_employee_change', args=[manager.pk]), {
+            'user': manager.user.pk, 'join_date': manager.join_date, 'phone_number': manager.phone_number,
+            'reports_to': report.pk,
+        })
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('reports_to', response.context['adminform'].form.errors)
+        manager.refresh_from_db()
+        self.assertIsNone(manager.reports_to)
+
+    def test_approvals_are_read_only(self):
+        leave = self.make_leaves(1)[0]
+        approval = LeaveApproval.objects.create(leave=leave, approver=self.admin)
+        self.assertEqual(self.client.get(reverse('admin:leaves_leaveapproval_change', args=[approval.pk])).status_code, 200)
+        response = self.client.post(reverse('admin:leaves_leaveapproval_delete', args=[approval.pk]), {'post': 'yes'})
+        self.assertEqual(response.status_code, 403)
+        self.assertTrue(LeaveApproval.objects.filter(pk=approval.pk).exists())
+
+    def test_employee_and_position_changelists_join_related_rows(self):
+        department = Department.objects.create(name='Engineering')
+        EmployeeFactory(position=Position.objects.create(name='Developer', department=department))
+
+        def add_rows():
+            for i in range(4):
+                position = Position.objects.create(name=f'Position {i}', department=Department.objects.create(name=f'Dept {i}'))
+                EmployeeFactory(position=position, department=position.department)
+        self.assertConstantQueries(reverse('admin:employees_employee_changelist'), add_rows)
+        self.assertConstantQueries(reverse('admin:employees_position_changelist'), lambda: None)
+
+    def test_admin_delete_keeps_balances_in_step(self):
+        leave = self.make_leaves(1)[0]
+        balance = LeaveBalance.objects.get(employee=leave.employee, leave_type=self.leave_type)
+        self.assertEqual(balance.pending_days, leave.working_days)
+
+        response = self.client.post(reverse('admin:leaves_leave_changelist'), {
+            'action': 'delete_selected', '_selected_action': [leave.pk], 'post': 'yes',
+        })
+        self.assertEqual(response.status_code, 302)
+        self.assertFalse(Leave.objects.filter(pk=leave.pk).exists())
+        balance.refresh_from_db()
+        self.assertEqual(balance.pending_days, 0)
+
+    def test_autocomplete_lookups(self):
+        self.make_leaves(1)
+        response = self.client.get(reverse('admin:autocomplete'), {
+            'app_label': 'employees', 'model_name': 'employee', 'field_name': 'reports_to', 'term': 'user',
+        })
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.json()['results']), 1)
@@ -0,0 +1,85 @@
+import datetime
+from io import StringIO
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework.test import APIClient
+from rest_framework import status
+from authentication.tests.factories import EmployeeFactory, ManagerFactory
+from leaves.analytics import days_by_month
+from leaves.models import LeaveMonthlySummary
+from leaves.serializers import LeaveSerializer
+from .factories import LeaveTypeFactory, LeaveFactory
+
+class LeaveAnalyticsTest(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.manager = ManagerFactory()
+        self.employee = EmployeeFactory(user__first_name='Ada', user__last_name='King')
+        self.leave_type = LeaveTypeFactory(name='Vacation')
+        self.leave = LeaveFactory(employee=self.employee, leave_type=self.leave_type,
+                                  start_date=datetime.date(2025, 1, 30), end_date=datetime.date(2025, 2, 4))
+        self.analytics_url = reverse('leave-analytics')
+        self.client.force_authenticate(user=self.manager)
+
+    def review(self, new_status):
+        return self.client.put(reverse('leave-detail', kwargs={'pk': self.leave.pk}), {'status': new_status})
+
+    def summary(self):
+        return {
+            (row.month.month, row.days)
+            for row in LeaveMonthlySummary.objects.filter(employee=self.employee)
+        }
+
+    def test_days_by_month(self):
+        self.assertEqual(
+            days_by_month(datetime.date(2024, 12, 31), datetime.date(2025, 2, 1)),
+            {datetime.date(2024, 12, 1): 1, datetime.date(2025, 1, 1): 23, datetime.date(2025, 2, 1): 0},
+        )
+
+    def test_approval_adds_days_per_month(self):
+        """Test that approving a leave splits its days into monthly rows"""
+        self.review('approved')
+        self.assertEqual(self.summary(), {(1, 2), (2, 2)})
+
+    def test_rejection_adds_nothing(self):
+        self.review('rejected')
+        self.assertEqual(self.summary(), set())
+
+    def test_deleting_approved_leave_removes_days(self):
+        self.review('approved')
+        self.client.delete(reverse('leave-detail', kwargs={'pk': self.leave.pk}))
+        self.assertEqual(self.summary(), {(1, 0), (2, 0)})
+
+    def test_date_change_moves_days(self):
+        """Test that editing an approved leave's dates moves its days"""
+        self.review('approved')
+        self.leave.refresh_from_db()
+        serializer = LeaveSerializer(self.leave, data={'end_date': '2025-01-31'}, partial=True)
+        serializer.is_valid(raise_exception=True)
+        serializer.save()
+        self.assertEqual(self.summary(), {(1, 2), (2, 0)})
+
+    def test_analytics_endpoint_reads_summary_only(self):
+        """Test that the endpoint answers from the summary table in one query"""
+        self.review('approved')
+        with self.assertNumQueries(1):
+            response = self.client.get(self.analytics_url, {'year': 2025, 'group_by': 'employee'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [(row['month'], row['employee_name'], row['days']) for row in response.data['results']],
+            [('2025-01', 'Ada King', 2), ('2025-02', 'Ada King', 2)],
+        )
+
+    def test_analytics_requires_year(self):
+        response = self.client.get(self.analytics_url)
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_rebuild_matches_incremental_rows(self):
+        """Test that the rebuild command produces the same totals as the incremental updates"""
+        self.review('approved')
+        LeaveFactory(employee=self.employee, leave_type=self.leave_type, status='approved',
+                     start_date=datetime.date(2025, 2, 10), end_date=datetime.date(2025, 2, 11))
+        LeaveMonthlySummary.objects.all().delete()
+        call_command('rebuild_leave_analytics', stdout=StringIO())
+        self.assertEqual(self.summary(), {(1, 2), (2, 4)})
@@ -0,0 +1,105 @@
+import datetime
+from io import StringIO
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework.test import APIClient
+from rest_framework import status
+from authentication.tests.factories import EmployeeFactory, ManagerFactory
+from leaves.balances import days_by_year
+from leaves.models import Leave, LeaveBalance
+from .factories import LeaveTypeFactory, LeaveFactory
+
+class LeaveBalanceTest(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.manager = ManagerFactory()
+        self.employee = EmployeeFactory()
+        self.leave_type = LeaveTypeFactory(max_days=10)
+        self.leave_list_url = reverse('leave-list')
+        self.balance_list_url = reverse('leave-balance-list')
+
+    def request_leave(self, start, end):
+        self.client.force_authenticate(user=self.employee.user)
+        return self.client.post(self.leave_list_url, {
+            'leave_type_id': self.leave_type.pk,
+            'start_date': start,
+            'end_date': end,
+            'reason': 'Holiday',
+        })
+
+    def review(self, leave_id, new_status):
+        self.client.force_authenticate(user=self.manager)
+        return self.client.put(reverse('leave-detail', kwargs={'pk': leave_id}), {'status': new_status})
+
+    def balance(self, year=2025):
+        return LeaveBalance.objects.get(employee=self.employee, leave_type=self.leave_type, year=year)
+
+    def test_days_by_year_splits_ranges(self):
+        self.assertEqual(
+            days_by_year(datetime.date(2024, 12, 30), datetime.date(2025, 1, 2)),
+            {2024: 2, 2025: 2},
+        )
+
+    def test_request_holds_pending_days(self):
+        """Test that a new request is held as pending days"""
+        response = self.request_leave('2025-03-03', '2025-03-05')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual((self.balance().pending_days, self.balance().used_days), (3, 0))
+
+    def test_approval_moves_days_to_used(self):
+        """Test that approving a leave moves its days from pending to used"""
+        leave_id = self.request_leave('2025-03-03', '2025-03-05').data['id']
+        self.review(leave_id, 'approved')
+        self.assertEqual((self.balance().pending_days, self.balance().used_days), (0, 3))
+
+    def test_rejection_releases_days(self):
+        """Test that rejecting a leave gives the days back"""
+        leave_id = self.request_leave('2025-03-03', '2025-03-05').data['id']
+        self.review(leave_id, 'rejected')
+        self.assertEqual((self.balance().pending_days, self.balance().used_days), (0, 0))
+
+    def test_approval_endpoint_moves_days_to_used(self):
+        """Test that approving through the approvals endpoint updates the ledger"""
+        leave_id = self.request_leave('2025-03-03', '2025-03-04').data['id']
+        self.client.force_authenticate(user=self.manager)
+        response = self.client.post(reverse('leave-approval-list'), {'leave_id': leave_id})
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(self.balance().used_days, 2)
+
+    def test_request_over_allowance_is_rejected(self):
+        """Test that a request exceeding max_days is refused"""
+        self.request_leave('2025-03-03', '2025-03-09')
+        # 5 + 6 working days
+        response = self.request_leave('2025-04-01', '2025-04-08')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('leave_type_id', response.data)
+        self.assertEqual(Leave.objects.count(), 1)
+
+    def test_deleting_leave_releases_days(self):
+        """Test that deleting a leave removes its days from the ledger"""
+        leave_id = self.request_leave('2025-03-03', '2025-03-05').data['id']
+        self.client.force_authenticate(user=self.manager)
+        self.client.delete(reverse('leave-detail', kwargs={'pk': leave_id}))
+        self.assertEqual(self.balance().pending_days, 0)
+
+    def test_balance_endpoint(self):
+        """Test that employees read their own balances"""
+        self.request_leave('2025-03-03', '2025-03-05')
+        self.client.force_authenticate(user=self.employee.user)
+        response = self.client.get(self.balance_list_url, {'year': 2025})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        row = response.data['results'][0]
+        self.assertEqual((row['pending_days'], row['remaining_days'], row['max_days']), (3, 7, 10))
+
+    def test_reconcile_rebuilds_ledger(self):
+        """Test that the reconcile command rebuilds the same totals"""
+        approved = LeaveFactory(employee=self.employee, leave_type=self.leave_type,
+                                start_date=datetime.date(2025, 12, 30), end_date=datetime.date(2026, 1, 1),
+                                status='approved')
+        LeaveFactory(employee=self.employee, leave_type=self.leave_type, status='rejected')
+        call_command('reconcile_leave_balances', stdout=StringIO())
+        self.assertEqual(self.balance(2025).used_days, 2)
+        self.assertEqual(self.balance(2026).used_days, 1)
+        self.assertEqual(LeaveBalance.objects.count(), 2)
+        self.assertEqual(approved.duration, 3)
@@ -0,0 +1,55 @@
+import datetime
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework.test import APIClient
+from rest_framework import status
+from authentication.tests.factories import EmployeeFactory, ManagerFactory
+from .factories import LeaveTypeFactory, LeaveFactory
+
+class LeaveCalendarTest(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.manager = ManagerFactory()
+        self.alice = EmployeeFactory(user__first_name='Alice', user__last_name='Smith')
+        self.bob = EmployeeFactory(user__first_name='Bob', user__last_name='Jones')
+        leave_type = LeaveTypeFactory(name='Vacation')
+        self.approved = LeaveFactory(employee=self.alice, leave_type=leave_type, status='approved',
+                                     start_date=datetime.date(2025, 2, 27), end_date=datetime.date(2025, 3, 2))
+        self.pending = LeaveFactory(employee=self.bob, leave_type=leave_type,
+                                    start_date=datetime.date(2025, 3, 2), end_date=datetime.date(2025, 3, 3))
+        LeaveFactory(employee=self.bob, leave_type=leave_type, status='approved',
+                     start_date=datetime.date(2025, 4, 1), end_date=datetime.date(2025, 4, 2))
+        self.calendar_url = reverse('leave-calendar')
+        self.client.force_authenticate(user=self.manager)
+
+    def test_group_by_day(self):
+        """Test that approved leaves are listed on each day they cover inside the window"""
+        with self.assertNumQueries(1):
+            response = self.client.get(self.calendar_url, {'start': '2025-03-01', 'end': '2025-03-03'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        days = {str(row['date']): [out['employee_name'] for out in row['out']] for row in response.data['results']}
+        self.assertEqual(days, {
+            '2025-03-01': ['Alice Smith'],
+            '2025-03-02': ['Alice Smith'],
+            '2025-03-03': [],
+        })
+
+    def test_include_pending_grouped_by_employee(self):
+        """Test that pending leaves are included on request and grouped per employee"""
+        response = self.client.get(self.calendar_url, {
+            'start': '2025-03-01', 'end': '2025-03-31', 'include_pending': 'true', 'group_by': 'employee',
+        })
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [(row['employee_name'], [leave['id'] for leave in row['leaves']]) for row in response.data['results']],
+            [('Alice Smith', [self.approved.pk]), ('Bob Jones', [self.pending.pk])],
+        )
+
+    def test_invalid_window(self):
+        response = self.client.get(self.calendar_url, {'start': '2025-03-10', 'end': '2025-03-01'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_calendar_requires_manager(self):
+        self.client.force_authenticate(user=self.alice.user)
+        response = self.client.get(self.calendar_url, {'start': '2025-03-01', 'end': '2025-03-03'})
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
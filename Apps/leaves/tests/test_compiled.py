@@ -0,0 +1,95 @@
+from io import StringIO
+from unittest import mock
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import serializers, status
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIClient
+from authentication.compiled import compile_serializer
+from authentication.tests.factories import EmployeeFactory, ManagerFactory
+from employees.models import Department, Employee
+from employees.serializers import EmployeeSerializer
+from leaves import transitions
+from leaves.models import Leave, LeaveApproval
+from leaves.serializers import LeaveApprovalSerializer, LeaveSerializer
+from .factories import LeaveTypeFactory, LeaveFactory
+
+class CompiledListTest(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.manager = ManagerFactory(first_name='Ann', last_name='Boss')
+        self.client.force_authenticate(user=self.manager)
+        department = Department.objects.create(name='Engineering')
+        self.employees = [EmployeeFactory(department=department), EmployeeFactory()]
+        leave_type = LeaveTypeFactory()
+        self.leaves = [LeaveFactory(employee=employee, leave_type=leave_type) for employee in self.employees * 2]
+        transitions.transition(self.leaves[0], 'approved', self.manager, 'Enjoy')
+
+    def assertSameOutput(self, url, params, serializer_class, queryset, **kwargs):
+        """The list renders byte for byte what the serializer renders for the same rows"""
+        # The rows never become model instances
+        with mock.patch.object(queryset.model, 'from_db', side_effect=AssertionError('instance built')):
+            response = self.client.get(url, params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        expected = serializer_class(serializer_class.setup_eager_loading(queryset), many=True, **kwargs).data
+        self.assertEqual(JSONRenderer().render(response.data['results']), JSONRenderer().render(expected))
+
+    def test_leave_list(self):
+        self.assertSameOutput(reverse('leave-list'), {}, LeaveSerializer, Leave.objects.all())
+        self.assertSameOutput(
+            reverse('leave-list'), {'expand': 'employee,leave_type'}, LeaveSerializer, Leave.objects.all(),
+            expand=['employee', 'leave_type'],
+        )
+        self.assertSameOutput(
+            reverse('leave-list'), {'fields': 'id,employee_name,approval', 'cursor': ''}, LeaveSerializer,
+            Leave.objects.order_by('-created_at', '-id'), fields=['id', 'employee_name', 'approval'],
+        )
+
+    def test_count_leaves_out_the_projection_joins(self):
+        with CaptureQueriesContext(connection) as context:
+            self.client.get(reverse('leave-list'))
+        count = next(query['sql'] for query in context.captured_queries if 'COUNT(*)' in query['sql'])
+        self.assertNotIn('JOIN', count)
+
+    def test_employee_list(self):
+        self.assertSameOutput(reverse('employee-list'), {}, EmployeeSerializer, Employee.objects.all())
+        self.assertSameOutput(
+            reverse('employee-list'), {'expand': 'department'}, EmployeeSerializer, Employee.objects.all(),
+            expand=['department'],
+        )
+
+    def test_approval_list(self):
+        self.assertSameOutput(
+            reverse('leave-approval-list'), {}, LeaveApprovalSerializer, LeaveApproval.objects.filter(approver=self.manager)
+        )
+
+    def test_keyset_pages_and_validators_read_the_rows(self):
+        response = self.client.get(reverse('leave-list'), {'cursor': '', 'page_size': 3})
+        second = self.client.get(response.data['next'])
+        ids = [row['id'] for row in response.data['results'] + second.data['results']]
+        self.assertEqual(ids, list(Leave.objects.values_list('id', flat=True)))
+        etag = self.client.get(reverse('leave-list'))['ETag']
+        response = self.client.get(reverse('leave-list'), HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_serializers_that_do_not_compile_fall_back(self):
+        class Uncompiled(serializers.ModelSerializer):
+            label = serializers.SerializerMethodField()
+
+            class Meta:
+                model = Leave
+                fields = ['id', 'label']
+
+            def get_label(self, obj):
+                return str(obj)
+
+        self.assertIsNone(compile_serializer(Uncompiled()))
+
+    def test_benchmark_command(self):
+        out = StringIO()
+        call_command('benchmark_list_serialization', rows=10, repeat=1, stdout=out)
+        self.assertEqual(out.getvalue().count('identical output'), 3)
+        self.assertEqual(Leave.objects.count(), 4)
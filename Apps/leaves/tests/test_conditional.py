@@ -0,0 +1,116 @@
+from unittest import mock
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APIClient
+from rest_framework import status
+from authentication.tests.factories import EmployeeFactory, ManagerFactory
+from leaves.models import Leave
+from .factories import LeaveTypeFactory, LeaveFactory
+
+class ConditionalRequestTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.manager = ManagerFactory()
+        self.client.force_authenticate(user=self.manager)
+        self.employee = EmployeeFactory()
+        self.leave_type = LeaveTypeFactory()
+        self.leaves = LeaveFactory.create_batch(3, employee=self.employee, leave_type=self.leave_type)
+        self.list_url = reverse('leave-list')
+        self.detail_url = reverse('leave-detail', kwargs={'pk': self.leaves[0].pk})
+
+    def test_list_not_modified_skips_serializers(self):
+        response = self.client.get(self.list_url)
+        etag = response['ETag']
+        self.assertTrue(etag.startswith('W/"'))
+        self.assertIn('Last-Modified', response)
+
+        with mock.patch('leaves.views.LeaveSerializer.to_representation') as to_representation:
+            with CaptureQueriesContext(connection) as context:
+                response = self.client.get(self.list_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(response['ETag'], etag)
+        to_representation.assert_not_called()
+        self.assertEqual(len(context.captured_queries), 2)  # count and page
+
+        # A change on the page, or a row leaving it, changes the validator
+        Leave.objects.filter(pk=self.leaves[1].pk).update(reason='Changed', updated_at=self.leaves[1].updated_at.replace(year=2030))
+        response = self.client.get(self.list_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        etag = response['ETag']
+        Leave.objects.filter(pk=self.leaves[2].pk).delete()
+        response = self.client.get(self.list_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data['results']), 2)
+
+    def test_detail_if_modified_since(self):
+        response = self.client.get(self.detail_url)
+        last_modified = response['Last-Modified']
+        response = self.client.get(self.detail_url, HTTP_IF_MODIFIED_SINCE=last_modified)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        response = self.client.get(self.detail_url, HTTP_IF_NONE_MATCH='W/"stale"')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_sparse_fields_keep_the_validator_loaded(self):
+        response = self.client.get(self.list_url, {'fields': 'id'})
+        etag = response['ETag']
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(self.list_url, {'fields': 'id'}, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(len(context.captured_queries), 2)  # count and page
+
+    def test_if_match_on_update(self):
+        etag = self.client.get(self.detail_url)['ETag']
+        # Someone else changes the leave in between
+        Leave.objects.filter(pk=self.leaves[0].pk).update(reason='Edited elsewhere', updated_at=self.leaves[0].updated_at.replace(year=2030))
+        response = self.client.patch(self.detail_url, {'status': 'approved'}, format='json', HTTP_IF_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_412_PRECONDITION_FAILED)
+        self.assertEqual(Leave.objects.get(pk=self.leaves[0].pk).status, 'pending')
+
+        etag = self.client.get(self.detail_url)['ETag']
+        response = self.client.patch(self.detail_url, {'status': 'approved'}, format='json', HTTP_IF_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['status'], 'approved')
+        self.assertNotEqual(response['ETag'], etag)
+        self.assertEqual(response['ETag'], self.client.get(self.detail_url)['ETag'])
+
+    def test_employee_validators_follow_user_changes(self):
+        url = reverse('employee-detail', kwargs={'pk': self.employee.pk})
+        etag = self.client.get(url)['ETag']
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, status.HTTP_304_NOT_MODIFIED)
+
+        user = self.employee.user
+        user.last_login = user.date_joined
+        user.save(update_fields=['last_login'])
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, status.HTTP_304_NOT_MODIFIED)
+
+        user.first_name = 'Renamed'
+        user.save()
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['user_first_name'], 'Renamed')
+
+    def test_validators_follow_embedded_rows(self):
+        """Test that editing the employee or leave type a leave embeds invalidates its validators"""
+        etag = self.client.get(self.detail_url)['ETag']
+        self.employee.phone_number = '0999999999'
+        self.employee.save()
+        response = self.client.get(self.detail_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['employee']['phone_number'], '0999999999')
+
+        etag = response['ETag']
+        list_etag = self.client.get(self.list_url)['ETag']
+        with self.captureOnCommitCallbacks(execute=True):
+            self.leave_type.name = 'Renamed'
+            self.leave_type.max_days = 40
+            self.leave_type.save()
+        response = self.client.get(self.detail_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['leave_type']['max_days'], 40)
+        response = self.client.get(self.list_url, HTTP_IF_NONE_MATCH=list_etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['results'][0]['leave_type_name'], 'Renamed')
@@ -0,0 +1,85 @@
+from io import StringIO
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APIClient
+from rest_framework import status
+from authentication.tests.factories import EmployeeFactory, ManagerFactory
+from leaves.models import LeaveApproval, LeaveStatusCount
+from .factories import LeaveTypeFactory, LeaveFactory
+
+class LeaveCounterTest(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.manager = ManagerFactory()
+        self.employee = EmployeeFactory()
+        self.leave_type = LeaveTypeFactory()
+        self.summary_url = reverse('leave-summary')
+
+    def request_leave(self, start, end):
+        self.client.force_authenticate(user=self.employee.user)
+        return self.client.post(reverse('leave-list'), {
+            'leave_type_id': self.leave_type.pk, 'start_date': start, 'end_date': end, 'reason': 'Rest',
+        }).data['id']
+
+    def summary(self):
+        self.client.force_authenticate(user=self.manager)
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(self.summary_url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertFalse(any('"leaves_leave"' in query['sql'] for query in context.captured_queries))
+        return response.data
+
+    def test_counters_follow_the_write_paths(self):
+        """Test that requests, reviews and bulk reviews keep the counters in step"""
+        first = self.request_leave('2025-03-03', '2025-03-04')
+        second = self.request_leave('2025-03-10', '2025-03-11')
+        third = self.request_leave('2025-03-17', '2025-03-18')
+        self.assertEqual(self.summary()['by_status']['pending'], 3)
+
+        self.client.put(reverse('leave-detail', kwargs={'pk': first}), {'status': 'approved'})
+        self.client.post(reverse('leave-bulk-review'), {'ids': [second], 'status': 'rejected'}, format='json')
+        self.client.post(reverse('leave-approval-list'), {'leave_id': third})
+
+        data = self.summary()
+        self.assertEqual(data['by_status'], {'pending': 0, 'approved': 2, 'rejected': 1, 'cancelled': 0})
+        self.assertEqual(data['reviewed_by_me_this_week'], {'approved': 2, 'rejected': 1})
+
+    def test_deleting_leave_decrements_status(self):
+        leave_id = self.request_leave('2025-03-03', '2025-03-04')
+        self.client.force_authenticate(user=self.manager)
+        self.client.delete(reverse('leave-detail', kwargs={'pk': leave_id}))
+        self.assertEqual(self.summary()['by_status']['pending'], 0)
+
+    def test_cascaded_deletes_decrement_status(self):
+        """Test that leaves deleted along with their employee leave the counters"""
+        self.request_leave('2025-03-03', '2025-03-04')
+        other = EmployeeFactory()
+        self.client.force_authenticate(user=other.user)
+        self.client.post(reverse('leave-list'), {
+            'leave_type_id': self.leave_type.pk, 'start_date': '2025-03-03', 'end_date': '2025-03-04', 'reason': 'Rest',
+        })
+        self.assertEqual(self.summary()['by_status']['pending'], 2)
+
+        self.employee.delete()
+        self.assertEqual(self.summary()['by_status']['pending'], 1)
+
+    def test_rebuild_counters(self):
+        """Test that the rebuild command recounts from the leave and approval tables"""
+        LeaveFactory.create_batch(2, employee=self.employee, leave_type=self.leave_type)
+        approved = LeaveFactory(employee=self.employee, leave_type=self.leave_type, status='approved')
+        LeaveApproval.objects.create(leave=approved, approver=self.manager)
+        call_command('rebuild_leave_counters', stdout=StringIO())
+
+        data = self.summary()
+        self.assertEqual(data['by_status']['pending'], 2)
+        self.assertEqual(data['by_status']['approved'], 1)
+        self.assertEqual(data['reviewed_by_me_this_week'], {'approved': 1})
+        self.assertEqual(LeaveStatusCount.objects.count(), 2)
+
+    def test_summary_requires_manager(self):
+        self.client.force_authenticate(user=self.employee.user)
+        response = self.client.get(self.summary_url)
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
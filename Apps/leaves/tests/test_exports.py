@@ -0,0 +1,54 @@
+import csv
+import io
+import json
+from django.http import StreamingHttpResponse
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework.test import APIClient
+from rest_framework import status
+from authentication.tests.factories import EmployeeFactory, ManagerFactory
+from leaves.models import LeaveApproval
+from .factories import LeaveTypeFactory, LeaveFactory
+
+class LeaveExportTest(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.manager = ManagerFactory()
+        self.employee = EmployeeFactory()
+        leave_type = LeaveTypeFactory(name='Vacation')
+        self.approved = LeaveFactory(employee=self.employee, leave_type=leave_type, status='approved')
+        LeaveApproval.objects.create(leave=self.approved, approver=self.manager, comments='Fine')
+        LeaveFactory.create_batch(2, employee=self.employee, leave_type=leave_type)
+        self.export_url = reverse('leave-export')
+        self.client.force_authenticate(user=self.manager)
+
+    def read(self, response):
+        self.assertIsInstance(response, StreamingHttpResponse)
+        return b''.join(response.streaming_content).decode()
+
+    def test_csv_export(self):
+        """Test that the CSV export has a header and one line per leave"""
+        response = self.client.get(self.export_url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response['Content-Type'], 'text/csv')
+        rows = list(csv.DictReader(io.StringIO(self.read(response))))
+        self.assertEqual(len(rows), 3)
+        approved = next(row for row in rows if row['id'] == str(self.approved.pk))
+        self.assertEqual(approved['approver_username'], self.manager.username)
+        self.assertEqual(approved['leave_type'], 'Vacation')
+
+    def test_ndjson_export_honours_list_filters(self):
+        """Test that NDJSON rows follow the same filters as the list endpoint"""
+        response = self.client.get(self.export_url, {'export_format': 'ndjson', 'status': 'approved'})
+        rows = [json.loads(line) for line in self.read(response).splitlines()]
+        self.assertEqual([row['id'] for row in rows], [self.approved.pk])
+        self.assertEqual(rows[0]['approval_comments'], 'Fine')
+
+    def test_unknown_format(self):
+        response = self.client.get(self.export_url, {'export_format': 'xml'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_export_requires_manager(self):
+        self.client.force_authenticate(user=self.employee.user)
+        response = self.client.get(self.export_url)
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
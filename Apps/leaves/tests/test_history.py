@@ -0,0 +1,182 @@
+import datetime
+from io import StringIO
+from unittest import mock
+from django.core.management import CommandError, call_command
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+from rest_framework import status
+from authentication.tests.factories import EmployeeFactory, ManagerFactory
+from leaves import history
+from leaves.models import LeaveSnapshot
+from .factories import LeaveTypeFactory
+
+def moment(month, day=1):
+    return datetime.datetime(2025, month, day, 12, tzinfo=datetime.timezone.utc)
+
+class LeaveHistoryTest(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.manager = ManagerFactory()
+        self.employee = EmployeeFactory()
+        self.leave_type = LeaveTypeFactory()
+        self.as_of_url = reverse('leave-as-of')
+
+    def at(self, when):
+        return mock.patch('leaves.history.timezone.now', return_value=when)
+
+    def request_leave(self, start='2025-03-03', end='2025-03-04'):
+        self.client.force_authenticate(user=self.employee.user)
+        return self.client.post(reverse('leave-list'), {
+            'leave_type_id': self.leave_type.pk, 'start_date': start, 'end_date': end, 'reason': 'Rest',
+        }).data['id']
+
+    def review(self, leave_id, new_status):
+        self.client.force_authenticate(user=self.manager)
+        return self.client.put(reverse('leave-detail', kwargs={'pk': leave_id}), {'status': new_status})
+
+    def test_events_record_every_change_with_actor(self):
+        with self.at(moment(2)):
+            leave_id = self.request_leave()
+        with self.at(moment(3)):
+            self.review(leave_id, 'approved')
+
+        february = history.event_model(datetime.date(2025, 2, 1)).objects.get()
+        march = history.event_model(datetime.date(2025, 3, 1)).objects.get()
+        self.assertEqual((february.kind, february.status, february.actor_id), ('created', 'pending', self.employee.user.pk))
+        self.assertEqual((march.kind, march.previous_status, march.status, march.actor_id),
+                         ('status', 'pending', 'approved', self.manager.pk))
+        # Later months are the tables created ahead after migrate
+        self.assertEqual(history.event_months()[:2], [datetime.date(2025, 2, 1), datetime.date(2025, 3, 1)])
+
+    def test_writes_use_tables_created_ahead(self):
+        """Test that recording into a table created ahead runs no DDL"""
+        with self.at(moment(6)):
+            history.create_upcoming_tables()
+        self.assertEqual(history.event_months()[:3], [datetime.date(2025, 6, 1), datetime.date(2025, 7, 1), datetime.date(2025, 8, 1)])
+        history._tables.clear()
+
+        with self.at(moment(8)), CaptureQueriesContext(connection) as context:
+            self.request_leave()
+        self.assertFalse(any(query['sql'].startswith('CREATE') for query in context.captured_queries))
+        self.assertEqual(history.event_model(datetime.date(2025, 8, 1)).objects.count(), 1)
+
+    def test_as_of_replays_across_months(self):
+        with self.at(moment(1, 10)):
+            first = self.request_leave('2025-03-03', '2025-03-04')
+            second = self.request_leave('2025-04-07', '2025-04-08')
+        with self.at(moment(2, 10)):
+            self.review(first, 'approved')
+        with self.at(moment(3, 10)):
+            self.client.delete(reverse('leave-detail', kwargs={'pk': second}))
+
+        self.assertEqual(history.as_of(moment(1, 1))[0], {})
+        state = history.as_of(moment(1, 20))[0]
+        self.assertEqual({leave_id: row['status'] for leave_id, row in state.items()},
+                         {first: 'pending', second: 'pending'})
+        state = history.as_of(moment(3, 20))[0]
+        self.assertEqual({leave_id: row['status'] for leave_id, row in state.items()}, {first: 'approved'})
+
+    def test_snapshot_matches_replay(self):
+        """Test that replaying from a snapshot gives the same state as replaying every event"""
+        with self.at(moment(1, 10)):
+            first = self.request_leave('2025-03-03', '2025-03-04')
+            LeaveSnapshot.objects.create(taken_at=moment(1, 5))
+        with self.at(moment(2, 10)):
+            second = self.request_leave('2025-04-07', '2025-04-08')
+            self.review(first, 'rejected')
+        expected = history.as_of(moment(3, 1))[0]
+
+        snapshot = history.take_snapshot(moment(2, 20))
+        self.assertEqual(snapshot.rows.count(), 2)
+        state, used = history.as_of(moment(3, 1))
+        self.assertEqual(used, snapshot)
+        self.assertEqual(state, expected)
+        self.assertEqual(state[second]['status'], 'pending')
+
+    def test_status_filter_follows_changes_after_snapshot(self):
+        """Test that filtering the snapshot by status still finds leaves whose status changed after it"""
+        with self.at(moment(1, 10)):
+            first = self.request_leave('2025-03-03', '2025-03-04')
+            second = self.request_leave('2025-04-07', '2025-04-08')
+        LeaveSnapshot.objects.create(taken_at=moment(1, 5))
+        snapshot = history.take_snapshot(moment(1, 20))
+        with self.at(moment(2, 10)):
+            self.review(first, 'approved')
+            self.review(second, 'rejected')
+        self.assertEqual(history.as_of(moment(2, 20))[1], snapshot)
+
+        self.assertEqual(set(history.as_of(moment(1, 25), status='pending')[0]), {first, second})
+        self.assertEqual(set(history.as_of(moment(1, 25), status='approved')[0]), set())
+        self.assertEqual(set(history.as_of(moment(2, 20), status='approved')[0]), {first})
+        self.assertEqual(set(history.as_of(moment(2, 20), status='pending')[0]), set())
+
+    def test_visible_employees_are_filtered_in_the_queries(self):
+        """Test that a scoped manager's view of the past is narrowed in SQL, not after loading everyone"""
+        with self.at(moment(1, 10)):
+            own = self.request_leave()
+            self.employee = EmployeeFactory()
+            self.request_leave()
+        boss = EmployeeFactory(user__is_manager=True)
+        self.employee.reports_to = boss
+        self.employee.save()
+
+        self.client.force_authenticate(user=boss.user)
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(self.as_of_url, {'at': moment(1, 20).isoformat()})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotIn(own, [row['leave_id'] for row in response.data['results']])
+        self.assertEqual(len(response.data['results']), 1)
+        event_queries = [query['sql'] for query in context.captured_queries if history.TABLE_PREFIX in query['sql']]
+        self.assertTrue(event_queries)
+        self.assertTrue(all('employees_employeehierarchy' in sql for sql in event_queries if 'SELECT' in sql))
+
+    def test_snapshot_before_history_is_refused(self):
+        with self.at(moment(2, 10)):
+            self.request_leave()
+        LeaveSnapshot.objects.create(taken_at=moment(2, 1))
+        with self.assertRaises(ValueError):
+            history.take_snapshot(moment(1, 1))
+        with self.assertRaises(CommandError):
+            call_command('snapshot_leave_history', at='2024-12-01T00:00:00+00:00', stdout=StringIO())
+        with self.assertRaises(ValueError):
+            history.take_snapshot(timezone.now() + datetime.timedelta(days=1))
+
+    def test_first_snapshot_includes_existing_leaves(self):
+        leave_id = self.request_leave()
+        snapshot = history.take_snapshot()
+        self.assertEqual(list(snapshot.rows.values_list('leave_id', 'status')), [(leave_id, 'pending')])
+
+    def test_archive_requires_later_snapshot(self):
+        with self.at(moment(1)):
+            self.request_leave()
+        with self.assertRaises(CommandError):
+            call_command('archive_leave_events', before='2025-02', stdout=StringIO())
+
+        LeaveSnapshot.objects.create(taken_at=moment(2, 1))
+        call_command('archive_leave_events', before='2025-02', stdout=StringIO())
+        self.assertNotIn(datetime.date(2025, 1, 1), history.event_months())
+
+    def test_as_of_endpoint(self):
+        """Test that managers can ask what was pending at a given time"""
+        with self.at(moment(1, 10)):
+            first = self.request_leave('2025-03-03', '2025-03-04')
+            second = self.request_leave('2025-04-07', '2025-04-08')
+        with self.at(moment(2, 10)):
+            self.review(first, 'approved')
+
+        self.client.force_authenticate(user=self.manager)
+        response = self.client.get(self.as_of_url, {'at': '2025-02-01T00:00:00Z', 'status': 'pending'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([row['leave_id'] for row in response.data['results']], [first, second])
+
+        response = self.client.get(self.as_of_url, {'at': timezone.now().isoformat(), 'status': 'pending'})
+        self.assertEqual([row['leave_id'] for row in response.data['results']], [second])
+
+    def test_as_of_requires_manager(self):
+        self.client.force_authenticate(user=self.employee.user)
+        response = self.client.get(self.as_of_url, {'at': '2025-02-01T00:00:00Z'})
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
@@ -0,0 +1,161 @@
+import datetime
+import json
+import os
+import tempfile
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from io import StringIO
+from django.core.management import CommandError, call_command
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+from authentication.tests.factories import EmployeeFactory, ManagerFactory
+from leaves import outbox
+from leaves.models import OutboxEvent
+from .factories import LeaveTypeFactory, LeaveFactory
+
+class StandInHandler(BaseHTTPRequestHandler):
+    """Local stand-in for a notification service: fails `server.failures` times, then accepts"""
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers['Content-Length'])))
+        if self.server.failures:
+            self.server.failures -= 1
+            self.send_response(503)
+        else:
+            self.server.received.extend(body['events'])
+            self.send_response(200)
+        self.end_headers()
+
+    def log_message(self, *args):
+        pass
+
+class OutboxTest(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.manager = ManagerFactory()
+        self.employee = EmployeeFactory()
+        self.leave_type = LeaveTypeFactory()
+        self.client.force_authenticate(user=self.manager)
+
+    def review(self, leave, new_status):
+        return self.client.put(reverse('leave-detail', kwargs={'pk': leave.pk}), {'status': new_status})
+
+    def make_events(self, count):
+        for leave in LeaveFactory.create_batch(count, employee=self.employee, leave_type=self.leave_type):
+            self.review(leave, 'approved')
+
+    def start_stand_in(self, failures=0):
+        server = ThreadingHTTPServer(('127.0.0.1', 0), StandInHandler)
+        server.failures = failures
+        server.received = []
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        self.addCleanup(server.server_close)
+        self.addCleanup(server.shutdown)
+        return server, f'http://127.0.0.1:{server.server_port}/events'
+
+    def test_review_writes_one_event(self):
+        """Test that a review costs a single outbox insert and records the decision"""
+        leave = LeaveFactory(employee=self.employee, leave_type=self.leave_type)
+        with CaptureQueriesContext(connection) as context:
+            self.review(leave, 'rejected')
+        outbox_queries = [query for query in context.captured_queries if 'leaves_outboxevent' in query['sql']]
+        self.assertEqual(len(outbox_queries), 1)
+
+        event = OutboxEvent.objects.get()
+        self.assertEqual(event.event_type, 'leave.rejected')
+        self.assertEqual(event.payload['leave_id'], leave.pk)
+        self.assertEqual((event.payload['previous_status'], event.payload['approver_id']), ('pending', self.manager.pk))
+
+        # A refused review adds nothing
+        self.review(leave, 'approved')
+        self.assertEqual(OutboxEvent.objects.count(), 1)
+
+    def test_bulk_review_writes_one_insert(self):
+        leaves = LeaveFactory.create_batch(3, employee=self.employee, leave_type=self.leave_type)
+        with CaptureQueriesContext(connection) as context:
+            self.client.post(reverse('leave-bulk-review'), {'ids': [leave.pk for leave in leaves], 'status': 'approved'},
+                             format='json')
+        self.assertEqual(sum('leaves_outboxevent' in query['sql'] for query in context.captured_queries), 1)
+        self.assertEqual(OutboxEvent.objects.filter(event_type='leave.approved').count(), 3)
+
+    def test_drain_to_file(self):
+        self.make_events(3)
+        fd, path = tempfile.mkstemp(suffix='.ndjson')
+        os.close(fd)
+        self.addCleanup(os.remove, path)
+
+        call_command('drain_outbox', file=path, batch_size=2, stdout=StringIO())
+        with open(path) as f:
+            messages = [json.loads(line) for line in f]
+        self.assertEqual([message['type'] for message in messages], ['leave.approved'] * 3)
+        self.assertFalse(OutboxEvent.objects.filter(delivered_at__isnull=True).exists())
+
+        # Delivered events are not sent again
+        call_command('drain_outbox', file=path, stdout=StringIO())
+        with open(path) as f:
+            self.assertEqual(len(f.readlines()), 3)
+
+    def test_http_failure_is_retried_with_backoff(self):
+        """Test that a failed batch is kept, pushed back and delivered on a later run"""
+        self.make_events(2)
+        server, url = self.start_stand_in(failures=1)
+        sinks = [outbox.HttpSink(url)]
+
+        self.assertEqual(outbox.drain(sinks), (0, 2))
+        event = OutboxEvent.objects.first()
+        self.assertEqual(event.attempts, 1)
+        self.assertIn('503', event.last_error)
+        self.assertGreater(event.available_at, timezone.now())
+        # Not due yet
+        self.assertEqual(outbox.drain(sinks), (0, 0))
+
+        OutboxEvent.objects.update(available_at=timezone.now())
+        self.assertEqual(outbox.drain(sinks), (2, 0))
+        self.assertEqual(len(server.received), 2)
+
+    def test_claims_do_not_overlap(self):
+        self.make_events(3)
+        first = outbox.claim(2)
+        second = outbox.claim(2)
+        self.assertEqual(len(first), 2)
+        self.assertEqual(len(second), 1)
+        self.assertFalse({event.pk for event in first} & {event.pk for event in second})
+        self.assertEqual(outbox.claim(2), [])
+
+    def test_events_past_max_attempts_are_not_claimed(self):
+        self.make_events(1)
+        OutboxEvent.objects.update(attempts=3)
+        self.assertEqual(outbox.claim(10, max_attempts=3), [])
+
+    def test_dead_letters_are_reported_retried_and_purged(self):
+        """Test that events out of attempts are reported, and can be sent again or deleted"""
+        self.make_events(2)
+        OutboxEvent.objects.update(attempts=outbox.MAX_ATTEMPTS)
+        fd, path = tempfile.mkstemp(suffix='.ndjson')
+        os.close(fd)
+        self.addCleanup(os.remove, path)
+
+        err = StringIO()
+        call_command('drain_outbox', file=path, stdout=StringIO(), stderr=err)
+        self.assertIn('2 event(s) failed', err.getvalue())
+        self.assertEqual(outbox.dead_letters().count(), 2)
+
+        call_command('drain_outbox', file=path, retry_dead=True, stdout=StringIO(), stderr=StringIO())
+        self.assertFalse(OutboxEvent.objects.filter(delivered_at__isnull=True).exists())
+        with open(path) as f:
+            self.assertEqual(len(f.readlines()), 2)
+
+        self.make_events(1)
+        OutboxEvent.objects.filter(delivered_at__isnull=True).update(
+            attempts=outbox.MAX_ATTEMPTS, created_at=timezone.now() - datetime.timedelta(days=8)
+        )
+        call_command('drain_outbox', file=path, purge_dead_days=7, stdout=StringIO(), stderr=StringIO())
+        self.assertEqual(outbox.dead_letters().count(), 0)
+        self.assertEqual(OutboxEvent.objects.count(), 2)
+
+    def test_drain_requires_sinks(self):
+        with self.assertRaises(CommandError):
+            call_command('drain_outbox', stdout=StringIO())
@@ -0,0 +1,98 @@
+import datetime
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework.test import APIClient
+from rest_framework import status
+from authentication.tests.factories import EmployeeFactory, ManagerFactory
+from leaves.intervals import LeaveIntervalIndex
+from .factories import LeaveTypeFactory, LeaveFactory
+
+def day(month, number):
+    return datetime.date(2025, month, number)
+
+class LeaveIntervalIndexTest(TestCase):
+    def setUp(self):
+        self.index = LeaveIntervalIndex([
+            (day(1, 1), day(1, 31), 1),
+            (day(3, 1), day(3, 3), 2),
+            (day(3, 10), day(3, 12), 3),
+        ])
+
+    def test_overlaps(self):
+        self.assertTrue(self.index.overlaps(day(1, 20), day(2, 5)))
+        self.assertTrue(self.index.overlaps(day(3, 3), day(3, 3)))
+        self.assertFalse(self.index.overlaps(day(2, 1), day(2, 28)))
+        self.assertFalse(self.index.overlaps(day(3, 4), day(3, 9)))
+        self.assertFalse(LeaveIntervalIndex([]).overlaps(day(1, 1), day(1, 1)))
+
+    def test_conflicts(self):
+        self.assertEqual(self.index.conflicts(day(1, 15), day(3, 10)), [3, 2, 1])
+        self.assertEqual(self.index.conflicts(day(3, 11), day(4, 1)), [3])
+        self.assertEqual(self.index.conflicts(day(4, 1), day(4, 2)), [])
+
+    def test_long_leave_does_not_hide_or_add_conflicts(self):
+        """Test that one leave spanning the year leaves the short ones exact"""
+        short = [(day(month, 1), day(month, 3), month) for month in range(2, 13)]
+        index = LeaveIntervalIndex([(day(1, 1), day(12, 31), 99)] + short)
+        self.assertEqual(index.conflicts(day(6, 2), day(6, 20)), [6, 99])
+        self.assertEqual(index.conflicts(day(6, 10), day(6, 20)), [99])
+        self.assertEqual(index.conflicts(day(2, 3), day(4, 1)), [4, 3, 2, 99])
+
+class LeaveOverlapViewsTest(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.employee = EmployeeFactory()
+        self.leave_type = LeaveTypeFactory()
+        self.existing = LeaveFactory(employee=self.employee, leave_type=self.leave_type,
+                                     start_date=day(3, 3), end_date=day(3, 7))
+        self.client.force_authenticate(user=self.employee.user)
+
+    def request_leave(self, start, end):
+        return self.client.post(reverse('leave-list'), {
+            'leave_type_id': self.leave_type.pk,
+            'start_date': start,
+            'end_date': end,
+            'reason': 'Trip',
+        })
+
+    def test_overlapping_request_is_rejected(self):
+        """Test that a request overlapping an active leave is refused"""
+        response = self.request_leave('2025-03-07', '2025-03-10')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('start_date', response.data)
+
+    def test_rejected_leaves_do_not_block(self):
+        """Test that rejected leaves free their dates"""
+        self.existing.status = 'rejected'
+        self.existing.save()
+        response = self.request_leave('2025-03-07', '2025-03-10')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+    def test_other_employees_do_not_block(self):
+        """Test that overlap is checked per employee"""
+        LeaveFactory(leave_type=self.leave_type, start_date=day(4, 1), end_date=day(4, 5))
+        response = self.request_leave('2025-04-01', '2025-04-05')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+    def test_end_before_start_is_rejected(self):
+        response = self.request_leave('2025-05-10', '2025-05-01')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('end_date', response.data)
+
+    def test_conflicts_endpoint(self):
+        """Test that a batch of ranges is checked in one call"""
+        response = self.client.post(reverse('leave-conflicts'), {'ranges': [
+            {'start_date': '2025-03-01', 'end_date': '2025-03-03'},
+            {'start_date': '2025-03-08', 'end_date': '2025-03-09'},
+        ]}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([row['conflicts'] for row in response.data['results']], [[self.existing.pk], []])
+
+    def test_manager_checks_another_employee(self):
+        """Test that managers can check ranges for any employee"""
+        self.client.force_authenticate(user=ManagerFactory())
+        response = self.client.post(reverse('leave-conflicts'), {
+            'employee': self.employee.pk,
+            'ranges': [{'start_date': '2025-03-05', 'end_date': '2025-03-05'}],
+        }, format='json')
+        self.assertEqual(response.data['results'][0]['conflicts'], [self.existing.pk])
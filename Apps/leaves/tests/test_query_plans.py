@@ -0,0 +1,83 @@
+import datetime
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from authentication.pagination import KeysetPagination
+from authentication.tests.factories import EmployeeFactory, ManagerFactory
+from authentication.tests.query_plans import QueryPlanMixin
+from employees.hierarchy import subtree
+from employees.models import Employee
+from employees.serializers import EmployeeSerializer
+from leaves.models import Leave, LeaveApproval, LeaveBalance
+from leaves.intervals import overlapping_leaves
+from .factories import LeaveTypeFactory, LeaveFactory
+
+User = get_user_model()
+
+class HotQueryPlanTest(QueryPlanMixin, TestCase):
+    """The queries behind the list endpoints must be served by indexes"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.manager = ManagerFactory()
+        cls.employee = EmployeeFactory()
+        cls.leave_type = LeaveTypeFactory()
+        LeaveFactory.create_batch(3, employee=cls.employee, leave_type=cls.leave_type)
+
+    def test_manager_leave_list(self):
+        self.assertUsesIndexes(Leave.objects.all()[:10], ['leaves_leave'], ordered=True)
+
+    def test_employee_leave_list(self):
+        queryset = Leave.objects.filter(employee__user=self.employee.user)[:10]
+        self.assertUsesIndexes(queryset, ['leaves_leave', 'employees_employee'], ordered=True)
+
+    def test_pending_leaves_per_employee(self):
+        queryset = Leave.objects.filter(employee=self.employee, status='pending')
+        self.assertUsesIndexes(queryset, ['leaves_leave'], ordered=True)
+
+    def test_leave_cursor_page(self):
+        created_at = Leave.objects.first().created_at
+        queryset = Leave.objects.filter(created_at__lte=created_at).order_by('-created_at', '-id')[:10]
+        self.assertUsesIndexes(queryset, ['leaves_leave'], ordered=True)
+
+    def test_overlap_check(self):
+        queryset = overlapping_leaves(self.employee.pk, datetime.date(2025, 3, 1), datetime.date(2025, 3, 5))
+        self.assertUsesIndexes(queryset, ['leaves_leave'])
+
+    def test_calendar_window(self):
+        queryset = Leave.objects.filter(
+            status__in=['approved'], end_date__gte=datetime.date(2025, 3, 1), start_date__lte=datetime.date(2025, 3, 31)
+        )
+        self.assertUsesIndexes(queryset, ['leaves_leave'])
+
+    def test_approvals_per_approver(self):
+        queryset = LeaveApproval.objects.filter(approver=self.manager)[:10]
+        self.assertUsesIndexes(queryset, ['leaves_leaveapproval'], ordered=True)
+
+    def test_balance_lookup(self):
+        queryset = LeaveBalance.objects.filter(employee=self.employee, leave_type=self.leave_type, year=2025)
+        self.assertUsesIndexes(queryset, ['leaves_leavebalance'])
+
+    def test_manager_lookup(self):
+        self.assertUsesIndexes(User.objects.filter(is_manager=True), ['authentication_user'])
+
+    def test_employee_list(self):
+        """The employee list reads the join date/username index in order, with no sort over the user join"""
+        self.assertUsesIndexes(Employee.objects.all()[:10], ['employees_employee'], ordered=True)
+        queryset = EmployeeSerializer.setup_eager_loading(Employee.objects.all())[:10]
+        self.assertUsesIndexes(queryset, ['employees_employee', 'authentication_user'], ordered=True)
+
+    def test_employee_keyset_page(self):
+        ordering = ('-join_date', 'username_sort', 'id')
+        seek = KeysetPagination._seek_filter(ordering, [datetime.date(2024, 1, 1), 'user5', 5])
+        queryset = Employee.objects.filter(seek).order_by(*ordering)[:10]
+        self.assertUsesIndexes(queryset, ['employees_employee'], ordered=True)
+
+    def test_subtree_lists(self):
+        """
+        A manager's lists probe the hierarchy index and then the rows of each
+        report; only the subtree's rows are sorted, never the whole table
+        """
+        queryset = Leave.objects.filter(employee_id__in=subtree(self.employee.pk))[:10]
+        self.assertUsesIndexes(queryset, ['leaves_leave', 'employees_employeehierarchy'])
+        queryset = Employee.objects.filter(pk__in=subtree(self.employee.pk))[:10]
+        self.assertUsesIndexes(queryset, ['employees_employee', 'employees_employeehierarchy'])
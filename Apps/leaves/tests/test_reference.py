@@ -0,0 +1,90 @@
+import os
+from unittest import mock
+from django.core import checks
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework import serializers, status
+from rest_framework.test import APIClient
+from authentication.reference import CachedPrimaryKeyRelatedField, ReferenceCache
+from authentication.tests.factories import ManagerFactory
+from employees import reference as employee_reference
+from employees.models import Department, Position
+from leaves import reference
+from leaves.models import LeaveType
+
+class ReferenceCacheTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.client.force_authenticate(user=ManagerFactory())
+        with self.captureOnCommitCallbacks(execute=True):
+            self.annual = LeaveType.objects.create(name='Annual', max_days=20)
+            LeaveType.objects.create(name='Sick')
+            self.department = Department.objects.create(name='Engineering')
+            Position.objects.create(name='Developer', department=self.department)
+
+    def test_reads_cost_no_queries_in_steady_state(self):
+        urls = [
+            reverse('leavetype-list'), reverse('leavetype-detail', kwargs={'pk': self.annual.pk}),
+            reverse('department-list'), reverse('position-list'),
+        ]
+        for url in urls:
+            self.client.get(url)
+        for url in urls:
+            with self.assertNumQueries(0):
+                response = self.client.get(url)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['results'][0]['department']['name'], 'Engineering')
+
+        field = CachedPrimaryKeyRelatedField(reference.leave_types)
+        with self.assertNumQueries(0):
+            self.assertEqual(field.to_internal_value(self.annual.pk).name, 'Annual')
+            with self.assertRaises(serializers.ValidationError):
+                field.to_internal_value(self.annual.pk + 100)
+            with self.assertRaises(serializers.ValidationError):
+                field.to_internal_value('annual')
+
+    def test_other_processes_read_the_shared_copy(self):
+        reference.leave_types.all()
+        worker = ReferenceCache(reference.leave_types.name, LeaveType.objects.all())
+        with self.assertNumQueries(0):
+            self.assertEqual([row.name for row in worker.all()], ['Annual', 'Sick'])
+
+    def test_committed_changes_reload_every_tier(self):
+        reference.leave_types.all()
+        employee_reference.positions.all()
+        with self.captureOnCommitCallbacks(execute=True):
+            LeaveType.objects.filter(pk=self.annual.pk).get().delete()
+            self.department.name = 'Platform'
+            self.department.save()
+        self.assertEqual([row.name for row in reference.leave_types.all()], ['Sick'])
+        self.assertEqual(employee_reference.positions.all()[0].department.name, 'Platform')
+        response = self.client.get(reverse('leavetype-detail', kwargs={'pk': self.annual.pk}))
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_uncommitted_changes_are_read_from_the_database(self):
+        reference.leave_types.all()
+        unpaid = LeaveType.objects.create(name='Unpaid')
+        self.assertEqual(reference.leave_types.get(unpaid.pk).name, 'Unpaid')
+        # Nothing was published: the shared copy still has the committed rows only
+        version, _ = cache.get(reference.leave_types.version_key)
+        shared = cache.get(f'{reference.leave_types.name}:{version}')
+        self.assertEqual([row.name for row in shared], ['Annual', 'Sick'])
+
+    def test_cached_rows_are_copies(self):
+        reference.leave_types.get(self.annual.pk).name = 'Changed'
+        self.assertEqual(reference.leave_types.get(self.annual.pk).name, 'Annual')
+
+    def test_per_process_cache_with_several_workers_is_bypassed(self):
+        """Test that a local-memory cache is not trusted when several workers share the tables"""
+        url = reverse('leavetype-list')
+        self.client.get(url)
+        with mock.patch.dict(os.environ, {'WEB_CONCURRENCY': '4'}):
+            # Another worker renamed the type; this process never sees its version token
+            LeaveType.objects.filter(pk=self.annual.pk).update(name='Holiday')
+            with self.assertNumQueries(1):
+                response = self.client.get(url)
+            self.assertEqual(response.data['results'][0]['name'], 'Holiday')
+            self.assertIn('authentication.W001', [message.id for message in checks.run_checks(tags=[checks.Tags.caches])])
+        self.assertNotIn('authentication.W001', [message.id for message in checks.run_checks(tags=[checks.Tags.caches])])
@@ -0,0 +1,89 @@
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APIClient
+from rest_framework import status
+from authentication.tests.factories import EmployeeFactory, ManagerFactory
+from employees.models import Department
+from .factories import LeaveTypeFactory, LeaveFactory
+
+class SparseFieldsTest(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.manager = ManagerFactory()
+        self.client.force_authenticate(user=self.manager)
+        self.employee = EmployeeFactory()
+        self.leave_type = LeaveTypeFactory()
+        self.leaves = LeaveFactory.create_batch(3, employee=self.employee, leave_type=self.leave_type)
+        self.list_url = reverse('leave-list')
+
+    def get(self, url, params):
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(url, params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        leave_queries = [query['sql'] for query in context.captured_queries if 'FROM "leaves_leave"' in query['sql']]
+        return response, leave_queries
+
+    def test_fields_trim_output_and_sql(self):
+        response, queries = self.get(self.list_url, {'fields': 'id,status,start_date'})
+        self.assertEqual(set(response.data['results'][0]), {'id', 'status', 'start_date'})
+        sql = queries[-1]
+        self.assertNotIn('JOIN', sql)
+        self.assertNotIn('"reason"', sql)
+
+    def test_computed_fields_load_what_they_read(self):
+        response, queries = self.get(self.list_url, {'fields': 'id,employee_name,duration'})
+        row = response.data['results'][0]
+        self.assertEqual(row['employee_name'], f'{self.employee.user.first_name} {self.employee.user.last_name}')
+        self.assertEqual(row['duration'], 2)
+        self.assertEqual(len(queries), 2)  # count and page, no lazy loads
+        self.assertNotIn('leaves_leavetype', queries[-1])
+        self.assertNotIn('"reason"', queries[-1])
+
+    def test_expand_adds_nested_objects_with_joins(self):
+        response, _ = self.get(self.list_url, {'expand': 'employee'})
+        self.assertEqual(response.data['results'][0]['employee']['id'], self.employee.pk)
+        self.assertIn('reason', response.data['results'][0])
+
+        LeaveFactory.create_batch(3, employee=EmployeeFactory(), leave_type=self.leave_type)
+        with CaptureQueriesContext(connection) as small:
+            self.client.get(self.list_url, {'expand': 'employee,leave_type', 'page_size': 1})
+        with CaptureQueriesContext(connection) as large:
+            response = self.client.get(self.list_url, {'expand': 'employee,leave_type'})
+        self.assertEqual(len(response.data['results']), 6)
+        self.assertEqual(len(large.captured_queries), len(small.captured_queries))
+
+    def test_detail_fields_skip_nested_joins(self):
+        url = reverse('leave-detail', kwargs={'pk': self.leaves[0].pk})
+        response, queries = self.get(url, {'fields': 'id,end_date'})
+        self.assertEqual(response.data, {'id': self.leaves[0].pk, 'end_date': self.leaves[0].end_date.isoformat()})
+        self.assertNotIn('JOIN', queries[-1])
+
+    def test_cursor_pages_with_fields(self):
+        response, queries = self.get(self.list_url, {'cursor': '', 'page_size': 2, 'fields': 'id'})
+        self.assertEqual(len(queries), 1)
+        response = self.client.get(response.data['next'])
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([row['id'] for row in response.data['results']], [self.leaves[0].pk])
+
+    def test_unknown_names_are_rejected(self):
+        response = self.client.get(self.list_url, {'fields': 'id,password'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        response = self.client.get(self.list_url, {'expand': 'approval'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_employee_expand_and_writes(self):
+        department = Department.objects.create(name='Engineering')
+        self.employee.department = department
+        self.employee.save()
+        url = reverse('employee-detail', kwargs={'pk': self.employee.pk})
+        response = self.client.get(url, {'fields': 'id', 'expand': 'department'})
+        self.assertEqual(response.data, {'id': self.employee.pk, 'department': {
+            'id': department.pk, 'name': 'Engineering', 'description': '',
+        }})
+
+        # Writes ignore the parameters and keep validating every field
+        response = self.client.patch(f'{url}?fields=id', {'phone_number': '5550199'}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['phone_number'], '5550199')
@@ -0,0 +1,105 @@
+import threading
+from django.db import connection
+from django.test import TestCase, TransactionTestCase
+from django.urls import reverse
+from rest_framework.test import APIClient
+from rest_framework import status
+from authentication.tests.factories import EmployeeFactory, ManagerFactory
+from leaves import bookkeeping, transitions
+from leaves.counters import status_totals
+from leaves.models import Leave, LeaveApproval
+from .factories import LeaveTypeFactory, LeaveFactory
+
+class LeaveTransitionTest(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.manager = ManagerFactory()
+        self.employee = EmployeeFactory()
+        self.leave = LeaveFactory(employee=self.employee, leave_type=LeaveTypeFactory())
+
+    def test_state_machine(self):
+        self.assertTrue(transitions.can_transition('pending', 'cancelled'))
+        self.assertFalse(transitions.can_transition('approved', 'rejected'))
+        self.assertFalse(transitions.can_transition('pending', 'archived'))
+
+    def test_stale_status_does_not_write(self):
+        """Test that a leave read as pending but processed since is left alone"""
+        Leave.objects.filter(pk=self.leave.pk).update(status='rejected')
+        self.assertFalse(transitions.transition(self.leave, 'approved', self.manager))
+        self.assertEqual(Leave.objects.get(pk=self.leave.pk).status, 'rejected')
+        self.assertFalse(LeaveApproval.objects.exists())
+
+    def test_review_writes_only_the_status(self):
+        """Test that a review does not overwrite fields changed since the leave was read"""
+        Leave.objects.filter(pk=self.leave.pk).update(reason='Edited meanwhile')
+        self.assertTrue(transitions.transition(self.leave, 'approved', self.manager, 'ok'))
+        leave = Leave.objects.get(pk=self.leave.pk)
+        self.assertEqual((leave.status, leave.reason), ('approved', 'Edited meanwhile'))
+        self.assertEqual(leave.approval.comments, 'ok')
+
+    def test_employee_cancels_own_leave(self):
+        self.client.force_authenticate(user=self.employee.user)
+        url = reverse('leave-cancel', kwargs={'pk': self.leave.pk})
+        response = self.client.post(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['status'], 'cancelled')
+        self.assertFalse(LeaveApproval.objects.exists())
+
+        response = self.client.post(url)
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_employee_cannot_cancel_others_leave(self):
+        self.client.force_authenticate(user=EmployeeFactory().user)
+        response = self.client.post(reverse('leave-cancel', kwargs={'pk': self.leave.pk}))
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+class ConcurrentApprovalTest(TransactionTestCase):
+    """Parallel reviews of the same leave, each on its own database connection"""
+    workers = 6
+
+    def setUp(self):
+        self.employee = EmployeeFactory()
+        self.managers = ManagerFactory.create_batch(self.workers)
+        self.leave = LeaveFactory(employee=self.employee, leave_type=LeaveTypeFactory())
+        # Count the request as the create endpoint would
+        bookkeeping.record_status_change(self.leave, None, self.leave.status)
+
+    def run_in_parallel(self, request):
+        barrier = threading.Barrier(self.workers)
+        responses = []
+
+        def worker(manager):
+            client = APIClient()
+            client.force_authenticate(user=manager)
+            try:
+                barrier.wait()
+                responses.append(request(client))
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=worker, args=(manager,)) for manager in self.managers]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return responses
+
+    def assert_single_review(self, responses, new_status):
+        codes = sorted(response.status_code for response in responses)
+        self.assertEqual(codes.count(status.HTTP_400_BAD_REQUEST), self.workers - 1)
+        self.assertEqual(Leave.objects.get(pk=self.leave.pk).status, new_status)
+        self.assertEqual(LeaveApproval.objects.filter(leave=self.leave).count(), 1)
+        totals = status_totals()
+        self.assertEqual((totals['pending'], totals[new_status]), (0, 1))
+
+    def test_parallel_updates_review_once(self):
+        url = reverse('leave-detail', kwargs={'pk': self.leave.pk})
+        responses = self.run_in_parallel(lambda client: client.put(url, {'status': 'approved'}))
+        self.assertEqual(sum(response.status_code == status.HTTP_200_OK for response in responses), 1)
+        self.assert_single_review(responses, 'approved')
+
+    def test_parallel_approvals_review_once(self):
+        url = reverse('leave-approval-list')
+        responses = self.run_in_parallel(lambda client: client.post(url, {'leave_id': self.leave.pk}))
+        self.assertEqual(sum(response.status_code == status.HTTP_201_CREATED for response in responses), 1)
+        self.assert_single_review(responses, 'approved')
@@ -0,0 +1,217 @@
+import base64
+import datetime
+import json
+from unittest import mock
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APIClient
+from rest_framework import status
+from authentication.tests.factories import EmployeeFactory, ManagerFactory
+from leaves.models import Leave, LeaveApproval
+from .factories import LeaveTypeFactory, LeaveFactory
+
+class LeaveViewsTest(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.manager = ManagerFactory()
+        self.employee = EmployeeFactory()
+        self.other_employee = EmployeeFactory()
+        self.leave_type = LeaveTypeFactory()
+        self.leave = LeaveFactory(employee=self.employee, leave_type=self.leave_type)
+
+        # URLs
+        self.leave_list_url = reverse('leave-list')
+        self.leave_detail_url = reverse('leave-detail', kwargs={'pk': self.leave.pk})
+        self.approval_list_url = reverse('leave-approval-list')
+
+    def count_queries(self, url):
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return len(context.captured_queries)
+
+    def approve(self, leave):
+        LeaveApproval.objects.create(leave=leave, approver=self.manager, comments='ok')
+        leave.status = 'approved'
+        leave.save()
+
+    def test_employee_sees_only_own_leaves(self):
+        """Test that regular employees only see their own leaves"""
+        LeaveFactory(employee=self.other_employee, leave_type=self.leave_type)
+        self.client.force_authenticate(user=self.employee.user)
+        response = self.client.get(self.leave_list_url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([row['id'] for row in response.data['results']], [self.leave.pk])
+
+    def test_leave_list_query_count_is_constant(self):
+        """Test that the list costs the same number of queries for 1 and 10 rows"""
+        self.approve(self.leave)
+        self.client.force_authenticate(user=self.manager)
+        baseline = self.count_queries(self.leave_list_url)
+
+        for i in range(9):
+            leave = LeaveFactory(
+                employee=self.employee if i % 2 else self.other_employee,
+                leave_type=LeaveTypeFactory(),
+            )
+            if i % 3 == 0:
+                self.approve(leave)
+
+        self.assertEqual(self.count_queries(self.leave_list_url), baseline)
+
+    def test_leave_detail_query_count(self):
+        """Test that the nested detail serializer does not walk relations lazily"""
+        self.approve(self.leave)
+        self.client.force_authenticate(user=self.manager)
+        with self.assertNumQueries(1):
+            response = self.client.get(self.leave_detail_url)
+        self.assertEqual(response.data['employee']['user_username'], self.employee.user.username)
+        self.assertEqual(response.data['leave_type']['name'], self.leave_type.name)
+        self.assertIsNotNone(response.data['approval'])
+
+    def test_approve_leave_returns_approval(self):
+        """Test that approving a leave returns the freshly created approval"""
+        self.client.force_authenticate(user=self.manager)
+        response = self.client.put(self.leave_detail_url, {'status': 'approved', 'comments': 'Enjoy'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['status'], 'approved')
+        self.assertEqual(response.data['approval']['comments'], 'Enjoy')
+        self.assertEqual(Leave.objects.get(pk=self.leave.pk).status, 'approved')
+
+    def test_approval_list_query_count_is_constant(self):
+        """Test that the approval list does not query per approval"""
+        self.approve(self.leave)
+        self.client.force_authenticate(user=self.manager)
+        baseline = self.count_queries(self.approval_list_url)
+
+        for _ in range(5):
+            self.approve(LeaveFactory(employee=self.other_employee, leave_type=LeaveTypeFactory()))
+
+        self.assertEqual(self.count_queries(self.approval_list_url), baseline)
+
+class LeaveCursorPaginationTest(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.manager = ManagerFactory()
+        self.client.force_authenticate(user=self.manager)
+        employee = EmployeeFactory()
+        leave_type = LeaveTypeFactory()
+        self.leaves = LeaveFactory.create_batch(7, employee=employee, leave_type=leave_type)
+        # Give two leaves the same timestamp so the id tiebreaker is exercised
+        Leave.objects.filter(pk=self.leaves[3].pk).update(created_at=self.leaves[4].created_at)
+        self.leave_list_url = reverse('leave-list')
+
+    def walk(self, url):
+        ids = []
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            ids.extend(row['id'] for row in response.data['results'])
+            url = response.data['next']
+        return ids, response
+
+    def test_cursor_pages_cover_every_leave_once(self):
+        """Test that following next cursors returns every leave exactly once, newest first"""
+        ids, response = self.walk(f'{self.leave_list_url}?cursor=&page_size=3')
+        expected = list(
+            Leave.objects.order_by('-created_at', '-id').values_list('id', flat=True)
+        )
+        self.assertEqual(ids, expected)
+        self.assertNotIn('count', response.data)
+
+    def test_previous_cursor_returns_previous_page(self):
+        """Test that the previous cursor of page two returns page one"""
+        first = self.client.get(f'{self.leave_list_url}?cursor=&page_size=3')
+        second = self.client.get(first.data['next'])
+        back = self.client.get(second.data['previous'])
+        self.assertEqual(
+            [row['id'] for row in back.data['results']],
+            [row['id'] for row in first.data['results']],
+        )
+        self.assertIsNotNone(back.data['next'])
+
+    def test_cursor_counts(self):
+        """Test that counts are only computed when requested"""
+        exact = self.client.get(f'{self.leave_list_url}?cursor=&count=exact')
+        self.assertEqual(exact.data['count'], 7)
+        estimate = self.client.get(f'{self.leave_list_url}?cursor=&count=estimate')
+        self.assertEqual(estimate.data['count'], 7)
+        self.assertTrue(estimate.data['count_is_estimate'])
+
+    def test_invalid_cursor(self):
+        """Test that a tampered cursor is rejected"""
+        response = self.client.get(f'{self.leave_list_url}?cursor=not-a-cursor')
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+        # Well-formed cursors holding values of the wrong type
+        for values in (['yesterday', 'abc'], [['2025-01-01'], 1], [None, 1]):
+            payload = json.dumps({'k': values, 'r': False}).encode()
+            cursor = base64.urlsafe_b64encode(payload).decode().rstrip('=')
+            response = self.client.get(f'{self.leave_list_url}?cursor={cursor}')
+            self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_page_number_pagination_is_unchanged(self):
+        """Test that requests without a cursor keep the page number format"""
+        response = self.client.get(self.leave_list_url)
+        self.assertEqual(response.data['count'], 7)
+        self.assertIn('results', response.data)
+
+class LeaveBulkReviewTest(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.manager = ManagerFactory()
+        self.employee = EmployeeFactory()
+        self.leave_type = LeaveTypeFactory()
+        self.bulk_review_url = reverse('leave-bulk-review')
+
+    def make_leaves(self, count, **kwargs):
+        # Keep every leave in the same year so they share one balance row
+        return LeaveFactory.create_batch(
+            count, employee=self.employee, leave_type=self.leave_type,
+            start_date=datetime.date(2025, 3, 3), **kwargs
+        )
+
+    def test_bulk_approve_reports_each_id(self):
+        """Test that pending leaves are approved and others are reported"""
+        pending = self.make_leaves(3)
+        done = self.make_leaves(1, status='rejected')[0]
+        ids = [leave.pk for leave in pending] + [done.pk, 999999]
+
+        self.client.force_authenticate(user=self.manager)
+        response = self.client.post(self.bulk_review_url, {'ids': ids, 'status': 'approved', 'comments': 'Batch'}, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['processed'], 3)
+        self.assertEqual(
+            [row['result'] for row in response.data['results']],
+            ['processed'] * 3 + ['already_processed', 'not_found'],
+        )
+        self.assertEqual(Leave.objects.filter(status='approved').count(), 3)
+        self.assertEqual(LeaveApproval.objects.filter(approver=self.manager, comments='Batch').count(), 3)
+        self.assertEqual(Leave.objects.get(pk=done.pk).status, 'rejected')
+
+    @mock.patch('leaves.counters.random.randrange', return_value=0)
+    def test_bulk_review_query_count_is_constant(self, randrange):
+        """Test that the number of queries does not grow with the batch size"""
+        # Counter rows are sharded over random slots; a first write to a slot costs an extra insert
+        self.client.force_authenticate(user=self.manager)
+        # The first review creates the balance row; measure from the second one
+        warm_up = [leave.pk for leave in self.make_leaves(1)]
+        self.client.post(self.bulk_review_url, {'ids': warm_up, 'status': 'rejected'}, format='json')
+
+        small = [leave.pk for leave in self.make_leaves(1)]
+        with CaptureQueriesContext(connection) as baseline:
+            self.client.post(self.bulk_review_url, {'ids': small, 'status': 'rejected'}, format='json')
+
+        large = [leave.pk for leave in self.make_leaves(8)]
+        with CaptureQueriesContext(connection) as context:
+            self.client.post(self.bulk_review_url, {'ids': large, 'status': 'rejected'}, format='json')
+        self.assertEqual(len(context.captured_queries), len(baseline.captured_queries))
+
+    def test_bulk_review_requires_manager(self):
+        """Test that regular employees cannot bulk review"""
+        leave = self.make_leaves(1)[0]
+        self.client.force_authenticate(user=self.employee.user)
+        response = self.client.post(self.bulk_review_url, {'ids': [leave.pk], 'status': 'approved'}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
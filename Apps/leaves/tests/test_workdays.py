@@ -0,0 +1,101 @@
+import datetime
+import os
+from io import StringIO
+from unittest import mock
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework.test import APIClient
+from rest_framework import status
+from authentication.tests.factories import EmployeeFactory
+from leaves import workdays
+from leaves.models import Holiday, Leave, LeaveBalance, WorkCalendar
+from .factories import LeaveTypeFactory, LeaveFactory
+
+class WorkingDayCalendarTest(TestCase):
+    def test_weekends_are_skipped(self):
+        calendar = workdays.WorkingDayCalendar()
+        # Friday to Monday
+        self.assertEqual(calendar.count(datetime.date(2025, 1, 3), datetime.date(2025, 1, 6)), 2)
+        self.assertEqual(calendar.count(datetime.date(2025, 1, 4), datetime.date(2025, 1, 5)), 0)
+
+    def test_holidays_are_skipped(self):
+        calendar = workdays.WorkingDayCalendar(holidays=[datetime.date(2025, 1, 1)])
+        self.assertEqual(calendar.count(datetime.date(2025, 1, 1), datetime.date(2025, 1, 3)), 2)
+
+    def test_custom_work_week(self):
+        """Test a Sunday to Thursday week"""
+        calendar = workdays.WorkingDayCalendar(work_week=0b1001111)
+        self.assertEqual(calendar.count(datetime.date(2025, 1, 3), datetime.date(2025, 1, 6)), 2)
+
+    def test_ranges_across_years_match_a_day_by_day_count(self):
+        calendar = workdays.WorkingDayCalendar(holidays=[datetime.date(2024, 12, 25), datetime.date(2025, 1, 1)])
+        start, end = datetime.date(2023, 11, 15), datetime.date(2025, 2, 10)
+        expected = sum(
+            calendar.is_working_day(start + datetime.timedelta(days=offset))
+            for offset in range((end - start).days + 1)
+        )
+        self.assertEqual(calendar.count(start, end), expected)
+        self.assertEqual(sum(calendar.count_by_month(start, end).values()), expected)
+        self.assertEqual(set(calendar.count_by_year(start, end)), {2023, 2024, 2025})
+
+class LeaveWorkingDaysTest(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.employee = EmployeeFactory()
+        self.leave_type = LeaveTypeFactory(max_days=10)
+        self.addCleanup(cache.delete, workdays.VERSION_KEY)
+
+    def add_holiday(self, date):
+        with self.captureOnCommitCallbacks(execute=True):
+            calendar, _ = WorkCalendar.objects.get_or_create(name='Default', defaults={'is_default': True})
+            Holiday.objects.create(calendar=calendar, date=date, name='Holiday')
+
+    def test_working_days_stored_on_save(self):
+        leave = LeaveFactory(employee=self.employee, leave_type=self.leave_type,
+                             start_date=datetime.date(2025, 3, 7), end_date=datetime.date(2025, 3, 10))
+        self.assertEqual((leave.duration, leave.working_days), (4, 2))
+        self.assertEqual(Leave.objects.filter(working_days=2).count(), 1)
+
+    def test_serializer_exposes_working_days(self):
+        self.add_holiday(datetime.date(2025, 3, 4))
+        self.client.force_authenticate(user=self.employee.user)
+        response = self.client.post(reverse('leave-list'), {
+            'leave_type_id': self.leave_type.pk, 'start_date': '2025-03-03', 'end_date': '2025-03-09',
+            'reason': 'Rest',
+        })
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual((response.data['duration'], response.data['working_days']), (7, 4))
+        self.assertEqual(
+            LeaveBalance.objects.get(employee=self.employee, leave_type=self.leave_type).pending_days, 4
+        )
+
+    def test_holiday_change_reloads_calendar(self):
+        """Test that a committed holiday change is picked up by the cached calendar"""
+        day = datetime.date(2025, 3, 4)
+        self.assertTrue(workdays.get_calendar().is_working_day(day))
+        self.add_holiday(day)
+        self.assertFalse(workdays.get_calendar().is_working_day(day))
+
+    def test_per_process_cache_with_several_workers_is_bypassed(self):
+        """Test that the calendar is read from the database when other workers cannot publish to this one"""
+        day = datetime.date(2025, 3, 4)
+        self.assertTrue(workdays.get_calendar().is_working_day(day))
+        calendar = WorkCalendar.objects.create(name='Default', is_default=True)
+        # Added by another worker: its version token never reaches this process
+        Holiday.objects.create(calendar=calendar, date=day, name='Holiday')
+        self.assertTrue(workdays.get_calendar().is_working_day(day))
+        with mock.patch.dict(os.environ, {'WEB_CONCURRENCY': '4'}):
+            self.assertFalse(workdays.get_calendar().is_working_day(day))
+
+    def test_recalculate_command(self):
+        leave = LeaveFactory(employee=self.employee, leave_type=self.leave_type, status='approved',
+                             start_date=datetime.date(2025, 3, 3), end_date=datetime.date(2025, 3, 5))
+        self.add_holiday(datetime.date(2025, 3, 4))
+        call_command('recalculate_working_days', stdout=StringIO())
+        leave.refresh_from_db()
+        self.assertEqual(leave.working_days, 2)
+        self.assertEqual(
+            LeaveBalance.objects.get(employee=self.employee, leave_type=self.leave_type).used_days, 2
+        )
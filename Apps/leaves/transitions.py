@@ -0,0 +1,74 @@
+"""
+Leave status transitions.
+
+A review moves a leave with a single conditional UPDATE
+(`... SET status = 'approved' WHERE id = %s AND status = 'pending'`), so when
+two managers act on the same leave at once only one UPDATE matches the row and
+the other is told the leave was already processed. The approval row, the
+derived tables and the outbox event are only written by the request whose
+UPDATE won, in the same transaction.
+"""
+from django.db import transaction
+from django.utils import timezone
+from . import bookkeeping, outbox
+from .models import Leave, LeaveApproval
+
+def can_transition(old_status, new_status):
+    return new_status in Leave.TRANSITIONS.get(old_status, ())
+
+def transition(leave, new_status, approver=None, comments='', actor=None):
+    """
+    Move a leave from the status it was read with to `new_status`.
+
+    With an `approver` the decision is recorded as a LeaveApproval, which is
+    also set on `leave.approval`. `actor` is the user making the change for
+    the history and defaults to the approver. Returns False, without writing anything, if
+    the transition is not allowed or another request changed the status first.
+    """
+    old_status = leave.status
+    if not can_transition(old_status, new_status):
+        return False
+    now = timezone.now()
+    with transaction.atomic():
+        updated = Leave.objects.filter(pk=leave.pk, status=old_status).update(status=new_status, updated_at=now)
+        if not updated:
+            return False
+        leave.status = new_status
+        leave.updated_at = now
+        if approver is not None:
+            leave.approval = LeaveApproval.objects.create(leave=leave, approver=approver, comments=comments)
+            bookkeeping.record_reviews(approver, new_status)
+        bookkeeping.record_status_change(leave, old_status, new_status, actor or approver)
+        outbox.enqueue([leave], old_status, new_status, approver, comments)
+    return True
+
+def transition_locked(leaves, new_status, approver, comments=''):
+    """
+    Move many leaves at once and return the ones moved.
+
+    The leaves must have been read with select_for_update() in the current
+    transaction; a single UPDATE cannot report which rows it changed, so the
+    row locks are what keep the statuses read here current. Leaves that
+    cannot make the transition are skipped.
+    """
+    moved = {}
+    for leave in leaves:
+        if can_transition(leave.status, new_status):
+            moved.setdefault(leave.status, []).append(leave)
+    if not moved:
+        return []
+    now = timezone.now()
+    with transaction.atomic():
+        LeaveApproval.objects.bulk_create([
+            LeaveApproval(leave=leave, approver=approver, comments=comments)
+            for group in moved.values() for leave in group
+        ])
+        for old_status, group in moved.items():
+            Leave.objects.filter(pk__in=[leave.pk for leave in group], status=old_status).update(
+                status=new_status, updated_at=now
+            )
+            bookkeeping.record_status_changes(group, old_status, new_status, approver)
+            outbox.enqueue(group, old_status, new_status, approver, comments)
+        count = sum(len(group) for group in moved.values())
+        bookkeeping.record_reviews(approver, new_status, count)
+    return [leave for group in moved.values() for leave in group]
@@ -6,6 +6,7 @@ router = DefaultRouter()
 router.register(r'leave-types', views.LeaveTypeViewSet)
 router.register(r'leaves', views.LeaveViewSet)
 router.register(r'leave-approvals', views.LeaveApprovalViewSet, basename='leave-approval')
+router.register(r'leave-balances', views.LeaveBalanceViewSet, basename='leave-balance')
 
 urlpatterns = [
     path('', include(router.urls)),
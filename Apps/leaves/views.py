@@ -1,7 +1,23 @@
+import datetime
+from django.db import transaction
 from rest_framework import viewsets, permissions, status
+from rest_framework.decorators import action
 from rest_framework.response import Response
-from .models import LeaveType, Leave, LeaveApproval
-from .serializers import LeaveTypeSerializer, LeaveSerializer, LeaveApprovalSerializer, LeaveDetailSerializer
+from authentication.exports import export_response, get_export_format
+from authentication.compiled import CompiledListMixin
+from authentication.conditional import ConditionalRequestMixin
+from authentication.reference import ReferenceDataViewMixin
+from authentication.sparse import SparseFieldsViewMixin
+from employees import hierarchy
+from employees.models import Employee
+from . import analytics, balances, bookkeeping, counters, history, reference, transitions
+from .intervals import LeaveIntervalIndex
+from .models import LeaveType, Leave, LeaveApproval, LeaveBalance, LeaveMonthlySummary
+from .serializers import (
+    LeaveTypeSerializer, LeaveSerializer, LeaveApprovalSerializer, LeaveDetailSerializer,
+    LeaveBalanceSerializer, LeaveBulkReviewSerializer, LeaveConflictQuerySerializer,
+    LeaveCalendarQuerySerializer, LeaveAnalyticsQuerySerializer, LeaveAsOfQuerySerializer
+)
 
 class IsManagerOrAdmin(permissions.BasePermission):
     """
@@ -12,21 +28,27 @@ class IsManagerOrAdmin(permissions.BasePermission):
             return False
         return request.user.is_manager or request.user.is_staff
 
-class LeaveTypeViewSet(viewsets.ModelViewSet):
+class LeaveTypeViewSet(ReferenceDataViewMixin, SparseFieldsViewMixin, viewsets.ModelViewSet):
     """
     API endpoint that allows leave types to be viewed or edited.
+    Reads are served from the reference cache.
     """
     queryset = LeaveType.objects.all()
+    reference_cache = reference.leave_types
     serializer_class = LeaveTypeSerializer
     permission_classes = [permissions.IsAuthenticated, IsManagerOrAdmin]
 
-class LeaveViewSet(viewsets.ModelViewSet):
+class LeaveViewSet(ConditionalRequestMixin, CompiledListMixin, SparseFieldsViewMixin, viewsets.ModelViewSet):
     """
     API endpoint that allows leaves to be viewed or edited.
     """
     queryset = Leave.objects.all()
     serializer_class = LeaveSerializer
     permission_classes = [permissions.IsAuthenticated]
+    keyset_ordering = ('-created_at', '-id')
+    # Leaves embed their employee (whose updated_at follows the user's names) and leave type
+    related_validator_fields = ('employee__updated_at',)
+    validator_caches = {'leave_type': reference.leave_types}
 
     def get_serializer_class(self):
         """
@@ -44,25 +66,76 @@ class LeaveViewSet(viewsets.ModelViewSet):
         if not user.is_authenticated:
             return Leave.objects.none()
         
-        # Managers and admins can see all leaves
+        # Managers see the leaves of the employees below them, admins see all leaves
         if user.is_manager or user.is_staff:
-            return Leave.objects.all()
-        
-        # Regular employees can only see their own leaves
-        return Leave.objects.filter(employee__user=user)
+            queryset = hierarchy.scope(Leave.objects.all(), user)
+        else:
+            # Regular employees can only see their own leaves
+            queryset = Leave.objects.filter(employee__user=user)
+
+        # Load the relations the serializer reads in the same query
+        return self.setup_eager_loading(queryset)
+
+    # Columns of /api/leaves/export/ and the lookups they are read from
+    export_fields = {
+        'id': 'id',
+        'employee_id': 'employee_id',
+        'employee_username': 'employee__user__username',
+        'employee_first_name': 'employee__user__first_name',
+        'employee_last_name': 'employee__user__last_name',
+        'leave_type': 'leave_type__name',
+        'start_date': 'start_date',
+        'end_date': 'end_date',
+        'working_days': 'working_days',
+        'status': 'status',
+        'reason': 'reason',
+        'created_at': 'created_at',
+        'updated_at': 'updated_at',
+        'approver_username': 'approval__approver__username',
+        'approval_comments': 'approval__comments',
+        'approved_at': 'approval__approved_at',
+    }
+
+    def filter_queryset(self, queryset):
+        """
+        Narrow the list (and the export) with ?status=, ?employee= and ?leave_type=
+        """
+        queryset = super().filter_queryset(queryset)
+        params = self.request.query_params
+        if params.get('status'):
+            queryset = queryset.filter(status=params['status'])
+        if params.get('employee', '').isdigit():
+            queryset = queryset.filter(employee_id=params['employee'])
+        if params.get('leave_type', '').isdigit():
+            queryset = queryset.filter(leave_type_id=params['leave_type'])
+        return queryset
 
     def perform_create(self, serializer):
         """
         Always set the employee to the authenticated user's employee record
+        and hold the requested days against their balance
         """
-        serializer.save(employee=self.request.user.employee)
+        employee = self.request.user.employee
+        data = serializer.validated_data
+        with transaction.atomic():
+            balances.check_balance(employee, data['leave_type'], data['start_date'], data['end_date'])
+            leave = serializer.save(employee=employee)
+            bookkeeping.record_status_change(leave, None, leave.status, self.request.user)
+
+    def perform_destroy(self, instance):
+        """
+        Release the leave's days from the derived tables along with the row
+        """
+        with transaction.atomic():
+            bookkeeping.record_status_change(instance, instance.status, None, self.request.user)
+            instance.delete()
 
     def get_permissions(self):
         """
         Set permissions based on the action
         """
-        if self.action in ['create', 'list', 'retrieve']:
-            # Any authenticated user can create and view their own leaves
+        if self.action in ['create', 'list', 'retrieve', 'conflicts', 'cancel']:
+            # Any authenticated user can create, view and cancel their own leaves
             return [permissions.IsAuthenticated()]
         else:
             # Only managers/admins can update/delete leaves
@@ -81,42 +154,233 @@ class LeaveViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_403_FORBIDDEN
             )
 
-        # Check if leave is already processed
-        if instance.status != 'pending':
+        # Get the new status from request data
+        new_status = request.data.get('status')
+        if new_status not in Leave.TRANSITIONS['pending']:
+            return Response(
+                {'error': 'Invalid status. Must be either "approved", "rejected", or "cancelled"'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        # Fails if the leave was already processed, including by a concurrent request
+        if not transitions.transition(instance, new_status, request.user, request.data.get('comments', '')):
             return Response(
                 {'error': 'This leave request has already been processed'},
                 status=status.HTTP_400_BAD_REQUEST
             )
 
-        # Get the new status from request data
-        new_status = request.data.get('status')
-        if new_status not in ['approved', 'rejected', 'cancelled']:
+        serializer = self.get_serializer(instance)
+        return Response(serializer.data)
+
+    @action(detail=True, methods=['post'])
+    def cancel(self, request, pk=None):
+        """
+        Withdraw a pending leave; employees may cancel their own requests
+        """
+        instance = self.get_object()
+        if not transitions.transition(instance, 'cancelled', actor=request.user):
             return Response(
-                {'error': 'Invalid status. Must be either "approved", "rejected", or "cancelled"'},
+                {'error': 'Only pending leave requests can be cancelled'},
                 status=status.HTTP_400_BAD_REQUEST
             )
+        serializer = self.get_serializer(instance)
+        return Response(serializer.data)
+
+    @action(detail=False, methods=['post'])
+    def conflicts(self, request):
+        """
+        Check a batch of candidate date ranges against an employee's active leaves.
+
+        Expects {"ranges": [{"start_date": ..., "end_date": ...}, ...]} and,
+        for managers, an optional "employee" id (defaults to the caller).
+        """
+        query = LeaveConflictQuerySerializer(data=request.data)
+        query.is_valid(raise_exception=True)
 
-        # Create leave approval record
-        LeaveApproval.objects.create(
-            leave=instance,
-            approver=request.user,
-            comments=request.data.get('comments', '')
+        employee_id = query.validated_data.get('employee')
+        if employee_id is not None and (request.user.is_manager or request.user.is_staff):
+            if not hierarchy.scope(Employee.objects.filter(pk=employee_id), request.user, field='pk').exists():
+                return Response({'error': 'Employee not found'}, status=status.HTTP_404_NOT_FOUND)
+        else:
+            employee = getattr(request.user, 'employee', None)
+            if employee is None:
+                return Response(
+                    {'error': 'No employee record is linked to this user'},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+            employee_id = employee.pk
+
+        ranges = query.validated_data['ranges']
+        index = LeaveIntervalIndex.for_employee(
+            employee_id,
+            min(candidate['start_date'] for candidate in ranges),
+            max(candidate['end_date'] for candidate in ranges),
         )
+        results = []
+        for candidate in ranges:
+            conflicts = index.conflicts(candidate['start_date'], candidate['end_date'])
+            results.append({
+                'start_date': candidate['start_date'],
+                'end_date': candidate['end_date'],
+                'conflicts': conflicts,
+            })
+        return Response({'employee': employee_id, 'results': results})
 
-        # Update leave status
-        instance.status = new_status
-        instance.save()
+    @action(detail=False, methods=['get'])
+    def export(self, request):
+        """
+        Stream every leave matching the list filters as CSV or NDJSON (?export_format=)
+        """
+        export_format = get_export_format(request)
+        queryset = self.filter_queryset(self.get_queryset())
+        return export_response(queryset, self.export_fields, 'leaves', export_format)
 
-        serializer = self.get_serializer(instance)
-        return Response(serializer.data)
+    @action(detail=False, methods=['get'])
+    def summary(self, request):
+        """
+        Dashboard counters: leaves per status and the caller's reviews this week.
+        Served from maintained counter rows, never from the leave table, except
+        for managers limited to their subtree, whose leaves are counted.
+        """
+        leaves = None
+        if hierarchy.visible_employees(request.user) is not None:
+            leaves = hierarchy.scope(Leave.objects.all(), request.user)
+        return Response({
+            'by_status': counters.status_totals(leaves),
+            'reviewed_by_me_this_week': counters.weekly_reviews(request.user),
+        })
+
+    @action(detail=False, methods=['get'])
+    def analytics(self, request):
+        """
+        Approved leave days per month and leave type for ?year=, in total or per employee (?group_by=employee)
+        """
+        query = LeaveAnalyticsQuerySerializer(data=request.query_params)
+        query.is_valid(raise_exception=True)
+        year = query.validated_data['year']
+        summaries = hierarchy.scope(LeaveMonthlySummary.objects.all(), request.user)
+        results = analytics.monthly_days(year, query.validated_data['group_by'], summaries)
+        return Response({'year': year, 'results': results})
+
+    @action(detail=False, methods=['get'], url_path='as-of')
+    def as_of(self, request):
+        """
+        The leaves as they were at ?at= (an ISO datetime), optionally only
+        those in ?status= or of ?employee=. Replayed from the leave history.
+        """
+        query = LeaveAsOfQuerySerializer(data=request.query_params)
+        query.is_valid(raise_exception=True)
+        at = query.validated_data['at']
+        state, snapshot = history.as_of(
+            at,
+            employee_id=query.validated_data.get('employee'),
+            employee_ids=hierarchy.visible_employees(request.user),
+            status=query.validated_data.get('status'),
+        )
+        return Response({
+            'at': at,
+            'snapshot_taken_at': snapshot.taken_at if snapshot is not None else None,
+            'results': sorted(state.values(), key=lambda row: row['leave_id']),
+        })
+
+    @action(detail=False, methods=['get'])
+    def calendar(self, request):
+        """
+        Who is out between ?start= and ?end= (inclusive).
+
+        Returns approved leaves overlapping the window (plus pending ones with
+        ?include_pending=true), grouped by day or, with ?group_by=employee,
+        by employee. Runs as a single range query on the date index.
+        """
+        query = LeaveCalendarQuerySerializer(data=request.query_params)
+        query.is_valid(raise_exception=True)
+        start = query.validated_data['start']
+        end = query.validated_data['end']
+        statuses = ['approved', 'pending'] if query.validated_data['include_pending'] else ['approved']
+
+        rows = self.get_queryset().filter(
+            status__in=statuses, end_date__gte=start, start_date__lte=end
+        ).order_by('start_date', 'employee_id').values_list(
+            'id', 'employee_id', 'employee__user__first_name', 'employee__user__last_name',
+            'leave_type__name', 'start_date', 'end_date', 'status'
+        )
+
+        if query.validated_data['group_by'] == 'employee':
+            employees = {}
+            for leave_id, employee_id, first_name, last_name, leave_type, start_date, end_date, leave_status in rows:
+                entry = employees.setdefault(employee_id, {
+                    'employee_id': employee_id,
+                    'employee_name': f"{first_name} {last_name}",
+                    'leaves': [],
+                })
+                entry['leaves'].append({
+                    'id': leave_id,
+                    'leave_type': leave_type,
+                    'start_date': start_date,
+                    'end_date': end_date,
+                    'status': leave_status,
+                })
+            results = list(employees.values())
+        else:
+            days = {start + datetime.timedelta(days=offset): [] for offset in range((end - start).days + 1)}
+            for leave_id, employee_id, first_name, last_name, leave_type, start_date, end_date, leave_status in rows:
+                out = {
+                    'employee_id': employee_id,
+                    'employee_name': f"{first_name} {last_name}",
+                    'leave_id': leave_id,
+                    'leave_type': leave_type,
+                    'status': leave_status,
+                }
+                current = max(start_date, start)
+                while current <= min(end_date, end):
+                    days[current].append(out)
+                    current += datetime.timedelta(days=1)
+            results = [{'date': date, 'out': out} for date, out in days.items()]
+
+        return Response({'start': start, 'end': end, 'results': results})
+
+    @action(detail=False, methods=['post'], url_path='bulk-review')
+    def bulk_review(self, request):
+        """
+        Approve or reject a batch of pending leaves in one transaction.
+
+        Expects {"ids": [...], "status": "approved", "comments": "..."} and
+        returns a result per id: processed, already_processed or not_found.
+        """
+        review = LeaveBulkReviewSerializer(data=request.data)
+        review.is_valid(raise_exception=True)
+        ids = list(dict.fromkeys(review.validated_data['ids']))
+        new_status = review.validated_data['status']
+        comments = review.validated_data['comments']
+
+        with transaction.atomic():
+            leaves = {
+                leave.pk: leave
+                for leave in self.get_queryset().select_related(None).select_for_update().filter(pk__in=ids)
+            }
+            processed = transitions.transition_locked(leaves.values(), new_status, request.user, comments)
+        processed_ids = {leave.pk for leave in processed}
+
+        results = []
+        for leave_id in ids:
+            leave = leaves.get(leave_id)
+            if leave is None:
+                results.append({'id': leave_id, 'result': 'not_found'})
+            elif leave_id not in processed_ids:
+                results.append({'id': leave_id, 'result': 'already_processed', 'status': leave.status})
+            else:
+                results.append({'id': leave_id, 'result': 'processed', 'status': new_status})
+
+        return Response({'status': new_status, 'processed': len(processed), 'results': results})
 
-class LeaveApprovalViewSet(viewsets.ModelViewSet):
+class LeaveApprovalViewSet(CompiledListMixin, SparseFieldsViewMixin, viewsets.ModelViewSet):
     """
     API endpoint that allows leave approvals to be viewed or edited.
     """
     queryset = LeaveApproval.objects.all()
     serializer_class = LeaveApprovalSerializer
     permission_classes = [permissions.IsAuthenticated]
+    keyset_ordering = ('-approved_at', '-id')
 
     def get_queryset(self):
         """
@@ -128,10 +392,12 @@ class LeaveApprovalViewSet(viewsets.ModelViewSet):
         
         # Managers and admins can see approvals they've made
         if user.is_manager or user.is_staff:
-            return LeaveApproval.objects.filter(approver=user)
-        
-        # Regular employees can see approvals for their own leaves
-        return LeaveApproval.objects.filter(leave__employee__user=user)
+            queryset = LeaveApproval.objects.filter(approver=user)
+        else:
+            # Regular employees can see approvals for their own leaves
+            queryset = LeaveApproval.objects.filter(leave__employee__user=user)
+
+        return self.setup_eager_loading(queryset)
 
     def get_permissions(self):
         """
@@ -150,7 +416,7 @@ class LeaveApprovalViewSet(viewsets.ModelViewSet):
         """
         leave_id = request.data.get('leave_id')
         try:
-            leave = Leave.objects.get(id=leave_id)
+            leave = hierarchy.scope(Leave.objects.all(), request.user).get(id=leave_id)
         except Leave.DoesNotExist:
             return Response(
                 {'error': 'Leave request not found'},
@@ -163,20 +429,48 @@ class LeaveApprovalViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_400_BAD_REQUEST
             )
 
-        # Create the approval record
         serializer = self.get_serializer(data=request.data)
         serializer.is_valid(raise_exception=True)
-        self.perform_create(serializer)
-        
-        # Update the leave status to approved
-        leave.status = 'approved'
-        leave.save()
+
+        # Approve the leave and create the approval record, unless a concurrent request got there first
+        comments = serializer.validated_data.get('comments', '')
+        if not transitions.transition(leave, 'approved', request.user, comments):
+            return Response(
+                {'error': 'This leave request has already been processed'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        serializer.instance = leave.approval
         
         headers = self.get_success_headers(serializer.data)
         return Response(serializer.data, status=status.HTTP_201_CREATED, headers=headers)
 
-    def perform_create(self, serializer):
+class LeaveBalanceViewSet(SparseFieldsViewMixin, viewsets.ReadOnlyModelViewSet):
+    """
+    API endpoint that shows how many days of each leave type employees have used.
+    """
+    queryset = LeaveBalance.objects.all()
+    serializer_class = LeaveBalanceSerializer
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get_queryset(self):
         """
-        Set the approver when creating a new approval
+        Filter balances based on user's role, then by ?employee= and ?year=
         """
-        serializer.save(approver=self.request.user) 
\ No newline at end of file
+        user = self.request.user
+        if not user.is_authenticated:
+            return LeaveBalance.objects.none()
+
+        # Managers see the balances of the employees below them, admins every balance
+        if user.is_manager or user.is_staff:
+            queryset = hierarchy.scope(LeaveBalance.objects.all(), user)
+            employee = self.request.query_params.get('employee')
+            if employee and employee.isdigit():
+                queryset = queryset.filter(employee_id=employee)
+        else:
+            # Regular employees can only see their own balances
+            queryset = LeaveBalance.objects.filter(employee__user=user)
+
+        year = self.request.query_params.get('year')
+        if year and year.isdigit():
+            queryset = queryset.filter(year=year)
+        return self.setup_eager_loading(queryset).order_by('year', 'leave_type_id')
\ No newline at end of file
@@ -0,0 +1,136 @@
+"""
+Working-day calendar engine.
+
+For each year a calendar builds, once, a prefix sum over the days of the year
+where prefix[n] is the number of working days among the first n days. The
+working days between two dates of the same year are then
+prefix[end] - prefix[start - 1], so a leave costs O(1) (one step per calendar
+year it spans) instead of a loop over its days.
+
+The default calendar is cached per process and reloaded when the version
+token in Django's cache changes; saving or deleting a calendar or holiday
+sets a new token once the transaction commits. When the cache is not shared
+by the workers (see authentication.caching) the calendar is read from the
+database on every use instead.
+"""
+import datetime
+import uuid
+from django.core.cache import cache
+from django.db import transaction
+from authentication import caching
+from .models import WorkCalendar, Holiday
+
+VERSION_KEY = 'leaves:work-calendar:version'
+
+class WorkingDayCalendar:
+    def __init__(self, work_week=WorkCalendar.MONDAY_TO_FRIDAY, holidays=()):
+        self.work_week = work_week
+        self.holidays = frozenset(holidays)
+        self._prefix = {}
+
+    def is_working_day(self, day):
+        return bool(self.work_week >> day.weekday() & 1) and day not in self.holidays
+
+    def _year(self, year):
+        """
+        Prefix sums of working days for a year, built on first use
+        """
+        prefix = self._prefix.get(year)
+        if prefix is None:
+            prefix = [0]
+            day = datetime.date(year, 1, 1)
+            while day.year == year:
+                prefix.append(prefix[-1] + self.is_working_day(day))
+                day += datetime.timedelta(days=1)
+            self._prefix[year] = prefix
+        return prefix
+
+    def _count_within_year(self, start_date, end_date):
+        prefix = self._year(start_date.year)
+        return prefix[end_date.timetuple().tm_yday] - prefix[start_date.timetuple().tm_yday - 1]
+
+    def count(self, start_date, end_date):
+        """
+        Working days in the inclusive range
+        """
+        return sum(self.count_by_year(start_date, end_date).values())
+
+    def count_by_year(self, start_date, end_date):
+        """
+        {year: working days} for the inclusive range
+        """
+        days = {}
+        for year in range(start_date.year, end_date.year + 1):
+            first = max(start_date, datetime.date(year, 1, 1))
+            last = min(end_date, datetime.date(year, 12, 31))
+            days[year] = self._count_within_year(first, last)
+        return days
+
+    def count_by_month(self, start_date, end_date):
+        """
+        {first day of month: working days} for the inclusive range
+        """
+        days = {}
+        month = start_date.replace(day=1)
+        while month <= end_date:
+            following = (month + datetime.timedelta(days=32)).replace(day=1)
+            first = max(start_date, month)
+            last = min(end_date, following - datetime.timedelta(days=1))
+            days[month] = self._count_within_year(first, last)
+            month = following
+        return days
+
+    def annotate(self, leaves):
+        """
+        Set `working_days` on every leave of an iterable and return them as a list
+        """
+        leaves = list(leaves)
+        for leave in leaves:
+            leave.working_days = self.count(leave.start_date, leave.end_date)
+        return leaves
+
+_loaded = {'version': None, 'calendar': None}
+
+def _load_calendar():
+    default = WorkCalendar.objects.filter(is_default=True).first()
+    if default is None:
+        return WorkingDayCalendar()
+    holidays = Holiday.objects.filter(calendar=default).values_list('date', flat=True)
+    return WorkingDayCalendar(default.work_week, holidays)
+
+def get_calendar():
+    """
+    The default working-day calendar (Monday to Friday without holidays if none is configured)
+    """
+    if not caching.is_shared():
+        # Another worker's change would never reach this process's copy
+        return _load_calendar()
+    version = cache.get_or_set(VERSION_KEY, lambda: uuid.uuid4().hex, timeout=None)
+    if _loaded['version'] != version or _loaded['calendar'] is None:
+        _loaded.update(version=version, calendar=_load_calendar())
+    return _loaded['calendar']
+
+def invalidate():
+    """
+    Make every process reload the calendar once the current transaction commits
+    """
+    transaction.on_commit(lambda: cache.set(VERSION_KEY, uuid.uuid4().hex, timeout=None))
+
+def recalculate_working_days(queryset, batch_size=1000):
+    """
+    Recompute the stored working_days of the given leaves and return how many changed
+    """
+    calendar = get_calendar()
+    changed = []
+    total = 0
+    for leave in queryset.only('id', 'start_date', 'end_date', 'working_days').iterator(chunk_size=batch_size):
+        working_days = calendar.count(leave.start_date, leave.end_date)
+        if working_days != leave.working_days:
+            leave.working_days = working_days
+            changed.append(leave)
+        if len(changed) >= batch_size:
+            queryset.model.objects.bulk_update(changed, ['working_days'])
+            total += len(changed)
+            changed = []
+    queryset.model.objects.bulk_update(changed, ['working_days'])
+    return total + len(changed)
@@ -82,7 +82,12 @@ TEMPLATES = [
 WSGI_APPLICATION = "djangoapi3.wsgi.application"
 
 REST_FRAMEWORK = {
-    'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
+    'DEFAULT_AUTHENTICATION_CLASSES': [
+        'rest_framework.authentication.SessionAuthentication',
+        'rest_framework.authentication.BasicAuthentication',
+        'authentication.tokens.SignedTokenAuthentication',
+    ],
+    'DEFAULT_PAGINATION_CLASS': 'authentication.pagination.CursorOrPageNumberPagination',
     'PAGE_SIZE': 10,
     'DEFAULT_RENDERER_CLASSES': [
         'rest_framework.renderers.JSONRenderer',
@@ -97,10 +102,46 @@ DATABASES = {
     "default": {
         "ENGINE": "django.db.backends.sqlite3",
         "NAME": BASE_DIR / "db.sqlite3",
+        # Take the write lock when a transaction begins, so concurrent writers
+        # wait for each other instead of failing with "database is locked"
+        "OPTIONS": {"transaction_mode": "IMMEDIATE"},
+        "TEST": {
+            # A file instead of the in-memory default, so tests can open
+            # several connections (e.g. concurrent reviews) to one database
+            "NAME": BASE_DIR / "test_db.sqlite3",
+        },
     }
 }
 
 
+# Cache
+# The per-process caches (work calendar, reference data, token revocations) are
+# invalidated through version tokens kept here, so with several worker processes
+# point it at a shared backend: the database cache
+# (CACHE_BACKEND=django.core.cache.backends.db.DatabaseCache CACHE_LOCATION=django_cache,
+# after manage.py createcachetable), as render.yaml does, or Redis
+# (django.core.cache.backends.redis.RedisCache, redis://127.0.0.1:6379/1).
+# The local-memory default is only right for a single process.
+
+CACHES = {
+    "default": {
+        "BACKEND": os.environ.get("CACHE_BACKEND", "django.core.cache.backends.locmem.LocMemCache"),
+        "LOCATION": os.environ.get("CACHE_LOCATION", ""),
+    }
+}
+
+
+# Bearer tokens (see authentication.tokens): seconds a token is accepted for,
+# and seconds after issue during which it can still be exchanged for a new one
+AUTH_TOKEN_LIFETIME = 15 * 60
+AUTH_TOKEN_REFRESH_LIFETIME = 24 * 60 * 60
+
+
+# Where the drain_outbox worker delivers leave notifications, e.g.
+# [{"BACKEND": "leaves.outbox.HttpSink", "OPTIONS": {"url": "http://localhost:8001/events"}}]
+LEAVE_OUTBOX_SINKS = []
+
+
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
 